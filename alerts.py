@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+
+import itertools
+
+import numpy as np
+
+DIRECTIONS = ['above', 'below']
+
+
+class _ThresholdBook:
+    """Sorted thresholds of one (ticker, metric), per direction, with their alert ids."""
+
+    __slots__ = ('values', 'ids', 'pending', 'removed')
+
+    def __init__(self):
+        self.values = {direction: np.zeros(0) for direction in DIRECTIONS}
+        self.ids = {direction: np.zeros(0, dtype=np.int64) for direction in DIRECTIONS}
+        self.pending = {direction: [] for direction in DIRECTIONS}
+        self.removed = {direction: set() for direction in DIRECTIONS}
+
+    def sorted(self, direction: str) -> tuple:
+        """Merges pending additions and drops removed alerts before a lookup."""
+        pending, removed = self.pending[direction], self.removed[direction]
+        if pending or removed:
+            values = np.concatenate([self.values[direction], [threshold for threshold, _ in pending]])
+            ids = np.concatenate([self.ids[direction], np.array([i for _, i in pending], dtype=np.int64)])
+            if removed:
+                keep = ~np.isin(ids, np.fromiter(removed, dtype=np.int64, count=len(removed)))
+                values, ids = values[keep], ids[keep]
+            order = np.argsort(values, kind='stable')
+            self.values[direction], self.ids[direction] = values[order], ids[order]
+            pending.clear()
+            removed.clear()
+        return self.values[direction], self.ids[direction]
+
+
+class AlertEngine:
+    """
+    Threshold alerts such as "P/E below 5" or "ROE above 25", checked on every value change.
+
+    Thresholds are indexed per (ticker, metric) in sorted arrays. When a metric moves from
+    `old` to `new`, the alerts it crossed are exactly the thresholds between the two values,
+    found with two binary searches, so the cost of an update does not depend on how many
+    alerts are registered. An "above" alert fires when the value rises past its threshold
+    (old <= threshold < new), a "below" alert when it falls under it (new < threshold <= old).
+    Alerts stay active and fire again on the next crossing until removed.
+    """
+
+    def __init__(self):
+        self._books = dict()
+        self._alerts = dict()
+        self._last = dict()
+        self._ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def add_alert(self, ticker: str, metric: str, threshold: float, direction: str) -> int:
+        """
+        Registers an alert.
+
+        Returns:
+            int: The alert id.
+
+        Raises:
+            ValueError: If the direction is unknown or the threshold is not a finite number.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}.")
+        threshold = float(threshold)
+        if not np.isfinite(threshold):
+            raise ValueError("threshold must be a finite number.")
+        alert_id = next(self._ids)
+        self._alerts[alert_id] = (ticker, metric, threshold, direction)
+        self._books.setdefault((ticker, metric), _ThresholdBook()).pending[direction].append((threshold, alert_id))
+        return alert_id
+
+    def remove_alert(self, alert_id: int):
+        """
+        Deactivates an alert; it leaves the sorted arrays when they are next searched.
+
+        Raises:
+            KeyError: If no active alert has this id.
+        """
+        ticker, metric, _, direction = self._alerts.pop(alert_id)
+        self._books[(ticker, metric)].removed[direction].add(alert_id)
+
+    def alert(self, alert_id: int) -> tuple:
+        """Returns (ticker, metric, threshold, direction) for an active alert."""
+        return self._alerts[alert_id]
+
+    def update(self, ticker: str, metric: str, value) -> list:
+        """
+        Records a new value and returns the ids of the alerts it crossed.
+
+        The first value seen for a (ticker, metric) fires every alert it is already past.
+        None or NaN (e.g. a ratio with a zero denominator) clears the value without firing.
+        """
+        key = (ticker, metric)
+        old = self._last.get(key)
+        if value is None or value != value:
+            self._last[key] = None
+            return []
+        self._last[key] = value
+        book = self._books.get(key)
+        if book is None or old == value:
+            return []
+
+        fired = list()
+        above_values, above_ids = book.sorted('above')
+        below_values, below_ids = book.sorted('below')
+        if old is None:
+            fired.extend(above_ids[:np.searchsorted(above_values, value, 'left')])
+            fired.extend(below_ids[np.searchsorted(below_values, value, 'right'):])
+        elif value > old:
+            fired.extend(above_ids[np.searchsorted(above_values, old, 'left'):np.searchsorted(above_values, value, 'left')])
+        else:
+            fired.extend(below_ids[np.searchsorted(below_values, value, 'right'):np.searchsorted(below_values, old, 'right')])
+        return [int(alert_id) for alert_id in fired]
+
+    def update_many(self, ticker: str, values: dict) -> list:
+        """
+        Applies a ticker's metric values at once, e.g. the result of `TickUpdater.apply`
+        or one period of `Company.output` after a new filing.
+
+        Returns:
+            list: Ids of every alert fired.
+        """
+        fired = list()
+        for metric, value in values.items():
+            fired.extend(self.update(ticker, metric, value))
+        return fired
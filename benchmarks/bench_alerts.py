@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""
+Times threshold alerts: 1M alerts over 200 tickers x 5 metrics, then 200k random
+metric updates.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_alerts.py
+"""
+
+import time
+
+import numpy as np
+
+from alerts import AlertEngine
+
+METRICS = ['price_to_earnings', 'price_to_book', 'earnings_yield', 'ROE', 'EV_EBIT']
+
+
+def main(n_alerts: int = 1_000_000, n_tickers: int = 200, n_updates: int = 200_000):
+    rng = np.random.default_rng(0)
+    engine = AlertEngine()
+    tickers = rng.integers(0, n_tickers, n_alerts).tolist()
+    metrics = rng.integers(0, len(METRICS), n_alerts).tolist()
+    thresholds = rng.uniform(0, 50, n_alerts).tolist()
+    directions = np.where(rng.random(n_alerts) < 0.5, 'above', 'below').tolist()
+
+    start = time.perf_counter()
+    for ticker, metric, threshold, direction in zip(tickers, metrics, thresholds, directions):
+        engine.add_alert(f'T{ticker:03d}', METRICS[metric], threshold, direction)
+    print(f"add_alert: {len(engine):,} alerts in {time.perf_counter() - start:.2f}s")
+
+    # Every (ticker, metric) gets a first value, which also merges the pending alerts
+    for ticker in range(n_tickers):
+        for metric in METRICS:
+            engine.update(f'T{ticker:03d}', metric, 25.0)
+
+    keys = rng.integers(0, n_tickers, n_updates).tolist()
+    names = rng.integers(0, len(METRICS), n_updates).tolist()
+    values = (25 + rng.normal(0, 1, n_updates)).tolist()
+    fired = 0
+    start = time.perf_counter()
+    for ticker, metric, value in zip(keys, names, values):
+        fired += len(engine.update(f'T{ticker:03d}', METRICS[metric], value))
+    elapsed = time.perf_counter() - start
+    print(f"update: {n_updates / elapsed:,.0f} updates/s ({fired:,} alerts fired)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+"""
+Times a 50 x 50 sensitivity grid (revenue x finance cost shocks) over ten years of
+one company's history, every ratio and growth entry included.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_sensitivity.py
+"""
+
+import time
+
+import numpy as np
+
+from FA import Company
+from sensitivity import sensitivity_grid
+
+LINE_ITEMS = ['revenue', 'COGS', 'operating_income', 'net_profit', 'profit_bfor_tax', 'tax_expense',
+              'asset', 'current_asset', 'current_liabilities', 'book_value', 'inventory', 'short_term_debt',
+              'cash_and_equivalent', 'long_term_debt', 'outstanding_shares', 'market_cap', 'cash_from_opr',
+              'finance_cost', 'depreciation']
+
+
+def main(n_years: int = 10, grid: int = 50):
+    rng = np.random.default_rng(0)
+    company = Company('X', n_years)
+    for year in range(2014, 2014 + n_years):
+        record = {name: float(rng.integers(1, 10_000)) for name in LINE_ITEMS}
+        record['year'] = year
+        company.add_period_data(record)
+    company.calculate_all_metrics()
+    shocks = {'revenue': np.linspace(-0.1, 0.1, grid), 'finance_cost': np.linspace(0, 0.5, grid)}
+
+    start = time.perf_counter()
+    sensitivity_grid(company, shocks)
+    elapsed = time.perf_counter() - start
+    print(f"{grid} x {grid} grid over {n_years} years: {elapsed * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
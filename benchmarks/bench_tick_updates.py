@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Times market-linked metric updates on price ticks for 200 companies: ticks applied
+one at a time with `TickUpdater.apply`, in-memory batches of 10k ticks with
+`TickUpdater.apply_batch`, and a 1M-tick file replayed in batches.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_tick_updates.py
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from FA import Company
+from tick_updates import TickUpdater
+
+LINE_ITEMS = ['revenue', 'COGS', 'operating_income', 'net_profit', 'profit_bfor_tax', 'tax_expense',
+              'asset', 'current_asset', 'current_liabilities', 'book_value', 'inventory', 'short_term_debt',
+              'cash_and_equivalent', 'long_term_debt', 'outstanding_shares', 'market_cap', 'cash_from_opr', 'capex']
+
+
+def main(n_companies: int = 200, n_ticks: int = 1_000_000):
+    rng = np.random.default_rng(0)
+    companies = list()
+    for i in range(n_companies):
+        company = Company(f'T{i:03d}', 2)
+        for year in [2022, 2023]:
+            statement = {name: float(rng.integers(1, 10_000)) for name in LINE_ITEMS}
+            statement['year'] = year
+            company.add_period_data(statement)
+        company.calculate_all_metrics()
+        companies.append(company)
+    updater = TickUpdater(companies)
+    tickers = [companies[i].company_name for i in rng.integers(0, n_companies, n_ticks)]
+    prices = rng.uniform(0.5, 50, n_ticks).round(2).tolist()
+
+    start = time.perf_counter()
+    for ticker, price in zip(tickers, prices):
+        updater.apply(ticker, price)
+    elapsed = time.perf_counter() - start
+    print(f"apply: {n_ticks / elapsed:,.0f} ticks/s")
+
+    start = time.perf_counter()
+    for first in range(0, n_ticks, 10_000):
+        updater.apply_batch(tickers[first:first + 10_000], prices[first:first + 10_000])
+    elapsed = time.perf_counter() - start
+    print(f"apply_batch: {n_ticks / elapsed:,.0f} ticks/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ticks.csv')
+        with open(path, 'w') as f:
+            f.write('timestamp,ticker,price\n')
+            f.writelines(f'{n},{ticker},{price}\n' for n, (ticker, price) in enumerate(zip(tickers, prices)))
+        start = time.perf_counter()
+        count = updater.replay(path)
+        elapsed = time.perf_counter() - start
+    print(f"replay: {count / elapsed:,.0f} ticks/s")
+
+
+if __name__ == '__main__':
+    main()
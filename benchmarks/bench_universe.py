@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""
+Times point-in-time universe snapshots: 300 tickers x 10 years of annual statements
+(with restatements), rebuilt for every month-end over the ten years.
+
+Run from the repository root: PYTHONPATH=. python benchmarks/bench_universe.py
+"""
+
+import datetime
+import time
+
+import numpy as np
+
+from bitemporal import BitemporalStore
+from universe import UniverseBuilder
+
+LINE_ITEMS = ['revenue', 'COGS', 'operating_income', 'net_profit', 'profit_bfor_tax', 'tax_expense',
+              'asset', 'current_asset', 'current_liabilities', 'liabilities', 'book_value', 'inventory',
+              'cash_and_equivalent', 'long_term_debt', 'outstanding_shares', 'market_cap', 'cash_from_opr']
+
+
+def main(n_tickers: int = 300, first_year: int = 2014, n_years: int = 10):
+    rng = np.random.default_rng(0)
+    store = BitemporalStore()
+    for t in range(n_tickers):
+        for year in range(first_year, first_year + n_years):
+            published = datetime.date(year + 1, 3, 1) + datetime.timedelta(days=int(rng.integers(0, 90)))
+            versions = [published] + ([published + datetime.timedelta(days=180)] if rng.random() < 0.1 else [])
+            for known in versions:
+                statement = {name: float(rng.integers(1, 10_000)) for name in LINE_ITEMS}
+                statement['year'] = year
+                store.record(f'T{t:03d}', statement, known)
+
+    dates = [datetime.date(first_year + 1 + m // 12, m % 12 + 1, 1) for m in range(12 * n_years)]
+    start = time.perf_counter()
+    builder = UniverseBuilder(store)
+    snapshots = builder.snapshots(dates)
+    elapsed = time.perf_counter() - start
+    print(f"{n_tickers} tickers x {n_years} years, {len(snapshots)} monthly snapshots: {elapsed:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
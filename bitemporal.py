@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+
+import bisect
+import datetime
+
+from FA import Company
+from schema import PeriodRecord
+
+
+def as_date(value) -> datetime.date:
+    """Accepts a `datetime.date` or an ISO 'YYYY-MM-DD' string."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+
+class BitemporalStore:
+    """
+    Statement store that keeps every restatement.
+
+    Each value has two times: the period it is valid for (year or (year, quarter)) and
+    the knowledge date from which it was known. Versions of one ticker-period are
+    kept sorted by knowledge date, so "what did we know on D?" is a bisect per period
+    rather than a scan of the history.
+    """
+
+    def __init__(self):
+        # (ticker, period_type, period) -> ([knowledge dates], [PeriodRecord]) sorted by date
+        self._versions = dict()
+        # (ticker, period_type) -> sorted list of periods with at least one version
+        self._periods = dict()
+
+    @staticmethod
+    def _period_key(record: PeriodRecord, period_type: str):
+        if period_type == 'annual':
+            if 'year' not in record:
+                raise ValueError("Input for annual data is missing the 'year' key.")
+            return record['year']
+        if period_type == 'quarterly':
+            if 'year' not in record or 'quarter' not in record:
+                raise ValueError("Input for quarterly data is missing 'year' or 'quarter' keys.")
+            return (record['year'], record['quarter'])
+        raise ValueError("period_type must be either 'annual' or 'quarterly'.")
+
+    def record(self, ticker: str, finance_input: dict, knowledge_date, period_type: str = 'annual'):
+        """
+        Records a statement (or a restatement of an existing period) as known from `knowledge_date`.
+
+        Versions may arrive out of order; they are inserted at their knowledge date.
+
+        Raises:
+            ValueError: If the input does not match the schema, the period keys are
+                        missing, or a version with the same knowledge date already exists.
+        """
+        record = PeriodRecord.from_dict(finance_input)
+        period = self._period_key(record, period_type)
+        known = as_date(knowledge_date)
+
+        key = (ticker, period_type, period)
+        if key not in self._versions:
+            self._versions[key] = ([], [])
+            bisect.insort(self._periods.setdefault((ticker, period_type), []), period)
+        dates, records = self._versions[key]
+        position = bisect.bisect_left(dates, known)
+        if position < len(dates) and dates[position] == known:
+            raise ValueError(f"{ticker} period {period} already has a version known on {known}.")
+        dates.insert(position, known)
+        records.insert(position, record)
+
+    def as_of(self, ticker: str, knowledge_date, period_type: str = 'annual', period=None):
+        """
+        Returns what was known about a ticker on `knowledge_date`.
+
+        Args:
+            ticker (str): The company ticker.
+            knowledge_date: Date of the query (date or ISO string).
+            period_type (str): Either 'annual' or 'quarterly'.
+            period: A single period to look up; all periods if None.
+
+        Returns:
+            PeriodRecord | None when `period` is given, otherwise {period: PeriodRecord}
+            for every period known by that date.
+        """
+        known = as_date(knowledge_date)
+        if period is not None:
+            return self._lookup((ticker, period_type, period), known)
+        snapshot = dict()
+        for p in self._periods.get((ticker, period_type), []):
+            record = self._lookup((ticker, period_type, p), known)
+            if record is not None:
+                snapshot[p] = record
+        return snapshot
+
+    def _lookup(self, key: tuple, known: datetime.date) -> PeriodRecord | None:
+        versions = self._versions.get(key)
+        if versions is None:
+            return None
+        dates, records = versions
+        position = bisect.bisect_right(dates, known)
+        return records[position - 1] if position else None
+
+    def versions(self, ticker: str, period, period_type: str = 'annual') -> list:
+        """Returns the audit trail of one ticker-period as [(knowledge_date, PeriodRecord)]."""
+        dates, records = self._versions.get((ticker, period_type, period), ([], []))
+        return list(zip(dates, records))
+
+    def company_as_of(self, ticker: str, knowledge_date, period_type: str = 'annual') -> Company:
+        """Returns a `Company` loaded with the statements known on `knowledge_date`."""
+        snapshot = self.as_of(ticker, knowledge_date, period_type)
+        company = Company(ticker, len(snapshot), period_type)
+        for record in snapshot.values():
+            company.add_period_data(record)
+        return company
+
+    def events(self, period_type: str = 'annual') -> list:
+        """
+        Returns every version as a publication event log sorted by knowledge date.
+
+        Returns:
+            list: [(knowledge_date, ticker, period, PeriodRecord)] in knowledge date order.
+        """
+        log = list()
+        for (ticker, kind, period), (dates, records) in self._versions.items():
+            if kind == period_type:
+                log.extend((known, ticker, period, record) for known, record in zip(dates, records))
+        log.sort(key=lambda event: event[0])
+        return log
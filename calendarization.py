@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+
+import calendar
+import datetime
+
+import numpy as np
+
+from mixed_frequency import FLOW_MASK, MixedFrequencyStore
+from schema import FIELDS, FIELD_IDS
+
+
+def _month_end(year: int, month: int) -> datetime.date:
+    # Normalise months outside 1..12 into the neighbouring years
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _month_start(year: int, month: int) -> datetime.date:
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return datetime.date(year, month, 1)
+
+
+def period_end_date(year: int, quarter: int = None, year_end_month: int = 12) -> datetime.date:
+    """
+    Returns the last day of a fiscal period.
+
+    Fiscal year `year` is the one ending in `year_end_month` of that calendar year, so
+    for a March year-end, fiscal 2024 ends on 2024-03-31 and its Q1 on 2023-06-30.
+
+    Args:
+        year (int): The fiscal year.
+        quarter (int): The fiscal quarter (1-4), or None for the full year.
+        year_end_month (int): Calendar month (1-12) in which the fiscal year ends.
+    """
+    if quarter is None:
+        return _month_end(year, year_end_month)
+    return _month_end(year, year_end_month - 3 * (4 - quarter))
+
+
+def _span(end: datetime.date, months: int) -> tuple:
+    """(start, end) of a period of `months` months ending on `end`, as ordinals."""
+    start = _month_start(end.year, end.month - months + 1)
+    return start.toordinal(), end.toordinal()
+
+
+class Calendarizer:
+    """
+    Re-expresses fiscal-period statements on common calendar periods.
+
+    Flows (income statement, cash flow) are pro-rated onto calendar periods by the
+    share of days each fiscal period overlaps them; stocks (balance sheet, shares,
+    market cap) take the value of the latest fiscal period ending inside the calendar
+    period. The alignment matrix for each fiscal calendar is built once and applied to
+    every ticker on that calendar in a single batched matrix product.
+    """
+
+    def __init__(self, calendar_periods: list, frequency: str = 'annual'):
+        """
+        Args:
+            calendar_periods (list): Calendar years, or (year, quarter) tuples when quarterly.
+            frequency (str): 'annual' or 'quarterly'.
+        """
+        if frequency not in ['annual', 'quarterly']:
+            raise ValueError("frequency must be either 'annual' or 'quarterly'.")
+        self.frequency = frequency
+        self.calendar_periods = list(calendar_periods)
+        self._months = 12 if frequency == 'annual' else 3
+        self._calendar_spans = np.array([
+            _span(period_end_date(*(p if isinstance(p, tuple) else (p,))), self._months)
+            for p in self.calendar_periods])
+        self._alignments = dict()
+
+    def alignment(self, fiscal_ends: tuple) -> tuple:
+        """
+        Returns the alignment for fiscal periods of this frequency ending on `fiscal_ends`.
+
+        Returns:
+            tuple: (flow_weights, covered, stock_index) where flow_weights[c, f] is the
+                   share of fiscal period f falling in calendar period c, covered[c] says
+                   whether the fiscal periods span every day of c, and stock_index[c] is
+                   the fiscal period supplying stocks for c (-1 if none).
+        """
+        fiscal_ends = tuple(fiscal_ends)
+        if fiscal_ends not in self._alignments:
+            fiscal_spans = np.array([_span(end, self._months) for end in fiscal_ends]).reshape(-1, 2)
+            cal_start, cal_end = self._calendar_spans[:, :1], self._calendar_spans[:, 1:]
+            fis_start, fis_end = fiscal_spans[:, 0], fiscal_spans[:, 1]
+            overlap = np.clip(np.minimum(cal_end, fis_end) - np.maximum(cal_start, fis_start) + 1, 0, None)
+            flow_weights = overlap / (fis_end - fis_start + 1)
+            covered = overlap.sum(axis=1) == (cal_end - cal_start + 1)[:, 0]
+
+            ends_inside = (fis_end >= cal_start) & (fis_end <= cal_end)
+            latest = np.where(ends_inside, fis_end, -1)
+            stock_index = np.where(ends_inside.any(axis=1), latest.argmax(axis=1), -1)
+            self._alignments[fiscal_ends] = (flow_weights, covered, stock_index)
+        return self._alignments[fiscal_ends]
+
+    def calendarize(self, values: np.ndarray, fiscal_ends: tuple) -> np.ndarray:
+        """
+        Calendarizes a (tickers x fiscal periods x fields) batch sharing one fiscal calendar.
+
+        A calendar flow is NaN unless every fiscal period overlapping it reported the
+        line item; a calendar stock is NaN if no fiscal period ends inside it.
+
+        Returns:
+            np.ndarray: (tickers x calendar periods x fields) array.
+        """
+        flow_weights, covered, stock_index = self.alignment(fiscal_ends)
+        present = ~np.isnan(values)
+        flows = np.einsum('cf,tfk->tck', flow_weights, np.where(present, values, 0.0))
+        gaps = np.einsum('cf,tfk->tck', (flow_weights > 0).astype(float), (~present).astype(float))
+        flows = np.where((gaps == 0) & covered[None, :, None], flows, np.nan)
+
+        stocks = np.full(flows.shape, np.nan)
+        has_stock = stock_index >= 0
+        stocks[:, has_stock, :] = values[:, stock_index[has_stock], :]
+
+        return np.where(FLOW_MASK, flows, stocks)
+
+    def calendarize_stores(self, stores: dict[str, MixedFrequencyStore]) -> tuple:
+        """
+        Calendarizes many companies at once.
+
+        Args:
+            stores (dict): Ticker -> `MixedFrequencyStore`; each store's
+                           `fiscal_year_end_month` sets its fiscal calendar.
+
+        Returns:
+            tuple: (tickers, values) with values a (tickers x calendar periods x fields) array.
+        """
+        tickers = list(stores)
+        views = {ticker: stores[ticker].view(self.frequency) for ticker in tickers}
+        years = [p if isinstance(p, int) else p[0] for periods, _ in views.values() for p in periods]
+        result = np.full((len(tickers), len(self.calendar_periods), len(FIELDS)), np.nan)
+        if not years:
+            return tickers, result
+
+        # Pad every ticker to a common fiscal year range so tickers on the same
+        # fiscal calendar share one alignment matrix and one batched product
+        first, last = min(years), max(years)
+        per_year = 1 if self.frequency == 'annual' else 4
+        n_fiscal = (last - first + 1) * per_year
+        groups = dict()
+        for i, ticker in enumerate(tickers):
+            month = stores[ticker].fiscal_year_end_month
+            groups.setdefault(month, []).append(i)
+
+        for month, rows in groups.items():
+            if self.frequency == 'annual':
+                ends = tuple(period_end_date(year, None, month) for year in range(first, last + 1))
+            else:
+                ends = tuple(period_end_date(year, q, month) for year in range(first, last + 1) for q in range(1, 5))
+            batch = np.full((len(rows), n_fiscal, len(FIELDS)), np.nan)
+            for j, i in enumerate(rows):
+                periods, values = views[tickers[i]]
+                if periods:
+                    start = (periods[0] if isinstance(periods[0], int) else periods[0][0]) - first
+                    batch[j, start * per_year:start * per_year + len(periods)] = values
+            result[rows] = self.calendarize(batch, ends)
+
+        result[:, :, FIELD_IDS['year']] = [p if isinstance(p, int) else p[0] for p in self.calendar_periods]
+        if self.frequency == 'quarterly':
+            result[:, :, FIELD_IDS['quarter']] = [p[1] for p in self.calendar_periods]
+        return tickers, result
@@ -0,0 +1,254 @@
+#!/usr/bin/python3
+
+import bisect
+import datetime
+
+from FA import Company
+from schema import FIELDS, INTEGRAL_UNITS, validate_record
+
+# Line items whose consensus must stay a whole number, e.g. outstanding_shares
+INTEGRAL_FIELDS = frozenset(field.name for field in FIELDS if field.unit in INTEGRAL_UNITS)
+
+
+class _FieldState:
+    """Submissions for one line item of one ticker-period, kept sorted by value."""
+
+    __slots__ = ('values', 'weights', 'submissions', 'total_weight', 'integral', 'band')
+
+    def __init__(self, integral: bool = False):
+        self.values = list()
+        self.weights = list()
+        self.submissions = list()
+        self.total_weight = 0.0
+        self.integral = integral
+        # [low, high) index range of the values within tolerance of the consensus
+        self.band = (0, 0)
+
+    def add(self, value: float, weight: float, submission_id) -> int:
+        """Inserts a submission and returns its position in the sorted values."""
+        position = bisect.bisect_right(self.values, value)
+        self.values.insert(position, value)
+        self.weights.insert(position, weight)
+        self.submissions.insert(position, submission_id)
+        self.total_weight += weight
+        return position
+
+    def median(self) -> float:
+        # Whole-number fields take the lower middle value, so the consensus is a submitted value
+        n = len(self.values)
+        middle = n // 2
+        if n % 2:
+            return self.values[middle]
+        if self.integral:
+            return self.values[middle - 1]
+        return 0.5 * (self.values[middle - 1] + self.values[middle])
+
+    def weighted_median(self) -> float:
+        if self.total_weight <= 0:
+            return self.median()
+        half = 0.5 * self.total_weight
+        cumulative = 0.0
+        for value, weight in zip(self.values, self.weights):
+            cumulative += weight
+            if cumulative >= half:
+                return value
+        return self.values[-1]
+
+    def mode(self) -> float:
+        # Equal values are adjacent in the sorted list; ties go to the heavier total weight
+        best_value, best_key = None, None
+        start = 0
+        while start < len(self.values):
+            end = bisect.bisect_right(self.values, self.values[start], lo=start)
+            key = (end - start, sum(self.weights[start:end]))
+            if best_key is None or key > best_key:
+                best_value, best_key = self.values[start], key
+            start = end
+        return best_value
+
+
+class ConsensusResolver:
+    """
+    Resolves conflicting crowd-sourced statements into one consensus record per ticker-period.
+
+    Submissions are folded in one at a time: each only updates the per-field state of
+    its own ticker-period, so the cost of a submission does not grow with history.
+    Submitted values that deviate from the field's consensus by more than
+    `outlier_tolerance` are flagged into DATA_VALIDATION_FLAGS, and flags are
+    resolved again if later submissions move the consensus towards them. Submissions
+    failing an accounting identity are flagged too, but still count towards consensus.
+    """
+
+    METHODS = ['weighted_median', 'median', 'mode']
+
+    def __init__(self, method: str = 'weighted_median', outlier_tolerance: float = 0.05,
+                 min_submissions: int = 3, database=None):
+        """
+        Args:
+            method (str): 'weighted_median' (weights are users' contribution_score), 'median' or 'mode'.
+            outlier_tolerance (float): Relative deviation from consensus above which a value is flagged.
+            min_submissions (int): Number of submissions a field needs before outliers are flagged.
+            database (StatementDatabase): If given, flags are also written to its
+                data_validation_flags table.
+
+        Raises:
+            ValueError: If the method is unknown.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"method must be one of {self.METHODS}.")
+        self.method = method
+        self.outlier_tolerance = outlier_tolerance
+        self.min_submissions = min_submissions
+        self.database = database
+
+        # (ticker, period_type, period) -> {field: _FieldState}
+        self._fields = dict()
+        # (ticker, period_type, period) -> {field: consensus value}
+        self._consensus = dict()
+        # (submission_id, field or '<check> identity') -> flag dict with the DATA_VALIDATION_FLAGS columns
+        self.flags = dict()
+        self._next_submission_id = 1
+
+    @staticmethod
+    def _period_key(finance_input: dict, period_type: str):
+        if 'year' not in finance_input:
+            raise ValueError("Submission is missing the 'year' key.")
+        if period_type == 'quarterly':
+            if finance_input.get('quarter') not in [1, 2, 3, 4]:
+                raise ValueError("Quarter must be an integer between 1 and 4.")
+            return (finance_input['year'], finance_input['quarter'])
+        return finance_input['year']
+
+    def submit(self, ticker: str, finance_input: dict, contribution_score: float = 1.0,
+               period_type: str = 'annual', submission_id=None) -> dict:
+        """
+        Folds one submission into the consensus for its ticker-period.
+
+        The submission is first checked against the line-item schema, so aliases such as
+        'PBT' are folded into their canonical line item and the consensus record always
+        passes `Company.add_period_data`. Each accounting identity it fails raises a flag
+        keyed by '<check name> identity'.
+
+        Args:
+            ticker (str): The company ticker.
+            finance_input (dict): The submitted period dictionary.
+            contribution_score (float): The submitting user's contribution_score, used as weight.
+            period_type (str): Either 'annual' or 'quarterly'.
+            submission_id: Identifier of the submission (e.g. the statement id) used in flags.
+
+        Returns:
+            dict: The updated consensus values for the ticker-period.
+
+        Raises:
+            ValueError: If the submission has unknown or duplicate line items, or values
+                        of the wrong type, unit or range.
+        """
+        finance_input, _, failed = validate_record(finance_input)
+        key = (ticker, period_type, self._period_key(finance_input, period_type))
+        if submission_id is None:
+            submission_id = self._next_submission_id
+            self._next_submission_id += 1
+        for name in failed:
+            # Keyed apart from field flags, since a check can share a line item's name
+            self._add_flag(submission_id, f'{name} identity',
+                           f"{ticker} {key[2]} accounting identity '{name}' does not hold")
+
+        fields = self._fields.setdefault(key, {})
+        consensus = self._consensus.setdefault(key, {})
+        weight = max(float(contribution_score), 0.0)
+        for field, value in finance_input.items():
+            if field in ['year', 'quarter']:
+                continue
+            state = fields.get(field)
+            if state is None:
+                state = fields[field] = _FieldState(field in INTEGRAL_FIELDS)
+            position = state.add(value, weight, submission_id)
+            consensus[field] = getattr(state, self.method)()
+            self._update_flags(key, field, state, position, consensus[field])
+        return dict(consensus)
+
+    def _update_flags(self, key: tuple, field: str, state: _FieldState, position: int, consensus_value: float):
+        """
+        Updates the flags of one field after a value was inserted at `position`.
+
+        The values within tolerance of the consensus form one index range of the sorted
+        values, so only the new value and the values between the old and new range
+        boundaries can change outlier status; the rest are not looked at.
+        """
+        n = len(state.values)
+        # Shift the previous band to the indices after the insertion
+        low, high = state.band
+        low += position <= low
+        high += position < high
+        if n < self.min_submissions:
+            state.band = (0, n)
+            return
+
+        scale = abs(consensus_value) if consensus_value else 1.0
+        tolerance = self.outlier_tolerance
+        new_low = bisect.bisect_left(state.values, True, key=lambda v: (consensus_value - v) / scale <= tolerance)
+        new_high = bisect.bisect_left(state.values, True, key=lambda v: (v - consensus_value) / scale > tolerance)
+        state.band = (new_low, new_high)
+
+        changed = {position}
+        changed.update(range(min(low, new_low), max(low, new_low)))
+        changed.update(range(min(high, new_high), max(high, new_high)))
+        for index in changed:
+            value, submission_id = state.values[index], state.submissions[index]
+            is_outlier = not new_low <= index < new_high
+            flag = self.flags.get((submission_id, field))
+            if is_outlier and (flag is None or flag['resolved']):
+                ticker, _, period = key
+                self._add_flag(submission_id, field, (f"{ticker} {period} '{field}' = {value} deviates from "
+                                                      f"consensus {consensus_value}"))
+            elif not is_outlier and flag is not None and not flag['resolved']:
+                flag['resolved'] = True
+                if self.database is not None and flag['id'] is not None:
+                    self.database.resolve_flag(flag['id'])
+
+    def _add_flag(self, submission_id, name: str, reason: str):
+        """Records an open flag, also in the database if one is attached."""
+        flag = {
+            'statement_id': submission_id,
+            'flagged_by': None,
+            'flag_reason': reason,
+            'flag_date': datetime.date.today().isoformat(),
+            'resolved': False,
+            'id': None,
+        }
+        if self.database is not None:
+            flag['id'] = self.database.add_flag(submission_id, reason, flag_date=flag['flag_date'])
+        self.flags[(submission_id, name)] = flag
+
+    def open_flags(self) -> list:
+        """Returns the unresolved outlier flags."""
+        return [flag for flag in self.flags.values() if not flag['resolved']]
+
+    def consensus_record(self, ticker: str, period, period_type: str = 'annual') -> dict:
+        """
+        Returns the consensus period dictionary for one ticker-period.
+
+        The record carries 'year' (and 'quarter'), so it can be passed straight to
+        `Company.add_period_data`.
+
+        Raises:
+            ValueError: If nothing has been submitted for the ticker-period.
+        """
+        key = (ticker, period_type, period)
+        if key not in self._consensus:
+            raise ValueError(f"No submissions for {ticker} period {period}.")
+        record = dict(self._consensus[key])
+        if period_type == 'quarterly':
+            record['year'], record['quarter'] = period
+        else:
+            record['year'] = period
+        return record
+
+    def build_company(self, ticker: str, period_type: str = 'annual') -> Company:
+        """Returns a `Company` fed with the consensus record of every period of a ticker."""
+        periods = sorted(period for t, p_type, period in self._consensus
+                         if t == ticker and p_type == period_type)
+        company = Company(ticker, len(periods), period_type)
+        for period in periods:
+            company.add_period_data(self.consensus_record(ticker, period, period_type))
+        return company
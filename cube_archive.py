@@ -0,0 +1,264 @@
+#!/usr/bin/python3
+
+import json
+import lzma
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from metric_cube import MetricCube, format_period, parse_period
+
+
+# One index record per stored column block:
+# day id, ticker id, metric id, byte offset, byte length, number of periods, block kind.
+INDEX_RECORD = struct.Struct('<IIIQIIB')
+FULL_BLOCK = 0
+DELTA_BLOCK = 1
+
+CODECS = {
+    'zlib': (lambda raw: zlib.compress(raw, 6), zlib.decompress),
+    'lzma': (lambda raw: lzma.compress(raw, preset=6), lzma.decompress),
+}
+
+
+def _shuffle(bits: np.ndarray) -> bytes:
+    """Groups byte 0 of every value, then byte 1, ... so runs of equal bytes compress well."""
+    return bits.view(np.uint8).reshape(-1, 8).T.tobytes()
+
+
+def _unshuffle(raw: bytes, n_periods: int) -> np.ndarray:
+    return np.frombuffer(raw, dtype=np.uint8).reshape(8, n_periods).T.copy().view('<u8').ravel()
+
+
+class CubeArchive:
+    """
+    Append-only archive of daily metric cubes.
+
+    Each day's cube is split into ticker-metric columns (one value per period). A column
+    is only written when it differs from the previous day, and then as the XOR of its bit
+    pattern against the previous day's column, byte-shuffled and compressed. Every
+    `keyframe_interval` stored blocks a column is written in full, which bounds the
+    number of blocks needed to reconstruct it. Storage therefore grows with the amount
+    of change rather than with days x universe size.
+
+    Files in the archive directory:
+        catalog.json: codec and the day, ticker, period and metric labels.
+        blocks.dat:   concatenated compressed column blocks.
+        index.dat:    fixed-size `INDEX_RECORD` entries locating each block.
+    """
+
+    def __init__(self, directory: str, codec: str = 'zlib', keyframe_interval: int = 30):
+        """
+        Opens an archive, creating it if the directory holds none.
+
+        Args:
+            directory (str): Directory holding the archive files.
+            codec (str): 'zlib' or 'lzma'; only used when creating a new archive.
+            keyframe_interval (int): Maximum number of delta blocks between full blocks of a column.
+
+        Raises:
+            ValueError: If the codec is unknown.
+        """
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        os.makedirs(directory, exist_ok=True)
+
+        catalog_path = os.path.join(directory, 'catalog.json')
+        if os.path.exists(catalog_path):
+            with open(catalog_path) as f:
+                catalog = json.load(f)
+        else:
+            catalog = {'codec': codec, 'days': [], 'tickers': [], 'periods': [], 'metrics': []}
+        if catalog['codec'] not in CODECS:
+            raise ValueError(f"Unknown codec '{catalog['codec']}', expected one of {list(CODECS)}.")
+
+        self.codec = catalog['codec']
+        self.days = catalog['days']
+        self.tickers = catalog['tickers']
+        self.periods = [parse_period(label) for label in catalog['periods']]
+        self.metrics = catalog['metrics']
+        self._ticker_index = {name: i for i, name in enumerate(self.tickers)}
+        self._period_index = {period: i for i, period in enumerate(self.periods)}
+        self._metric_index = {name: i for i, name in enumerate(self.metrics)}
+
+        # Block index: (ticker id, metric id) -> [(day id, offset, length, n_periods, kind), ...]
+        self._blocks = dict()
+        index_path = os.path.join(directory, 'index.dat')
+        if os.path.exists(index_path):
+            with open(index_path, 'rb') as f:
+                raw_index = f.read()
+            usable = len(raw_index) - len(raw_index) % INDEX_RECORD.size
+            valid = 0
+            for day_id, ticker_id, metric_id, offset, length, n_periods, kind in INDEX_RECORD.iter_unpack(raw_index[:usable]):
+                # Records past the last catalogued day come from an interrupted append
+                if day_id >= len(self.days):
+                    break
+                self._blocks.setdefault((ticker_id, metric_id), []).append(
+                    (day_id, offset, length, n_periods, kind))
+                valid += INDEX_RECORD.size
+            if valid != len(raw_index):
+                with open(index_path, 'r+b') as f:
+                    f.truncate(valid)
+
+        self._latest = None
+        self._deltas_since_full = dict()
+
+    # --- Writing ------------------------------------------------------------
+
+    def append(self, day: str, cube: MetricCube):
+        """
+        Archives one day's cube.
+
+        Args:
+            day (str): ISO date of the cube; must be later than every archived day.
+            cube (MetricCube): The day's cube.
+
+        Raises:
+            ValueError: If `day` is not after the last archived day.
+        """
+        if self.days and day <= self.days[-1]:
+            raise ValueError(f"Day {day} is not after the last archived day {self.days[-1]}.")
+
+        latest = self._load_latest()
+        for name in cube.tickers:
+            self._register(name, self.tickers, self._ticker_index)
+        for period in cube.periods:
+            self._register(period, self.periods, self._period_index)
+        for name in cube.metrics:
+            self._register(name, self.metrics, self._metric_index)
+
+        # Align the day's cube to the archive's label space; absent cells are NaN
+        aligned = np.full((len(self.tickers), len(self.periods), len(self.metrics)), np.nan)
+        ticker_ids = np.array([self._ticker_index[name] for name in cube.tickers], dtype=np.intp)
+        period_ids = np.array([self._period_index[period] for period in cube.periods], dtype=np.intp)
+        metric_ids = np.array([self._metric_index[name] for name in cube.metrics], dtype=np.intp)
+        aligned[np.ix_(ticker_ids, period_ids, metric_ids)] = cube.data
+
+        previous = np.full(aligned.shape, np.nan)
+        previous[:latest.shape[0], :latest.shape[1], :latest.shape[2]] = latest
+
+        current_bits = aligned.view('<u8')
+        previous_bits = previous.view('<u8')
+        changed = np.argwhere((current_bits != previous_bits).any(axis=1))
+
+        day_id = len(self.days)
+        n_periods = len(self.periods)
+        compress = CODECS[self.codec][0]
+        blocks_path = os.path.join(self.directory, 'blocks.dat')
+        records = list()
+        with open(blocks_path, 'ab') as blocks:
+            offset = blocks.tell()
+            for ticker_id, metric_id in changed:
+                key = (int(ticker_id), int(metric_id))
+                column = np.ascontiguousarray(current_bits[ticker_id, :, metric_id])
+                if self._deltas_since_full.get(key, self.keyframe_interval) >= self.keyframe_interval:
+                    kind = FULL_BLOCK
+                    payload = column
+                    self._deltas_since_full[key] = 0
+                else:
+                    kind = DELTA_BLOCK
+                    payload = column ^ previous_bits[ticker_id, :, metric_id]
+                    self._deltas_since_full[key] += 1
+                raw = compress(_shuffle(payload))
+                blocks.write(raw)
+                entry = (day_id, offset, len(raw), n_periods, kind)
+                records.append(INDEX_RECORD.pack(day_id, key[0], key[1], offset, len(raw), n_periods, kind))
+                self._blocks.setdefault(key, []).append(entry)
+                offset += len(raw)
+
+        with open(os.path.join(self.directory, 'index.dat'), 'ab') as index:
+            index.write(b''.join(records))
+
+        self.days.append(day)
+        self._write_catalog()
+        self._latest = aligned
+
+    def _register(self, label, labels: list, index: dict):
+        if label not in index:
+            index[label] = len(labels)
+            labels.append(label)
+
+    def _write_catalog(self):
+        catalog = {
+            'codec': self.codec,
+            'days': self.days,
+            'tickers': self.tickers,
+            'periods': [format_period(period) for period in self.periods],
+            'metrics': self.metrics,
+        }
+        path = os.path.join(self.directory, 'catalog.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(catalog, f)
+        os.replace(path + '.tmp', path)
+
+    def _load_latest(self) -> np.ndarray:
+        """Reconstructs the last archived cube (once per open archive) to diff against."""
+        if self._latest is None:
+            latest = np.full((len(self.tickers), len(self.periods), len(self.metrics)), np.nan)
+            for (ticker_id, metric_id), entries in self._blocks.items():
+                column = self._decode_column(entries, len(self.periods))[-1]
+                latest[ticker_id, :, metric_id] = column
+                # Count the trailing deltas so keyframes keep their spacing across reopenings
+                trailing = 0
+                for entry in reversed(entries):
+                    if entry[4] == FULL_BLOCK:
+                        break
+                    trailing += 1
+                self._deltas_since_full[(ticker_id, metric_id)] = trailing
+            self._latest = latest
+        return self._latest
+
+    # --- Reading ------------------------------------------------------------
+
+    def _decode_column(self, entries: list, n_periods: int) -> list:
+        """Replays a column's blocks, returning its value array after each block."""
+        decompress = CODECS[self.codec][1]
+        states = list()
+        bits = np.full(n_periods, np.nan).view('<u8')
+        with open(os.path.join(self.directory, 'blocks.dat'), 'rb') as blocks:
+            for _, offset, length, block_periods, kind in entries:
+                blocks.seek(offset)
+                payload = _unshuffle(decompress(blocks.read(length)), block_periods)
+                if kind == FULL_BLOCK:
+                    bits = np.full(n_periods, np.nan).view('<u8')
+                    bits[:block_periods] = payload
+                else:
+                    bits = bits.copy()
+                    bits[:block_periods] ^= payload
+                states.append(bits.view('<f8').copy())
+        return states
+
+    def history(self, ticker: str, metric_name: str) -> np.ndarray:
+        """
+        Returns the archived values of one ticker-metric without touching other columns.
+
+        Only this column's blocks are read and decompressed, so the cost depends on how
+        often the column changed, not on the size of the archive.
+
+        Returns:
+            np.ndarray: Array of shape (days, periods), aligned to `self.days` and `self.periods`.
+                        Days before the column first appeared are NaN.
+        """
+        key = (self._ticker_index[ticker], self._metric_index[metric_name])
+        entries = self._blocks.get(key, [])
+        result = np.full((len(self.days), len(self.periods)), np.nan)
+        states = self._decode_column(entries, len(self.periods))
+        for i, (entry, state) in enumerate(zip(entries, states)):
+            end = entries[i + 1][0] if i + 1 < len(entries) else len(self.days)
+            result[entry[0]:end] = state
+        return result
+
+    def load_day(self, day: str) -> np.ndarray:
+        """Reconstructs the full cube archived for `day`, aligned to the archive's labels."""
+        day_id = self.days.index(day)
+        cube = np.full((len(self.tickers), len(self.periods), len(self.metrics)), np.nan)
+        for (ticker_id, metric_id), entries in self._blocks.items():
+            upto = [entry for entry in entries if entry[0] <= day_id]
+            if not upto:
+                continue
+            # Start from the last full block at or before the day
+            start = max(i for i, entry in enumerate(upto) if entry[4] == FULL_BLOCK)
+            cube[ticker_id, :, metric_id] = self._decode_column(upto[start:], len(self.periods))[-1]
+        return cube
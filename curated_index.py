@@ -0,0 +1,240 @@
+#!/usr/bin/python3
+
+import math
+
+import numpy as np
+
+from FA import Company
+
+# Multiples are averaged harmonically (i.e. by averaging their inverse, the yield),
+# so one constituent with a near-zero denominator cannot dominate the index figure.
+HARMONIC_METRICS = ['price_to_earnings', 'price_to_book', 'price_to_sales', 'price_to_fcf', 'EV_EBIT', 'ev_to_sales']
+DEFAULT_INDEX_METRICS = ['price_to_earnings', 'price_to_book', 'ROE', 'ROA', 'net_profit_margin',
+                         'debt_to_equity', 'current_ratio']
+
+
+def capped_weights(market_caps: np.ndarray, cap: float = None) -> np.ndarray:
+    """
+    Market-cap weights with no weight above `cap`; the excess is spread pro rata over the rest.
+
+    Raises:
+        ValueError: If the cap cannot be met by the number of constituents.
+    """
+    market_caps = np.asarray(market_caps, dtype=float)
+    weights = market_caps / market_caps.sum()
+    if cap is None:
+        return weights
+    if cap * len(weights) < 1:
+        raise ValueError(f"A cap of {cap} cannot be met with {len(weights)} constituents.")
+    capped = np.zeros(len(weights), dtype=bool)
+    while True:
+        over = ~capped & (weights > cap)
+        if not over.any():
+            return weights
+        capped |= over
+        free = ~capped
+        weights = np.where(capped, cap, 0.0)
+        weights[free] = market_caps[free] / market_caps[free].sum() * (1 - cap * capped.sum())
+
+
+class _Constituent:
+    __slots__ = ('price', 'shares', 'units')
+
+    def __init__(self, price: float, shares: float, units: float):
+        self.price = price
+        self.shares = shares
+        self.units = units
+
+
+class CuratedIndex:
+    """
+    Divisor-based, optionally capped, market-cap weighted index such as the Dang Index.
+
+    level = sum(units_i * price_i) / divisor, where units are the constituent's shares
+    scaled by its capping factor. The sum is kept as a running total, so a price tick
+    moves the level in O(1). Rebalances and corporate actions change units or prices
+    without moving the level: the divisor is rescaled by the ratio of the new total to
+    the old one. `resync` recomputes the total exactly to shed accumulated rounding.
+    """
+
+    def __init__(self, name: str, base_level: float = 1000.0, weight_cap: float = None):
+        """
+        Args:
+            name (str): The index name.
+            base_level (float): Level at the first rebalance.
+            weight_cap (float): Maximum constituent weight (0-1), or None for uncapped.
+        """
+        self.name = name
+        self.base_level = base_level
+        self.weight_cap = weight_cap
+        self.divisor = None
+        self._constituents = dict()
+        self._total = 0.0
+
+    @property
+    def level(self) -> float | None:
+        """The current index level, or None before the first rebalance."""
+        return None if self.divisor is None else self._total / self.divisor
+
+    @property
+    def tickers(self) -> list:
+        return list(self._constituents)
+
+    def weights(self) -> dict:
+        """Returns {ticker: current weight}."""
+        return {ticker: c.units * c.price / self._total for ticker, c in self._constituents.items()}
+
+    def _rescale_divisor(self, old_total: float):
+        if self.divisor is not None and old_total:
+            self.divisor *= self._total / old_total
+
+    def rebalance(self, constituents: dict):
+        """
+        Replaces the constituents and recomputes capping factors, keeping the level.
+
+        Args:
+            constituents (dict): Ticker -> (price, shares outstanding).
+
+        Raises:
+            ValueError: If there are no constituents, a market cap is not positive or
+                        the weight cap cannot be met.
+        """
+        if not constituents:
+            raise ValueError("An index needs at least one constituent.")
+        tickers = list(constituents)
+        prices = np.array([constituents[t][0] for t in tickers], dtype=float)
+        shares = np.array([constituents[t][1] for t in tickers], dtype=float)
+        market_caps = prices * shares
+        if not (market_caps > 0).all():
+            raise ValueError("Constituent prices and shares must be positive.")
+
+        # Units that give the capped weights at today's prices, on today's total
+        weights = capped_weights(market_caps, self.weight_cap)
+        units = weights * market_caps.sum() / prices
+
+        old_total = self._total
+        self._constituents = {t: _Constituent(float(p), float(s), float(u))
+                              for t, p, s, u in zip(tickers, prices, shares, units)}
+        self._total = math.fsum(c.units * c.price for c in self._constituents.values())
+        if self.divisor is None:
+            self.divisor = self._total / self.base_level
+        else:
+            self._rescale_divisor(old_total)
+
+    def tick(self, ticker: str, price: float) -> float | None:
+        """
+        Moves one constituent's price; returns the new level, or None if the ticker is not a constituent.
+        """
+        c = self._constituents.get(ticker)
+        if c is None:
+            return None
+        self._total += c.units * (price - c.price)
+        c.price = price
+        return self._total / self.divisor
+
+    def _adjust(self, ticker: str, price: float = None, units: float = None, shares: float = None):
+        c = self._constituents.get(ticker)
+        if c is None:
+            raise ValueError(f"{ticker} is not a constituent of {self.name}.")
+        old_total = self._total
+        new_price = c.price if price is None else price
+        new_units = c.units if units is None else units
+        self._total += new_units * new_price - c.units * c.price
+        c.price, c.units = new_price, new_units
+        if shares is not None:
+            c.shares = shares
+        self._rescale_divisor(old_total)
+
+    def split(self, ticker: str, ratio: float):
+        """Applies a stock split (or bonus issue) of `ratio` new shares per old share."""
+        c = self._constituents.get(ticker)
+        if c is None:
+            raise ValueError(f"{ticker} is not a constituent of {self.name}.")
+        self._adjust(ticker, price=c.price / ratio, units=c.units * ratio, shares=c.shares * ratio)
+
+    def change_shares(self, ticker: str, shares: float):
+        """Applies a share issuance or buyback; the capping factor is kept until the next rebalance."""
+        c = self._constituents.get(ticker)
+        if c is None:
+            raise ValueError(f"{ticker} is not a constituent of {self.name}.")
+        self._adjust(ticker, units=c.units * shares / c.shares, shares=shares)
+
+    def special_dividend(self, ticker: str, amount: float):
+        """Marks a constituent's price down by a per-share special dividend on the ex-date."""
+        c = self._constituents.get(ticker)
+        if c is None:
+            raise ValueError(f"{ticker} is not a constituent of {self.name}.")
+        self._adjust(ticker, price=c.price - amount)
+
+    def resync(self) -> float | None:
+        """Recomputes the running total exactly; returns the level."""
+        self._total = math.fsum(c.units * c.price for c in self._constituents.values())
+        return self.level
+
+    def fundamentals(self, companies: dict[str, Company], metrics: list = None) -> dict:
+        """
+        Aggregates the constituents' latest-period metrics from `Company.output`.
+
+        `HARMONIC_METRICS` are weighted harmonic means; other metrics are weighted means.
+        Constituents missing a metric are left out and the remaining weights renormalised.
+
+        Args:
+            companies (dict): Ticker -> `Company` whose metrics have been calculated.
+            metrics (list): Metric names; `DEFAULT_INDEX_METRICS` if None.
+
+        Returns:
+            dict: Metric name -> index value, or None if no constituent has it.
+        """
+        metrics = DEFAULT_INDEX_METRICS if metrics is None else metrics
+        weights = self.weights()
+        latest = dict()
+        for ticker in weights:
+            company = companies.get(ticker)
+            if company is not None and company.output:
+                latest[ticker] = company.output[max(company.output)]
+
+        result = dict()
+        for name in metrics:
+            pairs = [(weights[t], output.get(name)) for t, output in latest.items()
+                     if isinstance(output.get(name), (int, float))]
+            if name in HARMONIC_METRICS:
+                pairs = [(w, v) for w, v in pairs if v != 0]
+            total_weight = sum(w for w, _ in pairs)
+            if not pairs or total_weight == 0:
+                result[name] = None
+            elif name in HARMONIC_METRICS:
+                inverse = sum(w / v for w, v in pairs)
+                result[name] = None if inverse == 0 else round(total_weight / inverse, 2)
+            else:
+                result[name] = round(sum(w * v for w, v in pairs) / total_weight, 2)
+        return result
+
+
+class IndexEngine:
+    """Routes price ticks to every curated index holding the ticker."""
+
+    def __init__(self):
+        self.indices = dict()
+        self._membership = dict()
+
+    def add_index(self, index: CuratedIndex):
+        self.indices[index.name] = index
+        self._reindex()
+
+    def rebalance(self, name: str, constituents: dict):
+        """Rebalances one index; see `CuratedIndex.rebalance`."""
+        self.indices[name].rebalance(constituents)
+        self._reindex()
+
+    def _reindex(self):
+        self._membership = dict()
+        for index in self.indices.values():
+            for ticker in index.tickers:
+                self._membership.setdefault(ticker, []).append(index)
+
+    def tick(self, ticker: str, price: float) -> dict:
+        """Applies a price tick; returns {index name: new level} for the indices it moved."""
+        return {index.name: index.tick(ticker, price) for index in self._membership.get(ticker, ())}
+
+    def levels(self) -> dict:
+        return {name: index.level for name, index in self.indices.items()}
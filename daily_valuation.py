@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from bitemporal import BitemporalStore
+from market_data import MarketDataStore
+from metric_engine import MARKET_LINKED_METRICS, compute_metrics
+from schema import FIELDS, FIELD_IDS, FIELD_NAMES
+
+
+def _fundamental_states(statements: BitemporalStore, period_type: str) -> dict:
+    """
+    Replays the publication log into per-ticker fundamentals states.
+
+    Returns:
+        dict: Ticker -> (publication days, (states x fields) array), where state k holds
+              the latest period known after the k-th publication (restatements of that
+              period included; restatements of older periods repeat the current state).
+    """
+    events = dict()
+    for known, ticker, period, record in statements.events(period_type):
+        events.setdefault(ticker, []).append((known, period, record))
+
+    states = dict()
+    for ticker, log in events.items():
+        days = np.array([known.isoformat() for known, _, _ in log], dtype='datetime64[D]').astype(np.int64)
+        rows = np.full((len(log), len(FIELDS)), np.nan)
+        known_periods = dict()
+        for k, (_, period, record) in enumerate(log):
+            known_periods[period] = record
+            for name, value in known_periods[max(known_periods)].items():
+                rows[k, FIELD_IDS[name]] = value
+        states[ticker] = (days, rows)
+    return states
+
+
+def daily_valuations(market: MarketDataStore, statements: BitemporalStore, tickers: list = None,
+                     start=None, end=None, period_type: str = 'annual', price_source: str = 'market_cap',
+                     metrics: list = None) -> dict:
+    """
+    Computes daily valuation ratios by joining each trading day to the fundamentals known that day.
+
+    Every row of MARKET_DATA is paired with the latest period published on or before its
+    date (a searchsorted over the ticker's publication dates), and the market-linked
+    ratios of the whole universe are then computed in one vectorized pass.
+
+    Args:
+        market (MarketDataStore): Daily prices and market capitalisations.
+        statements (BitemporalStore): Statement versions keyed by publication date.
+        tickers (list): Tickers to compute; every ticker in `market` if None.
+        start, end: Inclusive date range (dates or ISO strings); unbounded if None.
+        period_type (str): Which statements to join, 'annual' or 'quarterly'.
+        price_source (str): 'market_cap' to use the stored daily market capitalisation,
+                            'close' to use close price x the statement's outstanding shares.
+        metrics (list): Names to compute; `MARKET_LINKED_METRICS` if None.
+
+    Returns:
+        dict: Ticker -> (dates, {metric: array}), arrays aligned with the datetime64 dates.
+              Days before the ticker's first publication are NaN.
+    """
+    if price_source not in ['market_cap', 'close']:
+        raise ValueError("price_source must be either 'market_cap' or 'close'.")
+    tickers = market.tickers() if tickers is None else list(tickers)
+    metrics = MARKET_LINKED_METRICS if metrics is None else metrics
+    states = _fundamental_states(statements, period_type)
+
+    # Row 0 of the stacked states is the "nothing published yet" state
+    stacked = [np.full((1, len(FIELDS)), np.nan)]
+    state_offset = 1
+    dates, prices, gathers, bounds = list(), list(), list(), dict()
+    row_offset = 0
+    for ticker in tickers:
+        rows = market.read(ticker, start, end)
+        days = rows['date'].astype(np.int64)
+        if ticker in states:
+            publication_days, ticker_states = states[ticker]
+            position = np.searchsorted(publication_days, days, 'right') - 1
+            gathers.append(np.where(position >= 0, state_offset + position, 0))
+            stacked.append(ticker_states)
+            state_offset += len(ticker_states)
+        else:
+            gathers.append(np.zeros(len(rows), dtype=np.intp))
+        dates.append(rows['date'])
+        prices.append(rows[price_source])
+        bounds[ticker] = (row_offset, row_offset + len(rows))
+        row_offset += len(rows)
+
+    if not row_offset:
+        return {ticker: (np.zeros(0, dtype='datetime64[D]'), {name: np.zeros(0) for name in metrics})
+                for ticker in tickers}
+
+    values = np.concatenate(stacked)[np.concatenate(gathers)]
+    price = np.concatenate(prices)
+    columns = {name: values[:, i] for i, name in enumerate(FIELD_NAMES) if name not in ['year', 'quarter']}
+    columns['market_cap'] = price if price_source == 'market_cap' else price * columns['outstanding_shares']
+    published = ~np.isnan(values[:, FIELD_IDS['year']])
+    results = {name: np.where(published, series, np.nan)
+               for name, series in compute_metrics(columns, metrics=metrics).items()}
+
+    all_dates = np.concatenate(dates)
+    return {ticker: (all_dates[lo:hi], {name: series[lo:hi] for name, series in results.items()})
+            for ticker, (lo, hi) in bounds.items()}
@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from FA import Company
+
+
+def _div(numerator, denominator):
+    """Element-wise division with NaN wherever the result is not finite."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    return np.where(np.isfinite(result), result, np.nan)
+
+
+def dcf_grid(columns: dict, wacc, terminal_growth, growth=0.0, years: int = 5) -> dict:
+    """
+    Discounted cash flow valuation over a WACC x terminal growth grid for many companies at once.
+
+    Free cash flow is `cash_from_opr - capex` (the basis of `price_to_fcf`); it grows at
+    `growth` for `years` explicit years, after which a Gordon growth terminal value at
+    `terminal_growth` applies. Net debt is `short_term_debt + long_term_debt -
+    cash_and_equivalent` as in `Company._calculate_ev`. The explicit years are summed as
+    a geometric series, so the result is a single broadcast over (companies, WACC, growth).
+
+    Args:
+        columns (dict): Line item name -> array of shape (companies,), NaN where not reported.
+        wacc: 1-D array of discount rates (e.g. 0.18 for 18%).
+        terminal_growth: 1-D array of terminal growth rates.
+        growth: Explicit-period FCF growth, scalar or one value per company.
+        years (int): Number of explicit forecast years.
+
+    Returns:
+        dict: 'enterprise_value', 'equity_value', 'value_per_share' and 'upside' (percent
+              versus the market price implied by `market_cap`), each of shape
+              (companies, len(wacc), len(terminal_growth)). Cells where WACC does not
+              exceed terminal growth, or inputs are missing, are NaN.
+    """
+    def column(name, default):
+        values = columns.get(name)
+        if values is None:
+            return np.asarray(default, dtype=float)
+        return np.where(np.isnan(values), default, np.asarray(values, dtype=float))
+
+    fcf = (np.asarray(columns.get('cash_from_opr', np.nan), dtype=float) - column('capex', 0))[:, None, None]
+    net_debt = (column('short_term_debt', 0) + column('long_term_debt', 0) - column('cash_and_equivalent', 0))
+    net_debt = np.broadcast_to(net_debt, fcf.shape[:1])[:, None, None]
+    shares = np.asarray(columns.get('outstanding_shares', np.nan), dtype=float)[:, None, None]
+    market_cap = np.asarray(columns.get('market_cap', np.nan), dtype=float)[:, None, None]
+    g = np.broadcast_to(np.asarray(growth, dtype=float), fcf.shape[:1])[:, None, None]
+    w = np.asarray(wacc, dtype=float)[None, :, None]
+    tg = np.asarray(terminal_growth, dtype=float)[None, None, :]
+
+    # Sum over t = 1..years of fcf * q^t with q = (1 + g) / (1 + w)
+    q = (1 + g) / (1 + w)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        series = np.where(np.isclose(q, 1), years, q * (1 - q ** years) / (1 - q))
+    explicit = fcf * series
+    final_fcf = fcf * (1 + g) ** years
+    terminal = np.where(w > tg, _div(final_fcf * (1 + tg), w - tg), np.nan) / (1 + w) ** years
+
+    enterprise_value = explicit + terminal
+    equity_value = enterprise_value - net_debt
+    value_per_share = _div(equity_value, shares)
+    upside = (_div(value_per_share, _div(market_cap, shares)) - 1) * 100
+    return {'enterprise_value': enterprise_value, 'equity_value': equity_value,
+            'value_per_share': value_per_share, 'upside': upside}
+
+
+def _previous_quarter(period: tuple) -> tuple:
+    year, quarter = period
+    return (year - 1, 4) if quarter == 1 else (year, quarter - 1)
+
+
+def company_dcf(companies: list[Company], wacc, terminal_growth, growth=0.0, years: int = 5) -> tuple:
+    """
+    Runs `dcf_grid` on the latest period of each company.
+
+    For a quarterly company, free cash flow is the trailing twelve months: the sum of
+    `cash_from_opr` and `capex` over the latest four consecutive quarters (NaN if any is
+    missing), while net debt, shares and market cap come from the latest quarter.
+
+    Returns:
+        tuple: (tickers, results) with results as returned by `dcf_grid`.
+    """
+    names = ['cash_from_opr', 'capex', 'short_term_debt', 'long_term_debt', 'cash_and_equivalent',
+             'outstanding_shares', 'market_cap']
+    tickers, latest = list(), list()
+    for company in companies:
+        if not company.financial_inputs:
+            continue
+        inputs = {fi['_period']: fi for fi in company.financial_inputs}
+        last = inputs[max(inputs)]
+        row = {name: last.get(name, np.nan) for name in names}
+        if company.period_type == 'quarterly':
+            quarters = [max(inputs)]
+            for _ in range(3):
+                quarters.append(_previous_quarter(quarters[-1]))
+            records = [inputs.get(period) for period in quarters]
+            complete = all(fi is not None and 'cash_from_opr' in fi for fi in records)
+            row['cash_from_opr'] = sum(fi['cash_from_opr'] for fi in records) if complete else np.nan
+            row['capex'] = sum(fi.get('capex', 0) for fi in records) if complete else np.nan
+        tickers.append(company.company_name)
+        latest.append(row)
+    columns = {name: np.array([row[name] for row in latest], dtype=float) for name in names}
+    return tickers, dcf_grid(columns, wacc, terminal_growth, growth, years)
@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from bitemporal import as_date
+from market_data import MarketDataStore
+
+
+def _worst(row_sum: float, row_max: float, row_min: float, side: float) -> float:
+    """Worst aspect ratio of a row of rectangles laid along a side of length `side`."""
+    return max(side * side * row_max / (row_sum * row_sum), row_sum * row_sum / (side * side * row_min))
+
+
+def squarify(sizes: list, x: float, y: float, width: float, height: float) -> list:
+    """
+    Squarified treemap layout (Bruls, Huizing and van Wijk).
+
+    Args:
+        sizes (list): Positive sizes, sorted in descending order.
+        x, y, width, height: The rectangle to fill.
+
+    Returns:
+        list: One (x, y, width, height) rectangle per size, areas proportional to the sizes.
+    """
+    total = float(sum(sizes))
+    if not sizes or total <= 0:
+        return []
+    areas = [size * width * height / total for size in sizes]
+    rects = list()
+    i = 0
+    while i < len(areas):
+        side = min(width, height)
+        row_sum = row_max = row_min = areas[i]
+        j = i + 1
+        # Grow the row while that improves its worst aspect ratio
+        while j < len(areas):
+            candidate = areas[j]
+            if _worst(row_sum + candidate, max(row_max, candidate), min(row_min, candidate), side) \
+                    > _worst(row_sum, row_max, row_min, side):
+                break
+            row_sum += candidate
+            row_max, row_min = max(row_max, candidate), min(row_min, candidate)
+            j += 1
+
+        if width >= height:
+            # Column along the left edge
+            column_width = row_sum / height
+            offset = y
+            for area in areas[i:j]:
+                rects.append((x, offset, column_width, area / column_width))
+                offset += area / column_width
+            x, width = x + column_width, width - column_width
+        else:
+            # Row along the top edge
+            row_height = row_sum / width
+            offset = x
+            for area in areas[i:j]:
+                rects.append((offset, y, area / row_height, row_height))
+                offset += area / row_height
+            y, height = y + row_height, height - row_height
+        i = j
+    return rects
+
+
+def aggregate(tickers: list, sectors: list, previous_close, close, market_cap, volume) -> tuple:
+    """
+    Per-ticker and per-sector heatmap figures in one grouped pass.
+
+    Tickers are sorted by sector once and every sector total is a `np.add.reduceat`
+    over the sorted arrays.
+
+    Args:
+        tickers, sectors (list): Ticker names and their sectors, aligned.
+        previous_close, close, market_cap, volume: Aligned arrays; the return is close
+            over previous close.
+
+    Returns:
+        tuple: (ticker_rows, sector_rows), each a list of dicts. Ticker rows carry the
+               return in percent, market-cap weight in the whole market and within the
+               sector, and volume; sector rows carry the cap-weighted return, market-cap
+               weight, total market cap and volume.
+    """
+    sectors = np.asarray(sectors, dtype=object)
+    previous_close = np.asarray(previous_close, dtype=float)
+    close = np.asarray(close, dtype=float)
+    market_cap = np.asarray(market_cap, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    if not len(sectors):
+        return [], []
+
+    order = np.argsort(sectors, kind='stable')
+    sorted_sectors = sectors[order]
+    starts = np.flatnonzero(np.r_[True, sorted_sectors[1:] != sorted_sectors[:-1]])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = (close / previous_close - 1) * 100
+    returns = np.where(np.isfinite(returns), returns, np.nan)
+    valid = ~np.isnan(returns)
+
+    caps = market_cap[order]
+    sector_caps = np.add.reduceat(caps, starts)
+    sector_volume = np.add.reduceat(volume[order], starts)
+    weighted = np.add.reduceat(np.where(valid[order], caps * returns[order], 0.0), starts)
+    weighted_caps = np.add.reduceat(np.where(valid[order], caps, 0.0), starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sector_returns = np.where(weighted_caps > 0, weighted / weighted_caps, np.nan)
+    market_total = caps.sum()
+
+    sector_of_row = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(caps)]))
+    within = np.empty(len(caps))
+    within[order] = caps / sector_caps[sector_of_row]
+
+    ticker_rows = [{'ticker': tickers[i], 'sector': sectors[i], 'return': float(returns[i]),
+                    'weight': float(market_cap[i] / market_total), 'sector_weight': float(within[i]),
+                    'market_cap': float(market_cap[i]), 'volume': float(volume[i])}
+                   for i in range(len(sectors))]
+    sector_rows = [{'sector': sorted_sectors[start], 'return': float(sector_returns[k]),
+                    'weight': float(sector_caps[k] / market_total), 'market_cap': float(sector_caps[k]),
+                    'volume': float(sector_volume[k])}
+                   for k, start in enumerate(starts)]
+    return ticker_rows, sector_rows
+
+
+class HeatmapEngine:
+    """
+    Sector heatmap of NGX gainers and losers, served as ready geometry.
+
+    Each `update` replaces the snapshot and bumps `version`; treemap layouts (sectors
+    sized by market cap, tickers nested inside) are cached per (version, width, height),
+    so every client of a snapshot shares one layout computation.
+    """
+
+    def __init__(self, sectors: dict):
+        """
+        Args:
+            sectors (dict): Ticker -> sector, e.g. from the COMPANIES table.
+        """
+        self.sectors = dict(sectors)
+        self.version = 0
+        self.tickers = list()
+        self.sector_rows = list()
+        self._layouts = dict()
+
+    def update(self, tickers: list, previous_close, close, market_cap, volume) -> int:
+        """Aggregates a new snapshot (intraday prices or a daily close); returns its version."""
+        sectors = [self.sectors.get(ticker, 'Other') for ticker in tickers]
+        self.tickers, self.sector_rows = aggregate(tickers, sectors, previous_close, close, market_cap, volume)
+        self.version += 1
+        self._layouts = dict()
+        return self.version
+
+    def update_daily(self, market: MarketDataStore, date) -> int:
+        """
+        Aggregates the day's close against the previous trading day for every ticker in `sectors`.
+
+        Each ticker costs two as-of lookups (one chunk each), not a read of its history.
+        Tickers with no row on `date` (suspended or not yet listed) are left out rather
+        than shown with an older move.
+        """
+        day = date if isinstance(date, np.datetime64) else np.datetime64(as_date(date), 'D')
+        day = day.astype('datetime64[D]')
+        tickers, columns = list(), list()
+        for ticker in self.sectors:
+            today = market.as_of(ticker, day)
+            if today is None or today['date'] != day:
+                continue
+            previous = market.as_of(ticker, day - 1)
+            if previous is not None:
+                tickers.append(ticker)
+                columns.append((previous['close'], today['close'], today['market_cap'], today['volume']))
+        previous_close, close, market_cap, volume = (np.array(c, dtype=float) for c in zip(*columns)) \
+            if columns else ([], [], [], [])
+        return self.update(tickers, previous_close, close, market_cap, volume)
+
+    def layout(self, width: float = 1.0, height: float = 1.0) -> list:
+        """
+        Returns the treemap for the current snapshot.
+
+        Returns:
+            list: One dict per sector with its rectangle (x, y, w, h), figures and a
+                  'tickers' list of nested rectangles and figures.
+        """
+        key = (self.version, width, height)
+        if key not in self._layouts:
+            sectors = sorted((row for row in self.sector_rows if row['market_cap'] > 0),
+                             key=lambda row: row['market_cap'], reverse=True)
+            by_sector = dict()
+            for row in self.tickers:
+                if row['market_cap'] > 0:
+                    by_sector.setdefault(row['sector'], []).append(row)
+
+            geometry = list()
+            for row, (x, y, w, h) in zip(sectors, squarify([r['market_cap'] for r in sectors], 0, 0, width, height)):
+                members = sorted(by_sector[row['sector']], key=lambda r: r['market_cap'], reverse=True)
+                rects = squarify([m['market_cap'] for m in members], x, y, w, h)
+                geometry.append(dict(row, x=x, y=y, w=w, h=h, tickers=[
+                    dict(member, x=mx, y=my, w=mw, h=mh) for member, (mx, my, mw, mh) in zip(members, rects)]))
+            self._layouts[key] = geometry
+        return self._layouts[key]
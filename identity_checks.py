@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+
+class IdentityCheck:
+    """
+    An accounting identity of the form sum(coefficient * line item) == 0.
+
+    A row passes when the absolute residual is within `tolerance` times the size of
+    the reference line item (or 1 currency unit, whichever is larger). Rows missing
+    any of the line items involved are not checked.
+    """
+
+    __slots__ = ('name', 'bit', 'terms', 'reference', 'tolerance')
+
+    def __init__(self, name: str, bit: int, terms: dict, reference: str, tolerance: float = 0.01):
+        """
+        Args:
+            name (str): Identifier used in error messages and tolerance overrides.
+            bit (int): Bit position of this check in the failure bitmask.
+            terms (dict): Line item name -> coefficient (+1 or -1).
+            reference (str): Line item whose magnitude scales the tolerance.
+            tolerance (float): Allowed relative residual.
+        """
+        self.name = name
+        self.bit = bit
+        self.terms = terms
+        self.reference = reference
+        self.tolerance = tolerance
+
+    def __repr__(self):
+        equation = ' '.join(f"{'+' if sign > 0 else '-'} {name}" for name, sign in self.terms.items())
+        return f"IdentityCheck('{self.name}', 0 = {equation.lstrip('+ ')})"
+
+
+DEFAULT_CHECKS = (
+    IdentityCheck('balance_sheet', 0,
+                  {'asset': 1, 'liabilities': -1, 'book_value': -1}, 'asset'),
+    IdentityCheck('asset_split', 1,
+                  {'asset': 1, 'current_asset': -1, 'non_current_asset': -1}, 'asset'),
+    IdentityCheck('liability_split', 2,
+                  {'liabilities': 1, 'current_liabilities': -1, 'non_current_liabilities': -1}, 'liabilities'),
+    IdentityCheck('gross_profit', 3,
+                  {'gross_profit': 1, 'revenue': -1, 'COGS': 1}, 'revenue'),
+)
+
+
+class IdentityChecker:
+    """
+    Evaluates accounting identities over a whole batch with array operations.
+
+    The checks are compiled once into column indices and coefficient vectors for a
+    given field layout, so each call is a handful of vectorized operations per check
+    regardless of the number of rows.
+    """
+
+    def __init__(self, field_ids: dict, checks: tuple = DEFAULT_CHECKS, tolerances: dict = None):
+        """
+        Args:
+            field_ids (dict): Line item name -> column index in the value matrices to be checked.
+            checks (tuple): The `IdentityCheck`s to evaluate.
+            tolerances (dict): Optional check name -> relative tolerance overriding the check's own.
+
+        Raises:
+            ValueError: If a check refers to an unknown line item or an unknown check is overridden.
+        """
+        tolerances = tolerances or {}
+        unknown = set(tolerances) - {check.name for check in checks}
+        if unknown:
+            raise ValueError(f"Tolerances given for unknown checks: {sorted(unknown)}.")
+
+        self.checks = checks
+        self._compiled = list()
+        for check in checks:
+            missing = [name for name in list(check.terms) + [check.reference] if name not in field_ids]
+            if missing:
+                raise ValueError(f"Check '{check.name}' uses unknown line items {missing}.")
+            columns = np.array([field_ids[name] for name in check.terms], dtype=np.intp)
+            coefficients = np.array(list(check.terms.values()), dtype=float)
+            tolerance = tolerances.get(check.name, check.tolerance)
+            self._compiled.append((check, columns, coefficients, field_ids[check.reference], tolerance))
+
+    def check(self, values: np.ndarray) -> np.ndarray:
+        """
+        Checks every row of a (rows x fields) matrix, with NaN marking absent line items.
+
+        Returns:
+            np.ndarray: uint32 bitmask per row; bit `check.bit` is set when that check fails.
+        """
+        mask = np.zeros(values.shape[0], dtype=np.uint32)
+        for check, columns, coefficients, reference, tolerance in self._compiled:
+            residual = np.abs(values[:, columns] @ coefficients)
+            limit = tolerance * np.maximum(np.abs(values[:, reference]), 1.0)
+            # NaN residuals (absent line items) compare False and are left unflagged
+            with np.errstate(invalid='ignore'):
+                failed = residual > limit
+            mask[failed] |= np.uint32(1 << check.bit)
+        return mask
+
+    def describe(self, mask_value: int) -> list:
+        """Returns the names of the checks set in one row's bitmask."""
+        return [check.name for check in self.checks if int(mask_value) & (1 << check.bit)]
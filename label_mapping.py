@@ -0,0 +1,231 @@
+#!/usr/bin/python3
+
+import difflib
+import re
+
+from schema import ALIASES, FIELD_NAMES
+
+
+# Statement labels seen in NGX filings, keyed by the line item names `FA.py` reads.
+LABEL_SYNONYMS = {
+    'revenue': ['revenue', 'revenues', 'total revenue', 'turnover', 'sales', 'net sales', 'gross earnings',
+                'revenue from contracts with customers'],
+    'COGS': ['cost of sales', 'cost of goods sold', 'cost of revenue', 'cost of sale'],
+    'gross_profit': ['gross profit'],
+    'operating_income': ['operating profit', 'operating income', 'profit from operations',
+                         'results from operating activities', 'ebit'],
+    'depreciation': ['depreciation', 'depreciation and amortisation', 'depreciation and amortization'],
+    'EBITDA': ['ebitda'],
+    'finance_income': ['finance income', 'interest income', 'investment income'],
+    'finance_cost': ['finance cost', 'finance costs', 'interest expense', 'finance charges'],
+    'profit_bfor_tax': ['profit before tax', 'profit before taxation', 'income before tax',
+                        'profit before income tax', 'pbt'],
+    'tax_expense': ['tax expense', 'income tax expense', 'taxation', 'income tax'],
+    'net_profit': ['profit for the year', 'profit for the period', 'net profit', 'profit after tax',
+                   'profit after taxation', 'net income'],
+    'outstanding_shares': ['number of shares', 'shares outstanding', 'outstanding shares',
+                           'number of ordinary shares', 'weighted average number of shares'],
+    'asset': ['total assets'],
+    'non_current_asset': ['total non current assets', 'non current assets'],
+    'PPE': ['property plant and equipment', 'ppe'],
+    'current_asset': ['total current assets', 'current assets'],
+    'cash_and_equivalent': ['cash and cash equivalents', 'cash and bank balances', 'cash and short term deposits'],
+    'mktble_securities': ['marketable securities', 'short term investments', 'financial assets at fair value'],
+    'trade_recv': ['trade and other receivables', 'trade receivables', 'accounts receivable'],
+    'inventory': ['inventories', 'inventory', 'stocks'],
+    'liabilities': ['total liabilities'],
+    'current_liabilities': ['total current liabilities', 'current liabilities'],
+    'trade_payables': ['trade and other payables', 'trade payables', 'accounts payable'],
+    'short_term_debt': ['short term borrowings', 'current borrowings', 'borrowings current',
+                        'loans and borrowings current', 'bank overdraft'],
+    'non_current_liabilities': ['total non current liabilities', 'non current liabilities'],
+    'long_term_debt': ['long term borrowings', 'non current borrowings', 'borrowings non current',
+                       'loans and borrowings non current'],
+    'book_value': ['total equity', 'shareholders equity', 'shareholders funds', 'equity attributable to owners'],
+    'retained_earnings': ['retained earnings', 'revenue reserve', 'retained profit'],
+    'cash_from_opr': ['net cash from operating activities', 'cash generated from operations',
+                      'net cash generated from operating activities', 'net cash used in operating activities',
+                      'cash flows from operating activities'],
+    'capex': ['purchase of property plant and equipment', 'capital expenditure', 'acquisition of property plant and equipment'],
+    'cash_from_invst': ['net cash used in investing activities', 'net cash from investing activities',
+                        'cash flows from investing activities'],
+    'cash_from_finance': ['net cash used in financing activities', 'net cash from financing activities',
+                          'cash flows from financing activities'],
+    'market_cap': ['market capitalisation', 'market capitalization', 'market cap'],
+}
+
+# Word-level synonyms applied before matching, so spelling and plural variants share a path.
+TOKEN_SYNONYMS = {
+    '&': 'and',
+    'receivables': 'receivable',
+    'payables': 'payable',
+    'costs': 'cost',
+    'expenses': 'expense',
+    'taxation': 'tax',
+    'taxes': 'tax',
+    'equivalents': 'equivalent',
+    'inventories': 'inventory',
+    'borrowings': 'borrowing',
+    'loans': 'loan',
+    'assets': 'asset',
+    'liabilities': 'liability',
+    'activities': 'activity',
+    'shareholders': 'shareholder',
+    'revenues': 'revenue',
+    'amortisation': 'amortization',
+    'capitalisation': 'capitalization',
+    'noncurrent': 'non current',
+    'shortterm': 'short term',
+    'longterm': 'long term',
+}
+
+# Words that never change which line item a label refers to. 'net' and 'total' are
+# kept: "Net assets" and "Total assets" are different line items.
+STOP_WORDS = frozenset(['the', 'of', 'a', 'an'])
+
+# Trailing phrases that only qualify the reporting date or period. A label that is a
+# known synonym followed by one of these maps to that synonym's line item; any other
+# extra words leave the label unmatched for review.
+TRAILING_QUALIFIERS = ['for the year', 'for the period', 'for the year ended', 'for the period ended',
+                       'at end of year', 'at end of period', 'at the end of the year',
+                       'at the end of the period', 'at year end', 'at period end']
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|&")
+
+
+def normalize_tokens(label: str) -> tuple:
+    """Lower-cases a label, splits it into words and applies `TOKEN_SYNONYMS` and `STOP_WORDS`."""
+    tokens = list()
+    for token in _TOKEN_PATTERN.findall(label.lower()):
+        for word in TOKEN_SYNONYMS.get(token, token).split():
+            if word not in STOP_WORDS:
+                tokens.append(word)
+    return tuple(tokens)
+
+
+class LabelMapper:
+    """
+    Maps free-form statement labels onto the line item keys `Company.add_period_data` expects.
+
+    Labels are normalized to word tuples and looked up in a token trie built from
+    `LABEL_SYNONYMS` and the canonical names. A label matches if it is a trie path,
+    optionally followed by one of `TRAILING_QUALIFIERS`; otherwise fuzzy matching
+    against phrases with the same number of words catches spelling variants. Anything
+    else is left unmatched rather than guessed. Every distinct normalized label is
+    resolved once and memoized.
+    """
+
+    _KEY = object()
+
+    def __init__(self, synonyms: dict = LABEL_SYNONYMS, fuzzy_cutoff: float = 0.85):
+        """
+        Args:
+            synonyms (dict): Line item name -> list of labels that mean it.
+            fuzzy_cutoff (float): Minimum similarity (0-1) of every word accepted from fuzzy matching.
+        """
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._trie = dict()
+        # Word count -> {normalized phrase: line item}, so fuzzy matching cannot absorb extra words
+        self._phrases = dict()
+        self._qualifiers = frozenset(normalize_tokens(qualifier) for qualifier in TRAILING_QUALIFIERS)
+        self._cache = dict()
+
+        phrases = [(name, name.replace('_', ' ')) for name in FIELD_NAMES]
+        phrases += [(ALIASES[alias], alias.replace('_', ' ')) for alias in ALIASES]
+        phrases += [(name, label) for name, labels in synonyms.items() for label in labels]
+        for name, label in phrases:
+            self.add_synonym(label, name)
+
+    def add_synonym(self, label: str, name: str):
+        """
+        Teaches the mapper that `label` means line item `name`.
+
+        Raises:
+            ValueError: If `name` is not a canonical line item.
+        """
+        if name not in FIELD_NAMES:
+            raise ValueError(f"'{name}' is not a canonical line item.")
+        tokens = normalize_tokens(label)
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[self._KEY] = name
+        self._phrases.setdefault(len(tokens), {})[' '.join(tokens)] = name
+        self._cache.clear()
+
+    def map_label(self, label: str) -> str | None:
+        """Returns the line item key for one label, or None if it cannot be matched."""
+        tokens = normalize_tokens(label)
+        if tokens in self._cache:
+            return self._cache[tokens]
+
+        name = None
+        node = self._trie
+        for i, token in enumerate(tokens):
+            node = node.get(token)
+            if node is None:
+                break
+            if self._KEY in node and tokens[i + 1:] in self._qualifiers:
+                name = node[self._KEY]
+        else:
+            name = node.get(self._KEY, name)
+
+        if name is None and tokens:
+            name = self._fuzzy_match(tokens)
+
+        self._cache[tokens] = name
+        return name
+
+    def _fuzzy_match(self, tokens: tuple) -> str | None:
+        """
+        Matches a misspelt label against phrases with the same number of words.
+
+        Every word must be similar to its counterpart, so "operating" never matches
+        "investing" just because the rest of the label is identical.
+        """
+        best_name, best_score = None, self.fuzzy_cutoff
+        for phrase, name in self._phrases.get(len(tokens), {}).items():
+            score = min(difflib.SequenceMatcher(None, token, word).ratio()
+                        for token, word in zip(tokens, phrase.split()))
+            if score >= best_score:
+                best_name, best_score = name, score
+        return best_name
+
+    def map_labels(self, labels: list) -> tuple:
+        """
+        Maps many labels at once.
+
+        Returns:
+            tuple: ({label: line item key}, [unmatched labels]).
+        """
+        mapping = dict()
+        unmatched = list()
+        for label in labels:
+            name = self.map_label(label)
+            if name is None:
+                unmatched.append(label)
+            else:
+                mapping[label] = name
+        return mapping, unmatched
+
+    def map_statement(self, statement: dict) -> tuple:
+        """
+        Converts {label: value} from an imported statement into a period dictionary.
+
+        When several labels map to the same line item, the first one wins and the
+        others are reported as unmatched, since summing them would double count.
+
+        Returns:
+            tuple: (period dictionary for `Company.add_period_data`, [unmatched labels]).
+        """
+        finance_input = dict()
+        unmatched = list()
+        for label, value in statement.items():
+            name = self.map_label(label)
+            if name is None or name in finance_input:
+                unmatched.append(label)
+            else:
+                finance_input[name] = value
+        return finance_input, unmatched
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+
+import asyncio
+import collections
+import json
+import urllib.parse
+
+# Topics carried by the hub: curated index levels keyed by index name, and
+# market-linked valuation ratios keyed by ticker.
+TOPICS = ['index', 'valuation']
+
+
+class Subscription:
+    """
+    One subscriber's pending updates, coalesced by (topic, key).
+
+    A newer value for a key replaces the pending one in place, so a slow consumer
+    receives the latest value rather than a backlog. At most `max_pending` keys are
+    held; beyond that the oldest pending key is dropped and counted in `dropped`.
+    """
+
+    def __init__(self, topics: list, max_pending: int = 1024):
+        self.topics = frozenset(topics)
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.closed = False
+        self._pending = collections.OrderedDict()
+        self._ready = asyncio.Event()
+
+    def offer(self, topic: str, key: str, value):
+        """Queues an update without blocking."""
+        if self.closed:
+            return
+        item = (topic, key)
+        if item in self._pending:
+            self._pending[item] = value
+            return
+        if len(self._pending) >= self.max_pending:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[item] = value
+        self._ready.set()
+
+    async def next_batch(self) -> list:
+        """
+        Waits for updates and returns all pending ones as [(topic, key, value)], oldest first.
+
+        Returns an empty list once the subscription is closed.
+        """
+        while not self._pending and not self.closed:
+            self._ready.clear()
+            await self._ready.wait()
+        batch = [(topic, key, value) for (topic, key), value in self._pending.items()]
+        self._pending.clear()
+        return batch
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+
+class PubSubHub:
+    """
+    In-process fan-out of live index levels and valuation ratios.
+
+    Publishing is synchronous and never waits on a subscriber: each update is offered to
+    the bounded, coalescing `Subscription` of every subscriber of its topic, and each
+    subscriber's connection drains its own buffer at its own pace.
+    """
+
+    def __init__(self, max_pending: int = 1024):
+        self.max_pending = max_pending
+        self._subscribers = {topic: set() for topic in TOPICS}
+
+    def subscribe(self, topics: list = None) -> Subscription:
+        """
+        Raises:
+            ValueError: If a topic is unknown.
+        """
+        topics = TOPICS if topics is None else topics
+        unknown = [topic for topic in topics if topic not in self._subscribers]
+        if unknown:
+            raise ValueError(f"Unknown topics {unknown}, expected some of {TOPICS}.")
+        subscription = Subscription(topics, self.max_pending)
+        for topic in subscription.topics:
+            self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        for topic in subscription.topics:
+            self._subscribers[topic].discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(set().union(*self._subscribers.values()))
+
+    def publish(self, topic: str, key: str, value):
+        for subscription in self._subscribers[topic]:
+            subscription.offer(topic, key, value)
+
+    def publish_levels(self, levels: dict):
+        """Publishes {index name: level}, e.g. the result of `IndexEngine.tick`."""
+        for name, level in levels.items():
+            self.publish('index', name, level)
+
+    def publish_valuations(self, ticker: str, values: dict):
+        """Publishes one ticker's ratios, e.g. the result of `TickUpdater.apply`."""
+        self.publish('valuation', ticker, values)
+
+
+def format_event(topic: str, key: str, value) -> bytes:
+    """Encodes one update as a server-sent event."""
+    return f"event: {topic}\ndata: {json.dumps({'key': key, 'value': value})}\n\n".encode()
+
+
+async def _close_on_disconnect(hub: PubSubHub, subscription: Subscription, reader: asyncio.StreamReader):
+    # SSE clients send nothing after the request, so EOF means they went away
+    try:
+        while await reader.read(4096):
+            pass
+    except ConnectionError:
+        pass
+    hub.unsubscribe(subscription)
+
+
+async def _handle_sse(hub: PubSubHub, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    subscription = None
+    watcher = None
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in [b'\r\n', b'\n', b'']:
+            pass
+        parts = request_line.decode('latin-1').split()
+        url = urllib.parse.urlsplit(parts[1] if len(parts) > 1 else '/')
+        if len(parts) < 2 or parts[0] != 'GET' or url.path != '/stream':
+            writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            await writer.drain()
+            return
+        query = urllib.parse.parse_qs(url.query)
+        topics = query['topics'][0].split(',') if 'topics' in query else None
+        try:
+            subscription = hub.subscribe(topics)
+        except ValueError as error:
+            body = str(error).encode()
+            writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body)
+            await writer.drain()
+            return
+
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                     b'Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n')
+        await writer.drain()
+        watcher = asyncio.create_task(_close_on_disconnect(hub, subscription, reader))
+        while True:
+            batch = await subscription.next_batch()
+            if not batch:
+                break
+            writer.write(b''.join(format_event(*update) for update in batch))
+            # A slow client blocks here while its subscription keeps coalescing
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if subscription is not None:
+            hub.unsubscribe(subscription)
+        writer.close()
+
+
+async def serve_sse(hub: PubSubHub, host: str = '127.0.0.1', port: int = 8765) -> asyncio.Server:
+    """
+    Starts a server-sent events endpoint for the hub.
+
+    Clients connect with `GET /stream?topics=index,valuation` (all topics if omitted) and
+    receive `event: <topic>` messages whose data is {"key": ..., "value": ...} JSON.
+    """
+    return await asyncio.start_server(lambda r, w: _handle_sse(hub, r, w), host, port)
@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
 from FA import Company
+from normalization import Normalizer, ScaleDeclaration
+from schema import PeriodRecord
 import pprint
 
 if __name__ == '__main__':
@@ -8,9 +10,19 @@ if __name__ == '__main__':
     No_of_FY = int(input('Enter No of FY to be checked, (max of 5): '))
     financial_data = list()
     company = Company(company_name, No_of_FY)
+    while True:
+        scale = input('Enter the scale of the statement figures (units/thousands/millions/billions): ')
+        share_scale = input('Enter the scale of the number of shares (units/thousands/millions/billions): ')
+        try:
+            declaration = ScaleDeclaration(scale=scale.strip().lower(), share_scale=share_scale.strip().lower())
+            break
+        except ValueError as e:
+            print(f"Error in scale: {e}")
+            print("Please re-enter the scales.")
+    normalizer = Normalizer()
 # ...existing code...
-    for no in range(company.no_of_fy):
-        params = dict()
+    for no in range(company.no_of_periods):
+        params = PeriodRecord()
         print(f'Enter Financial Values for year {no + 1}: ')
         params['year'] = int(input('Enter Year: '))
         params['revenue'] = int(input('Enter Revenue: '))
@@ -20,7 +32,7 @@ if __name__ == '__main__':
        # params['deprcn_amotzn'] = int(input('Enter depreciation/amortization: '))
         params['finance_income'] = int(input('Enter finance income: '))
         params['finance_cost'] = int(input('Enter finance cost/interestexpense: '))
-        params['PBT'] = int(input('Enter profit before task: '))
+        params['profit_bfor_tax'] = int(input('Enter profit before tax: '))
         params['net_profit'] = int(input('Enter net profit: '))
         params['outstanding_shares'] = int(input('Enter total number of outstanding shares: '))
         print()
@@ -48,10 +60,14 @@ if __name__ == '__main__':
         params['cash_from_invst'] = int(input('Enter cash from investing activities: '))
         params['cash_from_finance'] = int(input('Enter cash from financial activities: '))
         print('___________')
-        params['market_cap'] = int(input('Enter market cap: '))
+        params['market_cap'] = int(input('Enter market cap (in naira): '))
           
         try:
-            company.add_params(params)
+            batch = normalizer.normalize([params], [declaration])
+            company.add_period_data(batch.records[0])
+            failed = normalizer.identity_checker.describe(batch.identity_mask[0])
+            if failed:
+                print(f"Warning: accounting identities do not hold: {', '.join(failed)}")
         except ValueError as e:
             print(f"Error adding data: {e}")
             print("Please re-enter the data for this year.")
@@ -0,0 +1,304 @@
+#!/usr/bin/python3
+
+import collections
+import datetime
+import os
+import struct
+
+import numpy as np
+
+
+# Rows of the MARKET_DATA table. Dates are days since 1970-01-01.
+MARKET_DTYPE = np.dtype([('date', 'datetime64[D]'), ('open', '<f8'), ('close', '<f8'),
+                         ('volume', '<i8'), ('market_cap', '<f8')])
+
+# Columns are stored as integers: prices in kobo, market cap in whole naira.
+COLUMN_SCALES = {'date': 1, 'open': 100, 'close': 100, 'volume': 1, 'market_cap': 1}
+
+# One index record per chunk: first date, last date, byte offset, byte length, number of rows.
+INDEX_RECORD = np.dtype([('first', '<i8'), ('last', '<i8'), ('offset', '<u8'), ('length', '<u4'), ('rows', '<u4')])
+_STREAM_LENGTH = struct.Struct('<I')
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """LEB128-encodes unsigned 64-bit integers, 7 bits per byte, lowest group first."""
+    values = np.asarray(values, dtype=np.uint64)
+    if not len(values):
+        return b''
+    n_bytes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        n_bytes += values >= np.uint64(1 << (7 * k))
+    groups = (values[:, None] >> (np.arange(10, dtype=np.uint64) * np.uint64(7))) & np.uint64(0x7f)
+    position = np.arange(10)
+    groups |= np.where(position < n_bytes[:, None] - 1, np.uint64(0x80), np.uint64(0))
+    return groups[position < n_bytes[:, None]].astype(np.uint8).tobytes()
+
+
+def decode_varints(raw: bytes) -> np.ndarray:
+    """Inverse of `encode_varints`."""
+    data = np.frombuffer(raw, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    lengths = ends - starts + 1
+    values = np.zeros(len(ends), dtype=np.uint64)
+    for k in range(int(lengths.max()) if len(lengths) else 0):
+        rows = lengths > k
+        values[rows] |= (data[starts[rows] + k] & 0x7f).astype(np.uint64) << np.uint64(7 * k)
+    return values
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    return (values >> np.uint64(1)).view(np.int64) ^ -(values & np.uint64(1)).view(np.int64)
+
+
+def _epoch_days(dates) -> np.ndarray:
+    """Converts dates, ISO strings or datetime64 values to days since 1970-01-01."""
+    dates = [d.isoformat() if isinstance(d, (datetime.date, datetime.datetime)) else d for d in np.atleast_1d(dates)]
+    return np.array(dates, dtype='datetime64[D]').astype(np.int64)
+
+
+def _encode_chunk(columns: dict) -> bytes:
+    """Encodes integer columns as per-column length-prefixed varint streams of zigzagged deltas."""
+    chunk = b''
+    for name in MARKET_DTYPE.names:
+        stream = encode_varints(_zigzag(np.diff(columns[name], prepend=0)))
+        chunk += _STREAM_LENGTH.pack(len(stream)) + stream
+    return chunk
+
+
+def _decode_chunk(raw: bytes) -> dict:
+    """Inverse of `_encode_chunk`: returns column name -> int64 array."""
+    columns = dict()
+    position = 0
+    for name in MARKET_DTYPE.names:
+        (length,) = _STREAM_LENGTH.unpack_from(raw, position)
+        position += _STREAM_LENGTH.size
+        columns[name] = np.cumsum(_unzigzag(decode_varints(raw[position:position + length])))
+        position += length
+    return columns
+
+
+def _to_rows(columns: dict) -> np.ndarray:
+    """Converts integer columns to a read-only `MARKET_DTYPE` array."""
+    rows = np.empty(len(columns['date']), dtype=MARKET_DTYPE)
+    for name in MARKET_DTYPE.names:
+        values = columns[name]
+        rows[name] = values / COLUMN_SCALES[name] if COLUMN_SCALES[name] != 1 else values
+    rows.flags.writeable = False
+    return rows
+
+
+class MarketDataStore:
+    """
+    Append-only time-series store for the MARKET_DATA table.
+
+    Each ticker has a data file of sealed chunks and an index file with one
+    `INDEX_RECORD` per chunk. Within a chunk every column is converted to integers (see
+    `COLUMN_SCALES`), delta-encoded against the previous row, zigzag-mapped and written
+    as varints, so a day of slowly moving prices costs a few bytes. Rows that do not
+    yet fill a chunk live in an open tail chunk (a small `.tail` file replaced
+    atomically on every append), so the usual one-row daily append extends the tail
+    instead of starting a new chunk; a tail is sealed into the data file once it holds
+    `chunk_size` rows. A date range read bisects the chunk index for the chunks it
+    overlaps and decodes only those; decoded chunks are cached and returned as NumPy
+    views of `MARKET_DTYPE` records.
+    """
+
+    def __init__(self, directory: str, chunk_size: int = 256, cached_chunks: int = 4096):
+        """
+        Opens a store, creating the directory if needed.
+
+        Args:
+            directory (str): Directory holding the `.dat`, `.idx` and `.tail` files of each ticker.
+            chunk_size (int): Rows per sealed chunk.
+            cached_chunks (int): Number of decoded chunks kept in memory.
+        """
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.cached_chunks = cached_chunks
+        os.makedirs(directory, exist_ok=True)
+        self._indexes = dict()
+        self._tails = dict()
+        self._cache = collections.OrderedDict()
+
+    def _path(self, ticker: str, suffix: str) -> str:
+        if not ticker or os.sep in ticker or ticker.startswith('.'):
+            raise ValueError(f"'{ticker}' is not a valid ticker.")
+        return os.path.join(self.directory, ticker + suffix)
+
+    def tickers(self) -> list:
+        """Returns the tickers that have data in the store."""
+        return sorted({os.path.splitext(name)[0] for name in os.listdir(self.directory)
+                       if name.endswith(('.idx', '.tail'))})
+
+    def _index(self, ticker: str) -> np.ndarray:
+        if ticker not in self._indexes:
+            index_path = self._path(ticker, '.idx')
+            if not os.path.exists(index_path):
+                index = np.zeros(0, dtype=INDEX_RECORD)
+            else:
+                index = np.fromfile(index_path, dtype=INDEX_RECORD,
+                                    count=os.path.getsize(index_path) // INDEX_RECORD.itemsize)
+                # Drop records whose chunk was not fully written by an interrupted append
+                data_size = os.path.getsize(self._path(ticker, '.dat')) if os.path.exists(self._path(ticker, '.dat')) else 0
+                complete = index['offset'] + index['length'] <= data_size
+                valid = int(np.argmin(complete)) if not complete.all() else len(index)
+                if valid * INDEX_RECORD.itemsize != os.path.getsize(index_path):
+                    with open(index_path, 'r+b') as f:
+                        f.truncate(valid * INDEX_RECORD.itemsize)
+                index = index[:valid]
+            self._indexes[ticker] = index
+        return self._indexes[ticker]
+
+    def _tail(self, ticker: str) -> dict:
+        """Returns the integer columns of the open tail chunk (empty if there is none)."""
+        if ticker not in self._tails:
+            tail_path = self._path(ticker, '.tail')
+            columns = {name: np.zeros(0, dtype=np.int64) for name in MARKET_DTYPE.names}
+            if os.path.exists(tail_path):
+                with open(tail_path, 'rb') as f:
+                    columns = _decode_chunk(f.read())
+                index = self._index(ticker)
+                # A tail that overlaps the index was sealed by an append interrupted before
+                # it replaced the tail, so its rows are already in the data file
+                if len(index) and len(columns['date']) and columns['date'][0] <= index['last'][-1]:
+                    os.remove(tail_path)
+                    columns = {name: values[:0] for name, values in columns.items()}
+            self._tails[ticker] = (columns, _to_rows(columns))
+        return self._tails[ticker][0]
+
+    # --- Writing ------------------------------------------------------------
+
+    def append(self, ticker: str, dates, open_, close, volume, market_cap):
+        """
+        Appends rows for one ticker.
+
+        Args:
+            ticker (str): The company ticker.
+            dates: Trading dates (dates, ISO strings or datetime64), strictly increasing
+                   and later than every stored date for the ticker.
+            open_, close: Prices in naira.
+            volume: Shares traded.
+            market_cap: Market capitalisation in naira.
+
+        Raises:
+            ValueError: If the columns differ in length, hold non-finite values, or the
+                        dates are not strictly increasing after the stored ones.
+        """
+        columns = {'date': _epoch_days(dates)}
+        for name, values in [('open', open_), ('close', close), ('volume', volume), ('market_cap', market_cap)]:
+            values = np.atleast_1d(np.asarray(values, dtype=float))
+            if len(values) != len(columns['date']):
+                raise ValueError(f"Column '{name}' has {len(values)} rows, expected {len(columns['date'])}.")
+            if not np.isfinite(values).all():
+                raise ValueError(f"Column '{name}' holds non-finite values.")
+            columns[name] = np.rint(values * COLUMN_SCALES[name]).astype(np.int64)
+
+        days = columns['date']
+        index = self._index(ticker)
+        tail = self._tail(ticker)
+        last_day = tail['date'][-1] if len(tail['date']) else index['last'][-1] if len(index) else None
+        if len(days) > 1 and (np.diff(days) <= 0).any():
+            raise ValueError("Dates must be strictly increasing.")
+        if last_day is not None and len(days) and days[0] <= last_day:
+            raise ValueError(f"Dates for {ticker} must be later than the last stored date.")
+        if not len(days):
+            return
+
+        # The open tail is extended with the new rows; every full chunk is sealed
+        columns = {name: np.concatenate([tail[name], columns[name]]) for name in MARKET_DTYPE.names}
+        days = columns['date']
+        sealed = len(days) - len(days) % self.chunk_size
+        if sealed:
+            data_path = self._path(ticker, '.dat')
+            offset = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+            records = np.zeros(sealed // self.chunk_size, dtype=INDEX_RECORD)
+            with open(data_path, 'ab') as f:
+                for n, start in enumerate(range(0, sealed, self.chunk_size)):
+                    stop = start + self.chunk_size
+                    chunk = _encode_chunk({name: values[start:stop] for name, values in columns.items()})
+                    f.write(chunk)
+                    records[n] = (days[start], days[stop - 1], offset, len(chunk), self.chunk_size)
+                    offset += len(chunk)
+            # Index records are written after their chunks, so a record never points past the data
+            with open(self._path(ticker, '.idx'), 'ab') as f:
+                f.write(records.tobytes())
+            self._indexes[ticker] = np.concatenate([index, records])
+
+        tail = {name: values[sealed:] for name, values in columns.items()}
+        tail_path = self._path(ticker, '.tail')
+        if len(tail['date']):
+            with open(tail_path + '.tmp', 'wb') as f:
+                f.write(_encode_chunk(tail))
+            os.replace(tail_path + '.tmp', tail_path)
+        elif os.path.exists(tail_path):
+            os.remove(tail_path)
+        self._tails[ticker] = (tail, _to_rows(tail))
+
+    # --- Reading ------------------------------------------------------------
+
+    def _chunk(self, ticker: str, n: int) -> np.ndarray:
+        key = (ticker, n)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        record = self._index(ticker)[n]
+        with open(self._path(ticker, '.dat'), 'rb') as f:
+            f.seek(int(record['offset']))
+            rows = _to_rows(_decode_chunk(f.read(int(record['length']))))
+
+        self._cache[key] = rows
+        if len(self._cache) > self.cached_chunks:
+            self._cache.popitem(last=False)
+        return rows
+
+    def _tail_rows(self, ticker: str) -> np.ndarray:
+        self._tail(ticker)
+        return self._tails[ticker][1]
+
+    def read(self, ticker: str, start=None, end=None) -> np.ndarray:
+        """
+        Returns a ticker's rows with start <= date <= end as a read-only `MARKET_DTYPE` array.
+
+        Only chunks overlapping the range are decoded; when the range lies in one chunk
+        the result is a view of the cached chunk. Columns are views too, e.g. `rows['close']`.
+        """
+        index = self._index(ticker)
+        tail = self._tail_rows(ticker)
+        start = None if start is None else np.datetime64(int(_epoch_days(start)[0]), 'D')
+        end = None if end is None else np.datetime64(int(_epoch_days(end)[0]), 'D')
+        first = 0 if start is None else int(np.searchsorted(index['last'], start.astype(np.int64), 'left'))
+        last = len(index) if end is None else int(np.searchsorted(index['first'], end.astype(np.int64), 'right'))
+        chunks = [self._chunk(ticker, n) for n in range(first, last)]
+        if len(tail) and (end is None or tail['date'][0] <= end):
+            chunks.append(tail)
+        if not chunks:
+            return np.zeros(0, dtype=MARKET_DTYPE)
+        if len(chunks) == 1:
+            rows = chunks[0]
+        else:
+            rows = np.concatenate(chunks)
+            rows.flags.writeable = False
+        lo = 0 if start is None else np.searchsorted(rows['date'], start, 'left')
+        hi = len(rows) if end is None else np.searchsorted(rows['date'], end, 'right')
+        return rows[lo:hi]
+
+    def as_of(self, ticker: str, date) -> np.void | None:
+        """Returns the last row on or before `date`, or None if there is none."""
+        index = self._index(ticker)
+        tail = self._tail_rows(ticker)
+        day = int(_epoch_days(date)[0])
+        if len(tail) and tail['date'][0] <= np.datetime64(day, 'D'):
+            rows = tail
+        else:
+            n = int(np.searchsorted(index['first'], day, 'right')) - 1
+            if n < 0:
+                return None
+            rows = self._chunk(ticker, n)
+        i = int(np.searchsorted(rows['date'], np.datetime64(day, 'D'), 'right')) - 1
+        return rows[i]
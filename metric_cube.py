@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+
+import os
+import struct
+import time
+
+import numpy as np
+
+from FA import Company
+
+
+# File layout: a 64 byte header followed by a C-ordered float64 array of shape
+# (tickers, periods, metrics). Labels live in three plain-text index files next
+# to the data file so readers can memmap the data without parsing anything. Each
+# write gets a random generation id, stored in the header and on the first line of
+# every index file, so a reader can tell labels and data of different writes apart.
+MAGIC = b'FACUBE01'
+VERSION = 2
+HEADER_FORMAT = '<8sIIIIQ'
+HEADER_SIZE = 64
+INDEX_SUFFIXES = ('.tickers', '.periods', '.metrics')
+# Attempts to open a cube whose files are being replaced by a concurrent write.
+OPEN_ATTEMPTS = 5
+
+
+def format_period(period) -> str:
+    """Encodes a `Company` period key (year or (year, quarter)) as a label, e.g. '2024' or '2024Q1'."""
+    if isinstance(period, tuple):
+        return f'{period[0]}Q{period[1]}'
+    return str(period)
+
+
+def parse_period(label: str):
+    """Inverse of `format_period`."""
+    if 'Q' in label:
+        year, quarter = label.split('Q')
+        return (int(year), int(quarter))
+    return int(label)
+
+
+def write_metric_cube(path: str, companies: list[Company]) -> tuple:
+    """
+    Writes the (company x period x metric) cube built from each `Company.output`.
+
+    Missing or non-numeric metric values are stored as NaN. Files are written to a
+    temporary name and moved into place one by one; the generation id they share
+    lets `MetricCube` detect (and wait out) a mix of old and new files, so readers
+    never observe a partial cube.
+
+    Args:
+        path (str): Path of the data file; index files are written alongside it.
+        companies (list): `Company` objects whose metrics have been calculated.
+
+    Returns:
+        tuple: The (tickers, periods, metrics) label lists, in cube order.
+    """
+    tickers = [company.company_name for company in companies]
+    if len(set(tickers)) != len(tickers):
+        raise ValueError("Company names must be unique to be used as cube tickers.")
+
+    periods = sorted({period for company in companies for period in company.output},
+                     key=lambda p: p if isinstance(p, tuple) else (p, 0))
+    metrics = sorted({name for company in companies
+                      for values in company.output.values() for name in values})
+    period_index = {period: i for i, period in enumerate(periods)}
+    metric_index = {name: i for i, name in enumerate(metrics)}
+
+    cube = np.full((len(tickers), len(periods), len(metrics)), np.nan)
+    for i, company in enumerate(companies):
+        for period, values in company.output.items():
+            j = period_index[period]
+            for name, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    cube[i, j, metric_index[name]] = value
+
+    generation = int.from_bytes(os.urandom(8), 'little')
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(tickers), len(periods), len(metrics), generation)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        f.write(cube.tobytes(order='C'))
+
+    labels = (tickers, [format_period(p) for p in periods], metrics)
+    for suffix, names in zip(INDEX_SUFFIXES, labels):
+        with open(path + suffix + '.tmp', 'w') as f:
+            f.write('\n'.join([f'{generation:016x}'] + names))
+
+    for suffix in INDEX_SUFFIXES:
+        os.replace(path + suffix + '.tmp', path + suffix)
+    os.replace(tmp_path, path)
+
+    return tickers, periods, metrics
+
+
+class MetricCube:
+    """
+    Read-only, memory-mapped view of a metric cube written by `write_metric_cube`.
+
+    The data is never copied into the process: every worker mapping the same file
+    shares the operating system's page cache, and slices are NumPy views.
+    """
+
+    def __init__(self, path: str):
+        """
+        Maps the cube at `path`.
+
+        Raises:
+            ValueError: If the file is not a metric cube or its index files do not match,
+                        including index files left from a different write.
+        """
+        for attempt in range(OPEN_ATTEMPTS):
+            if self._open(path):
+                break
+            time.sleep(0.01 * 2 ** attempt)
+        else:
+            raise ValueError(f"Index files and data of {path} come from different writes.")
+
+        self._ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._period_index = {period: i for i, period in enumerate(self.periods)}
+        self._metric_index = {name: i for i, name in enumerate(self.metrics)}
+
+    def _open(self, path: str) -> bool:
+        """Reads labels and maps data of one generation; returns False if the files are of mixed writes."""
+        # The data is mapped from the same open file the header was read from, so a
+        # concurrent replace cannot swap it after the generation has been checked
+        with open(path, 'rb') as data_file:
+            raw_header = data_file.read(HEADER_SIZE)
+            if len(raw_header) < struct.calcsize(HEADER_FORMAT):
+                raise ValueError(f"{path} is too short to be a metric cube.")
+            magic, version, n_tickers, n_periods, n_metrics, generation = struct.unpack_from(HEADER_FORMAT, raw_header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} metric cube.")
+
+            labels = list()
+            for suffix in INDEX_SUFFIXES:
+                with open(path + suffix) as f:
+                    lines = f.read().split('\n')
+                if lines[0] != f'{generation:016x}':
+                    return False
+                labels.append(lines[1:])
+            tickers, period_labels, metrics = labels
+            if (len(tickers), len(period_labels), len(metrics)) != (n_tickers, n_periods, n_metrics):
+                raise ValueError(f"Index files for {path} do not match the cube header.")
+
+            shape = (n_tickers, n_periods, n_metrics)
+            if 0 in shape:
+                self.data = np.empty(shape)
+            else:
+                self.data = np.memmap(data_file, dtype='<f8', mode='r', offset=HEADER_SIZE, shape=shape)
+        self.tickers, self.metrics = tickers, metrics
+        self.periods = [parse_period(label) for label in period_labels]
+        return True
+
+    @property
+    def shape(self) -> tuple:
+        return self.data.shape
+
+    def ticker(self, ticker: str) -> np.ndarray:
+        """Returns the (period x metric) view for one ticker."""
+        return self.data[self._ticker_index[ticker]]
+
+    def metric(self, metric_name: str) -> np.ndarray:
+        """Returns the (ticker x period) view for one metric."""
+        return self.data[:, :, self._metric_index[metric_name]]
+
+    def series(self, ticker: str, metric_name: str) -> np.ndarray:
+        """Returns the per-period values of one metric for one ticker."""
+        return self.data[self._ticker_index[ticker], :, self._metric_index[metric_name]]
+
+    def value(self, ticker: str, period, metric_name: str) -> float | None:
+        """Returns a single metric value, or None where the cube holds NaN."""
+        value = float(self.data[self._ticker_index[ticker], self._period_index[period],
+                                self._metric_index[metric_name]])
+        return None if np.isnan(value) else value
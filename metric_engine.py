@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+
+# Array versions of the ratios `Company.calculate_all_metrics` produces. Each
+# formula receives a getter g(name, default) that returns the line item as an
+# array, with absent values (NaN) replaced by the same default `FA.py` passes to
+# `fi.get`, so results match the per-dict calculation before rounding. Divisions
+# by zero give NaN where `Company` stores None. Results are not rounded, but two
+# values `Company` derives from its rounded (2 decimal) output are reproduced
+# from rounded values too: inventory days come from the rounded turnover, and
+# `ratio_growth` rounds both ratios before taking growth. Growth of an unrounded
+# small ratio can differ by whole percentage points (3.85% against 5.0%), so use
+# `ratio_growth` for ratios and `growth` for line items to match `Company`.
+
+def safe_div(numerator, denominator):
+    """Element-wise division with NaN wherever `Company` would store None (division by zero)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    return np.where(np.isfinite(result), result, np.nan)
+
+
+def _ev(g):
+    """Enterprise value, as in `Company._calculate_ev`."""
+    return g('market_cap', 0) + g('short_term_debt', 0) + g('long_term_debt', 0) - g('cash_and_equivalent', 0)
+
+
+def _after_tax_operating_income(g):
+    return g('operating_income', 0) * (1 - safe_div(g('tax_expense', 0), g('profit_bfor_tax', 1)))
+
+
+def _gross_profit_margin(g):
+    revenue = g('revenue', 0)
+    margin = safe_div(revenue - g('COGS', 0), revenue) * 100
+    return np.where(revenue == 0, 0.0, margin)
+
+
+def _ebitda_margin(g, has):
+    ebitda = np.where(has('EBITDA'), g('EBITDA', 0), g('operating_income', 0) + g('depreciation', 0))
+    return safe_div(ebitda, g('revenue', 1))
+
+
+METRIC_FORMULAS = {
+    'net_profit_margin': lambda g: safe_div(g('net_profit', 0), g('revenue', 1)) * 100,
+    'operating_profit_margin': lambda g: safe_div(g('operating_income', 0), g('revenue', 1)) * 100,
+    'gross_profit_margin': _gross_profit_margin,
+    'gross_profit': lambda g: g('revenue', 0) - g('COGS', 0),
+    'ROE': lambda g: safe_div(g('net_profit', 0), g('book_value', 1)) * 100,
+    'ROIC': lambda g: safe_div(_after_tax_operating_income(g),
+                           g('book_value', 1) + g('short_term_debt', 0) + g('long_term_debt', 0)
+                           - g('cash_and_equivalent', 0)) * 100,
+    'ROA': lambda g: safe_div(g('net_profit', 0), g('asset', 1)) * 100,
+    'ROCE': lambda g: safe_div(g('operating_income', 0), g('asset', 1) - g('current_liabilities', 0)) * 100,
+    'debt_to_equity': lambda g: safe_div(g('short_term_debt', 0) + g('long_term_debt', 0), g('book_value', 1)),
+    'equity_ratio': lambda g: safe_div(g('book_value', 0), g('asset', 1)),
+    'debt_to_asset': lambda g: safe_div(g('short_term_debt', 0) + g('long_term_debt', 0), g('asset', 1)),
+    'asset_turnover': lambda g: safe_div(g('revenue', 0), g('asset', 1)),
+    'current_ratio': lambda g: safe_div(g('current_asset', 0), g('current_liabilities', 1)),
+    'quick_ratio': lambda g: safe_div(g('cash_and_equivalent', 0) + g('trade_recv', 0) + g('mktble_securities', 0),
+                                  g('current_liabilities', 1)),
+    'cash_ratio': lambda g: safe_div(g('cash_and_equivalent', 0), g('current_liabilities', 1)),
+    'cash_flow_interest_coverage_ratio': lambda g: safe_div(g('cash_from_opr', 0), g('finance_cost', 1)),
+    'ocf_to_capex': lambda g: safe_div(g('cash_from_opr', 0), g('capex', 1)),
+    'operating_cash_flow_ratio': lambda g: safe_div(g('cash_from_opr', 0), g('current_liabilities', 1)),
+    'book_value_per_share': lambda g: safe_div(g('book_value', 0), g('outstanding_shares', 1)),
+    'earnings_yield': lambda g: safe_div(g('net_profit', 1), g('market_cap', 1)) * 100,
+    'price_to_earnings': lambda g: safe_div(safe_div(g('market_cap', 0), g('outstanding_shares', 1)),
+                                        safe_div(g('net_profit', 1), g('outstanding_shares', 1))),
+    'price_to_book': lambda g: safe_div(g('market_cap', 0), g('book_value', 1)),
+    'price_to_sales': lambda g: safe_div(g('market_cap', 0), g('revenue', 1)),
+    'price_to_fcf': lambda g: safe_div(g('market_cap', 0), g('cash_from_opr', 1) - g('capex', 0)),
+    'EV': _ev,
+    'EV_EBIT': lambda g: safe_div(_ev(g), g('operating_income', 1)),
+    'ev_to_sales': lambda g: safe_div(_ev(g), g('revenue', 1)),
+    'interest_burden': lambda g: safe_div(g('profit_bfor_tax', 0), g('operating_income', 1)),
+    'equity_multiplier': lambda g: safe_div(g('asset', 0), g('book_value', 1)),
+}
+
+# Formulas that also need to know whether a line item was reported at all.
+PRESENCE_FORMULAS = {
+    'ebitda_margin': _ebitda_margin,
+}
+
+# Metrics read by price ticks; everything else depends on statement data only.
+MARKET_LINKED_METRICS = ['earnings_yield', 'price_to_earnings', 'price_to_book', 'price_to_sales',
+                         'price_to_fcf', 'EV', 'EV_EBIT', 'ev_to_sales']
+
+METRIC_NAMES = (list(METRIC_FORMULAS) + list(PRESENCE_FORMULAS)
+                + ['inventory_turnover_ratio', 'inventory_days'])
+
+
+def _getter(columns: dict):
+    def g(name, default):
+        column = columns.get(name)
+        if column is None:
+            return default
+        return np.where(np.isnan(column), default, column)
+    return g
+
+
+def _presence(columns: dict):
+    def has(name):
+        column = columns.get(name)
+        return False if column is None else ~np.isnan(column)
+    return has
+
+
+def compute_metrics(columns: dict, previous: dict = None, previous_exists=None, metrics: list = None) -> dict:
+    """
+    Computes the standard ratios for every element of the given line-item arrays at once.
+
+    Args:
+        columns (dict): Line item name -> float array (any shape, NaN where not reported).
+                        Missing names are treated as not reported everywhere.
+        previous (dict): Same layout for the prior period, needed by inventory turnover.
+        previous_exists: Boolean array (or scalar) marking elements that have a prior period.
+        metrics (list): Names to compute; all of `METRIC_NAMES` if None.
+
+    Returns:
+        dict: Metric name -> float array broadcast to the shape of the inputs.
+    """
+    metrics = METRIC_NAMES if metrics is None else metrics
+    shape = np.broadcast_shapes(*(np.shape(column) for column in columns.values())) if columns else ()
+    g = _getter(columns)
+    has = _presence(columns)
+    results = dict()
+
+    for name in metrics:
+        if name in METRIC_FORMULAS:
+            value = METRIC_FORMULAS[name](g)
+        elif name in PRESENCE_FORMULAS:
+            value = PRESENCE_FORMULAS[name](g, has)
+        elif name in ['inventory_turnover_ratio', 'inventory_days']:
+            continue
+        else:
+            raise ValueError(f"Unknown metric '{name}'.")
+        results[name] = np.broadcast_to(np.asarray(value, dtype=float), shape)
+
+    if 'inventory_turnover_ratio' in metrics or 'inventory_days' in metrics:
+        turnover = np.full(shape, np.nan)
+        if previous is not None:
+            p = _getter(previous)
+            average = 0.5 * (g('inventory', 0) + p('inventory', 0))
+            turnover = np.where(average != 0, safe_div(g('COGS', 0), average), np.nan)
+            if previous_exists is not None:
+                turnover = np.where(previous_exists, turnover, np.nan)
+            turnover = np.broadcast_to(turnover, shape)
+        if 'inventory_turnover_ratio' in metrics:
+            results['inventory_turnover_ratio'] = turnover
+        if 'inventory_days' in metrics:
+            # `Company` derives days from the turnover it stored, i.e. rounded to 2 decimals
+            stored = np.round(turnover, 2)
+            results['inventory_days'] = np.where(stored != 0, safe_div(365.0, stored), np.nan)
+
+    return results
+
+
+def growth(current, previous):
+    """Percentage change from `previous` to `current`, NaN where the base is zero or absent."""
+    return safe_div(np.asarray(current, dtype=float) - previous, np.abs(previous)) * 100
+
+
+def ratio_growth(current, previous, decimals: int = 2):
+    """Growth of a ratio as `Company` computes it: from both values rounded to `decimals`."""
+    return growth(np.round(current, decimals), np.round(previous, decimals))
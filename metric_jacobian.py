@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from metric_engine import METRIC_FORMULAS, METRIC_NAMES, PRESENCE_FORMULAS, safe_div
+from schema import FIELD_NAMES
+
+# Line items the Jacobian is taken with respect to.
+INPUT_FIELDS = [name for name in FIELD_NAMES if name not in ['year', 'quarter']]
+
+
+def _parts(x):
+    """(value, gradient or None) of a Dual or a constant."""
+    if isinstance(x, Dual):
+        return x.value, x.grad
+    return np.asarray(x, dtype=float), None
+
+
+def _combine(value, grad_a, scale_a, grad_b, scale_b):
+    """Gradient of a result whose partials are scale_a * grad_a + scale_b * grad_b."""
+    grad = None
+    for g, scale in [(grad_a, scale_a), (grad_b, scale_b)]:
+        if g is not None:
+            term = g * np.asarray(scale)[..., None]
+            grad = term if grad is None else grad + term
+    if grad is None:
+        return value
+    return Dual(value, np.broadcast_to(grad, np.shape(value) + grad.shape[-1:]))
+
+
+class Dual:
+    """
+    Forward-mode dual number over arrays: a value and its gradient along a trailing axis.
+
+    Implements the operations the metric formulas use (+, -, *, /, comparisons, `np.where`,
+    `np.isfinite`, `np.isnan`, `np.abs`), so the unchanged formulas in `metric_engine`
+    evaluate ratios and their exact partial derivatives in the same pass.
+    """
+
+    __slots__ = ('value', 'grad')
+
+    def __init__(self, value, grad):
+        self.value = np.asarray(value, dtype=float)
+        self.grad = grad
+
+    # Arithmetic
+    def __add__(self, other):
+        b, gb = _parts(other)
+        return _combine(self.value + b, self.grad, 1.0, gb, 1.0)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        b, gb = _parts(other)
+        return _combine(self.value - b, self.grad, 1.0, gb, -1.0)
+
+    def __rsub__(self, other):
+        a, ga = _parts(other)
+        return _combine(a - self.value, ga, 1.0, self.grad, -1.0)
+
+    def __mul__(self, other):
+        b, gb = _parts(other)
+        return _combine(self.value * b, self.grad, b, gb, self.value)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        b, gb = _parts(other)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = self.value / b
+            return _combine(value, self.grad, 1.0 / b, gb, -value / b)
+
+    def __rtruediv__(self, other):
+        a, ga = _parts(other)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = a / self.value
+            return _combine(value, ga, 1.0 / self.value, self.grad, -value / self.value)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.grad)
+
+    def __abs__(self):
+        return Dual(np.abs(self.value), self.grad * np.sign(self.value)[..., None])
+
+    # Comparisons act on values only
+    def __eq__(self, other):
+        return self.value == _parts(other)[0]
+
+    def __ne__(self, other):
+        return self.value != _parts(other)[0]
+
+    def __lt__(self, other):
+        return self.value < _parts(other)[0]
+
+    def __gt__(self, other):
+        return self.value > _parts(other)[0]
+
+    __hash__ = None
+
+    # NumPy dispatch
+    _UFUNCS = {
+        np.add: lambda a, b: a + b,
+        np.subtract: lambda a, b: a - b,
+        np.multiply: lambda a, b: a * b,
+        np.true_divide: lambda a, b: a / b,
+        np.negative: lambda a: -a,
+        np.absolute: abs,
+    }
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs.get('out') is not None:
+            return NotImplemented
+        if ufunc in [np.isfinite, np.isnan]:
+            return ufunc(_parts(inputs[0])[0])
+        if ufunc in self._UFUNCS:
+            operands = [x if isinstance(x, Dual) else np.asarray(x, dtype=float) for x in inputs]
+            if len(operands) == 2 and not isinstance(operands[0], Dual):
+                # ndarray (op) Dual: use the reflected Dual operator
+                reflected = {np.add: '__radd__', np.subtract: '__rsub__',
+                             np.multiply: '__rmul__', np.true_divide: '__rtruediv__'}[ufunc]
+                return getattr(operands[1], reflected)(operands[0])
+            return self._UFUNCS[ufunc](*operands)
+        return NotImplemented
+
+    def __array_function__(self, func, types, args, kwargs):
+        if func is np.where and len(args) == 3:
+            condition = np.asarray(_parts(args[0])[0], dtype=bool)
+            (a, ga), (b, gb) = _parts(args[1]), _parts(args[2])
+            value = np.where(condition, a, b)
+            if ga is None and gb is None:
+                return value
+            n = (ga if ga is not None else gb).shape[-1]
+            ga = np.zeros(np.shape(a) + (n,)) if ga is None else ga
+            gb = np.zeros(np.shape(b) + (n,)) if gb is None else gb
+            grad = np.where(condition[..., None], ga, gb)
+            # A NaN ratio (zero denominator) has no derivative either
+            grad = np.where(np.isnan(value)[..., None], np.nan, grad)
+            return Dual(value, grad)
+        return NotImplemented
+
+
+def metric_jacobians(columns: dict, previous: dict = None, previous_exists=None, metrics: list = None) -> tuple:
+    """
+    Evaluates ratios and their partial derivatives with respect to every input line item.
+
+    Line items are seeded as dual numbers and pushed through the same formulas as
+    `compute_metrics`, so each derivative is exact (no finite differences) and the whole
+    universe is handled in one pass. Absent line items take the `fi.get` default the
+    formula uses, and the derivative is taken at that default. Inventory turnover and
+    days treat the previous period as fixed.
+
+    Args:
+        columns (dict): Line item name -> float array (any common shape, NaN where not reported).
+        previous (dict): Same layout for the prior period.
+        previous_exists: Boolean array (or scalar) marking elements that have a prior period.
+        metrics (list): Names to compute; all of `METRIC_NAMES` if None.
+
+    Returns:
+        tuple: (values, jacobians) where values maps metric -> array and jacobians maps
+               metric -> array of shape (..., len(INPUT_FIELDS)) of partials in
+               `INPUT_FIELDS` order, NaN where the ratio itself is NaN.
+    """
+    metrics = METRIC_NAMES if metrics is None else metrics
+    shape = np.broadcast_shapes(*(np.shape(column) for column in columns.values())) if columns else ()
+    n = len(INPUT_FIELDS)
+    seeds = np.eye(n)
+
+    def g(name, default):
+        column = columns.get(name)
+        value = np.full(shape, float(default)) if column is None else np.where(np.isnan(column), default, column)
+        grad = np.broadcast_to(seeds[INPUT_FIELDS.index(name)], shape + (n,))
+        return Dual(np.broadcast_to(value, shape), grad)
+
+    def has(name):
+        column = columns.get(name)
+        return False if column is None else ~np.isnan(column)
+
+    def as_dual(result):
+        if not isinstance(result, Dual):
+            result = Dual(result, np.zeros(np.shape(result) + (n,)))
+        value = np.broadcast_to(result.value, shape)
+        return value, np.broadcast_to(result.grad, shape + (n,))
+
+    values, jacobians = dict(), dict()
+    for name in metrics:
+        if name in METRIC_FORMULAS:
+            result = METRIC_FORMULAS[name](g)
+        elif name in PRESENCE_FORMULAS:
+            result = PRESENCE_FORMULAS[name](g, has)
+        elif name in ['inventory_turnover_ratio', 'inventory_days']:
+            continue
+        else:
+            raise ValueError(f"Unknown metric '{name}'.")
+        values[name], jacobians[name] = as_dual(result)
+
+    if 'inventory_turnover_ratio' in metrics or 'inventory_days' in metrics:
+        if previous is not None:
+            prior = previous.get('inventory')
+            prior = 0.0 if prior is None else np.where(np.isnan(prior), 0.0, prior)
+            average = 0.5 * (g('inventory', 0) + prior)
+            turnover = np.where(average != 0, safe_div(g('COGS', 0), average), np.nan)
+            if previous_exists is not None:
+                turnover = np.where(previous_exists, turnover, np.nan)
+        else:
+            turnover = np.full(shape, np.nan)
+        if 'inventory_turnover_ratio' in metrics:
+            values['inventory_turnover_ratio'], jacobians['inventory_turnover_ratio'] = as_dual(turnover)
+        if 'inventory_days' in metrics:
+            days = np.where(turnover != 0, safe_div(365.0, turnover), np.nan)
+            values['inventory_days'], jacobians['inventory_days'] = as_dual(days)
+
+    return values, jacobians
+
+
+def what_if(values: dict, jacobians: dict, changes: dict) -> dict:
+    """
+    First-order estimate of every ratio after changing some line items.
+
+    Args:
+        values, jacobians (dict): The result of `metric_jacobians`.
+        changes (dict): Line item name -> absolute change (scalar or array).
+
+    Returns:
+        dict: Metric name -> estimated value.
+    """
+    shaped = [(INPUT_FIELDS.index(name), np.asarray(change, dtype=float)) for name, change in changes.items()]
+    estimates = dict()
+    for metric, jacobian in jacobians.items():
+        estimate = values[metric].copy()
+        for i, change in shaped:
+            estimate = estimate + jacobian[..., i] * change
+        estimates[metric] = estimate
+    return estimates
+
+
+def rank_drivers(columns: dict, jacobians: dict, metric: str, top: int = 5) -> tuple:
+    """
+    Ranks line items by how much a 1% change in each moves a metric.
+
+    Returns:
+        tuple: (names, impacts), both of shape (..., top): the line item names and the
+               change in the metric for a 1% change in that item, largest magnitude first.
+    """
+    shape = jacobians[metric].shape[:-1]
+    levels = np.stack([np.broadcast_to(np.nan_to_num(np.asarray(columns.get(name, np.nan), dtype=float)), shape)
+                       for name in INPUT_FIELDS], axis=-1)
+    impacts = np.nan_to_num(jacobians[metric] * levels * 0.01)
+    order = np.argsort(-np.abs(impacts), axis=-1)[..., :top]
+    return np.array(INPUT_FIELDS, dtype=object)[order], np.take_along_axis(impacts, order, axis=-1)
@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from metric_engine import METRIC_NAMES, compute_metrics, growth, ratio_growth
+from schema import FIELDS, FIELD_IDS, FIELD_NAMES, STRUCTURAL_VALIDATOR
+
+REPORT_KINDS = ['Q1', 'Q2', 'Q3', 'Q4', 'H1', '9M', 'FY']
+
+# Income statement and cash flow amounts accumulate over a period; balance sheet,
+# share count and market values are read at the period end.
+FLOW_MASK = np.array([field.unit == 'currency' and field.statement in ['income', 'cash_flow'] for field in FIELDS])
+PERIOD_COLUMNS = [FIELD_IDS['year'], FIELD_IDS['quarter']]
+
+
+def _pick(reported: np.ndarray, derived: np.ndarray) -> np.ndarray:
+    """Uses reported values where present and derived values elsewhere."""
+    return np.where(np.isnan(reported), derived, reported)
+
+
+def _reported(rows: np.ndarray) -> np.ndarray:
+    """(rows x 1) mask of the rows that hold any report at all."""
+    return ~np.isnan(rows).all(axis=1, keepdims=True)
+
+
+def _combine(earlier: np.ndarray, later: np.ndarray) -> np.ndarray:
+    """Cumulative report covering `earlier` followed by `later`: flows add up, stocks come from `later`."""
+    combined = np.where(FLOW_MASK, earlier + later, later)
+    return np.where(_reported(earlier) & _reported(later), combined, np.nan)
+
+
+def _difference(cumulative: np.ndarray, earlier: np.ndarray) -> np.ndarray:
+    """Report for the part of `cumulative` after `earlier`: flows subtract, stocks come from `cumulative`."""
+    difference = np.where(FLOW_MASK, cumulative - earlier, cumulative)
+    return np.where(_reported(earlier) & _reported(cumulative), difference, np.nan)
+
+
+class MixedFrequencyStore:
+    """
+    One company's FY, 9M, H1 and quarterly reports held in a single store.
+
+    Reports are kept as rows of line-item arrays (in schema field order), one array per
+    report kind with one row per fiscal year. Missing cumulative reports are rolled up
+    from quarters, missing quarters are derived from cumulative reports (Q4 = FY - 9M),
+    and ratios at either frequency are computed from the same arrays, so a ticker no
+    longer needs one `Company` per frequency.
+    """
+
+    def __init__(self, name: str, fiscal_year_end_month: int = 12):
+        """
+        Args:
+            name (str): The company name or ticker.
+            fiscal_year_end_month (int): Calendar month (1-12) in which the fiscal year ends.
+        """
+        if fiscal_year_end_month not in range(1, 13):
+            raise ValueError("fiscal_year_end_month must be between 1 and 12.")
+        self.company_name = name
+        self.fiscal_year_end_month = fiscal_year_end_month
+        self._reports = dict()
+
+    def add_report(self, kind: str, finance_input: dict):
+        """
+        Adds one report.
+
+        Args:
+            kind (str): One of `REPORT_KINDS`.
+            finance_input (dict): The report's line items, with 'year' set to the fiscal year.
+
+        Raises:
+            ValueError: If the kind is unknown, the year is missing, the input does not
+                        match the schema or the report already exists.
+        """
+        if kind not in REPORT_KINDS:
+            raise ValueError(f"kind must be one of {REPORT_KINDS}.")
+        result = STRUCTURAL_VALIDATOR.validate_batch([finance_input])
+        result.raise_for_errors()
+        row = result.values[0]
+        if np.isnan(row[FIELD_IDS['year']]):
+            raise ValueError("Report is missing the 'year' key.")
+        key = (int(row[FIELD_IDS['year']]), kind)
+        if key in self._reports:
+            raise ValueError(f"{kind} report for fiscal year {key[0]} already exists.")
+        row[FIELD_IDS['quarter']] = np.nan
+        self._reports[key] = row
+
+    def _years(self) -> np.ndarray:
+        if not self._reports:
+            return np.array([], dtype=int)
+        years = [year for year, _ in self._reports]
+        return np.arange(min(years), max(years) + 1)
+
+    def _by_kind(self, years: np.ndarray) -> dict:
+        """Returns {kind: (years x fields) array}, NaN where a report is absent."""
+        first = years[0] if len(years) else 0
+        arrays = {kind: np.full((len(years), len(FIELDS)), np.nan) for kind in REPORT_KINDS}
+        for (year, kind), row in self._reports.items():
+            arrays[kind][year - first] = row
+        return arrays
+
+    def _resolved(self, years: np.ndarray) -> dict:
+        """Fills every report kind from the others where it was not reported."""
+        k = self._by_kind(years)
+        h1 = _pick(k['H1'], _combine(k['Q1'], k['Q2']))
+        nine_months = _pick(k['9M'], _combine(h1, k['Q3']))
+        fy = _pick(k['FY'], _combine(nine_months, k['Q4']))
+        return {
+            'Q1': k['Q1'],
+            'Q2': _pick(k['Q2'], _difference(h1, k['Q1'])),
+            'Q3': _pick(k['Q3'], _difference(nine_months, h1)),
+            'Q4': _pick(k['Q4'], _difference(fy, nine_months)),
+            'H1': h1,
+            '9M': nine_months,
+            'FY': fy,
+        }
+
+    def view(self, frequency: str = 'annual') -> tuple:
+        """
+        Returns the statement arrays at one frequency.
+
+        Args:
+            frequency (str): 'annual' or 'quarterly'.
+
+        Returns:
+            tuple: (periods, values) where periods are years or (year, quarter) tuples
+                   over a consecutive range, and values is a (periods x fields) array.
+        """
+        years = self._years()
+        resolved = self._resolved(years)
+        if frequency == 'annual':
+            values = resolved['FY'].copy()
+            values[:, FIELD_IDS['year']] = years
+            return [int(year) for year in years], values
+        if frequency == 'quarterly':
+            # Interleave as (year, Q1), (year, Q2), ... so row i - 1 is always the prior quarter
+            values = np.stack([resolved[f'Q{q}'] for q in range(1, 5)], axis=1).reshape(-1, len(FIELDS))
+            values[:, FIELD_IDS['year']] = np.repeat(years, 4)
+            values[:, FIELD_IDS['quarter']] = np.tile(np.arange(1, 5), len(years))
+            return [(int(year), q) for year in years for q in range(1, 5)], values
+        raise ValueError("frequency must be either 'annual' or 'quarterly'.")
+
+    def metrics(self, frequency: str = 'annual') -> tuple:
+        """
+        Computes all standard ratios plus YoY (annual) or QoQ (quarterly) growth.
+
+        Returns:
+            tuple: (periods, {name: array}), with arrays aligned to the periods. Periods
+                   without any data are dropped.
+        """
+        periods, values = self.view(frequency)
+        data_columns = [i for i in range(len(FIELDS)) if i not in PERIOD_COLUMNS]
+        has_data = ~np.isnan(values[:, data_columns]).all(axis=1)
+
+        columns = {name: values[:, i] for i, name in enumerate(FIELD_NAMES) if i not in PERIOD_COLUMNS}
+        previous = {name: np.concatenate([[np.nan], column[:-1]]) for name, column in columns.items()}
+        previous_exists = np.concatenate([[False], has_data[:-1]])
+        results = compute_metrics(columns, previous, previous_exists)
+
+        suffix = 'yoy' if frequency == 'annual' else 'qoq'
+        # Line items grow from their raw values, ratios from their rounded values, as in `Company`
+        for change, series_by_name in [(growth, columns), (ratio_growth, dict(results))]:
+            for name, series in series_by_name.items():
+                if np.isnan(series).all():
+                    continue
+                prior = np.concatenate([[np.nan], series[:-1]])
+                results[f'{name}_{suffix}_growth'] = np.where(previous_exists, change(series, prior), np.nan)
+
+        return [period for period, keep in zip(periods, has_data) if keep], \
+            {name: series[has_data] for name, series in results.items()}
+
+    def output(self, frequency: str = 'annual') -> dict:
+        """Returns the metrics in the `Company.output` layout: {period: {metric: value or None}}."""
+        periods, results = self.metrics(frequency)
+        output = dict()
+        for i, period in enumerate(periods):
+            output[period] = {name: (None if np.isnan(series[i]) else round(float(series[i]), 2))
+                              for name, series in results.items()
+                              if name in METRIC_NAMES or not np.isnan(series[i])}
+        return output
+
+    def period_records(self, frequency: str = 'annual') -> list:
+        """Returns one period dictionary per period, ready for `Company.add_period_data`."""
+        periods, values = self.view(frequency)
+        records = list()
+        for row in values:
+            present = ~np.isnan(row)
+            if not present[[i for i in range(len(FIELDS)) if i not in PERIOD_COLUMNS]].any():
+                continue
+            record = {FIELD_NAMES[i]: float(row[i]) for i in np.nonzero(present)[0]}
+            record['year'] = int(record['year'])
+            if 'quarter' in record:
+                record['quarter'] = int(record['quarter'])
+            records.append(record)
+        return records
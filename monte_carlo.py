@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from FA import Company
+from metric_engine import METRIC_NAMES, compute_metrics
+from projection import DEFAULT_DRIVERS, project
+
+# Paths are drawn in fixed blocks, each with its own child seed, so results depend
+# only on the seed and never on how many blocks fit in the memory budget.
+BLOCK_PATHS = 1024
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Bounds applied to every drawn driver value.
+DRIVER_BOUNDS = {name: (0.0, np.inf) for name in DEFAULT_DRIVERS}
+DRIVER_BOUNDS.update({'revenue_growth': (-0.99, np.inf), 'tax_rate': (0.0, 1.0), 'payout_ratio': (0.0, 1.0)})
+
+
+def _historical_drivers(previous: dict, current: dict) -> dict:
+    """Projection driver values implied by one reported year and the year before it."""
+    def ratio(numerator, denominator):
+        return numerator / denominator if numerator is not None and denominator else None
+
+    fi = current
+    revenue, cogs = fi.get('revenue'), fi.get('COGS')
+    ebitda = fi.get('EBITDA')
+    if ebitda is None and 'operating_income' in fi and 'depreciation' in fi:
+        ebitda = fi['operating_income'] + fi['depreciation']
+    drivers = {
+        'cogs_pct': ratio(cogs, revenue),
+        'opex_pct': ratio(revenue - (cogs or 0) - ebitda, revenue) if revenue and ebitda is not None else None,
+        'capex_pct': ratio(fi.get('capex'), revenue),
+        'receivable_days': ratio(fi.get('trade_recv'), revenue),
+        'inventory_days': ratio(fi.get('inventory'), cogs),
+        'payable_days': ratio(fi.get('trade_payables'), cogs),
+    }
+    for name in ['receivable_days', 'inventory_days', 'payable_days']:
+        if drivers[name] is not None:
+            drivers[name] *= 365
+    if fi.get('profit_bfor_tax', 0) > 0:
+        drivers['tax_rate'] = ratio(fi.get('tax_expense'), fi['profit_bfor_tax'])
+    if previous is not None:
+        debt = previous.get('short_term_debt', 0) + previous.get('long_term_debt', 0)
+        drivers['depreciation_rate'] = ratio(fi.get('depreciation'), previous.get('PPE'))
+        drivers['interest_rate'] = ratio(fi.get('finance_cost'), debt)
+        if fi.get('net_profit', 0) > 0 and 'retained_earnings' in fi and 'retained_earnings' in previous:
+            retained = fi['retained_earnings'] - previous['retained_earnings']
+            drivers['payout_ratio'] = (fi['net_profit'] - retained) / fi['net_profit']
+    return {name: value for name, value in drivers.items() if value is not None}
+
+
+class MonteCarloForecaster:
+    """
+    Simulates future fiscal years of a company's statements and the ratios they imply.
+
+    Each path draws the operating drivers of `projection.project` every year from
+    normals fitted to the company's history (revenue growth from `revenue_yoy_growth`,
+    margins, working capital days, rates), and the statements are then built by the
+    same linked projection. Profit before tax, tax and net profit, the balance sheet
+    identity and the cash flow therefore hold on every path. Paths are simulated as
+    (paths x years) arrays in blocks that fit a memory budget, and every `FA.py` ratio
+    is computed on all paths at once by the array metric engine.
+    """
+
+    def __init__(self, company: Company):
+        """
+        Fits the driver distributions from an annual `Company` whose metrics have been calculated.
+
+        Drivers the history says nothing about (e.g. inventory days for a company that
+        reports no inventory) are held at their `DEFAULT_DRIVERS` value.
+
+        Raises:
+            ValueError: If the company is not annual or has no revenue growth history.
+        """
+        if company.period_type != 'annual':
+            raise ValueError("Forecasting needs an annual company.")
+        inputs = sorted(company.financial_inputs, key=lambda fi: fi['_period'])
+        growth = [company.output[fi['_period']].get('revenue_yoy_growth') for fi in inputs
+                  if fi['_period'] in company.output]
+        growth = np.array([g for g in growth if isinstance(g, (int, float))], dtype=float) / 100
+        if not len(growth):
+            raise ValueError("At least two consecutive years with revenue are needed to fit growth.")
+
+        self.company_name = company.company_name
+        self.last = inputs[-1]
+        self.last_year = self.last['_period']
+
+        history = {name: list() for name in DEFAULT_DRIVERS}
+        by_year = {fi['_period']: fi for fi in inputs}
+        for fi in inputs:
+            for name, value in _historical_drivers(by_year.get(fi['_period'] - 1), fi).items():
+                history[name].append(value)
+        history['revenue_growth'] = growth
+
+        # Driver name -> (mean, standard deviation)
+        self.drivers = dict()
+        for name, default in DEFAULT_DRIVERS.items():
+            values = np.array(history[name], dtype=float)
+            self.drivers[name] = (float(values.mean()), float(values.std())) if len(values) else (default, 0.0)
+
+    def _simulate_block(self, rng: np.random.Generator, n_paths: int, horizon: int) -> dict:
+        """Draws one block of paths; returns line item name -> (paths x years) array."""
+        drivers = dict()
+        for name, (mean, std) in self.drivers.items():
+            low, high = DRIVER_BOUNDS[name]
+            drivers[name] = np.clip(rng.normal(mean, std, (n_paths, horizon)), low, high)
+        return project(self.last, horizon, drivers)
+
+    def simulate(self, n_paths: int, horizon: int, seed: int = None, memory_budget: int = 256 * 2**20,
+                 percentiles: tuple = DEFAULT_PERCENTILES, names: list = None) -> tuple:
+        """
+        Simulates `n_paths` paths of `horizon` future years.
+
+        The percentiles are exact, so every path of each reported series is kept until
+        the end as float32 (4 * n_paths * horizon bytes per series). Those arrays are
+        counted against `memory_budget` first, and the blocks of paths are simulated in
+        chunks that fit what is left, so the budget bounds the peak memory of the run.
+
+        Args:
+            n_paths (int): Number of simulated paths.
+            horizon (int): Number of future fiscal years.
+            seed (int): Root seed for `np.random.SeedSequence`; the same seed gives the same bands.
+            memory_budget (int): Approximate bytes of simulation arrays held at once.
+            percentiles (tuple): Percentiles reported per metric and year.
+            names (list): Line items and ratios to report; every simulated line item and
+                          every ratio in `METRIC_NAMES` if None.
+
+        Returns:
+            tuple: (years, bands) with bands {name: {percentile: array over years}}.
+
+        Raises:
+            ValueError: If n_paths or horizon is not positive, a name is not simulated, or
+                        the kept series leave no room in the budget for one block of paths.
+        """
+        if n_paths < 1 or horizon < 1:
+            raise ValueError("n_paths and horizon must be positive.")
+        # One path shows which line items the projection produces
+        available = list(self._simulate_block(np.random.default_rng(0), 1, horizon)) + list(METRIC_NAMES)
+        if names is None:
+            names = available
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown line items or ratios {unknown}.")
+
+        # Drivers, line items, metrics and previous-year copies, with headroom for temporaries
+        bytes_per_path = horizon * 8 * 4 * (2 * len(DEFAULT_DRIVERS) + 32 + len(METRIC_NAMES))
+        kept_bytes = 4 * n_paths * horizon * len(names)
+        blocks_per_chunk = (memory_budget - kept_bytes) // (bytes_per_path * min(BLOCK_PATHS, n_paths))
+        if blocks_per_chunk < 1:
+            raise ValueError(f"memory_budget of {memory_budget} bytes is too small: the kept series need "
+                             f"{kept_bytes} bytes and one block of paths {bytes_per_path * min(BLOCK_PATHS, n_paths)}; "
+                             f"simulate fewer paths or names.")
+
+        n_blocks = -(-n_paths // BLOCK_PATHS)
+        block_seeds = np.random.SeedSequence(seed).spawn(n_blocks)
+        last_row = {name: float(value) for name, value in self.last.items() if name not in ['year', '_period']}
+        results = {name: np.empty((n_paths, horizon), dtype=np.float32) for name in names}
+        for first_block in range(0, n_blocks, blocks_per_chunk):
+            blocks = range(first_block, min(n_blocks, first_block + blocks_per_chunk))
+            draws = [self._simulate_block(np.random.default_rng(block_seeds[b]),
+                                          min(BLOCK_PATHS, n_paths - b * BLOCK_PATHS), horizon) for b in blocks]
+            columns = {name: np.concatenate([d[name] for d in draws]) for name in draws[0]}
+            del draws
+            previous = {name: np.concatenate([np.full((len(column), 1), last_row.get(name, np.nan)), column[:, :-1]], axis=1)
+                        for name, column in columns.items()}
+            values = dict(columns, **compute_metrics(columns, previous, True))
+
+            start = first_block * BLOCK_PATHS
+            for name, paths in results.items():
+                series = values[name]
+                paths[start:start + len(series)] = series
+
+        years = [self.last_year + h for h in range(1, horizon + 1)]
+        bands = dict()
+        for name, paths in results.items():
+            if np.isnan(paths).all():
+                continue
+            levels = np.nanpercentile(paths, percentiles, axis=0)
+            bands[name] = {p: levels[i].astype(float) for i, p in enumerate(percentiles)}
+        return years, bands
@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from identity_checks import DEFAULT_CHECKS, IdentityChecker
+from schema import FIELDS, FIELD_IDS, FIELD_NAMES, PeriodRecord, SchemaValidator
+
+SCALES = {
+    'units': 1.0,
+    'thousands': 1e3,
+    'millions': 1e6,
+    'billions': 1e9,
+}
+
+CANONICAL_CURRENCY = 'NGN'
+
+
+class ScaleDeclaration:
+    """
+    How the figures of one submitted statement are expressed.
+
+    Statement line items are often reported in thousands or millions while share
+    counts and market capitalisation use their own scale, so each is declared
+    separately.
+    """
+
+    __slots__ = ('currency', 'scale', 'share_scale', 'market_scale')
+
+    def __init__(self, currency: str = CANONICAL_CURRENCY, scale: str = 'units',
+                 share_scale: str = 'units', market_scale: str = 'units'):
+        """
+        Args:
+            currency (str): ISO currency code of the monetary figures.
+            scale (str): Scale of statement line items, one of `SCALES`.
+            share_scale (str): Scale of 'outstanding_shares'.
+            market_scale (str): Scale of 'market_cap'.
+
+        Raises:
+            ValueError: If a scale is unknown.
+        """
+        for value in (scale, share_scale, market_scale):
+            if value not in SCALES:
+                raise ValueError(f"Unknown scale '{value}', expected one of {list(SCALES)}.")
+        self.currency = currency
+        self.scale = scale
+        self.share_scale = share_scale
+        self.market_scale = market_scale
+
+    def __repr__(self):
+        return (f"ScaleDeclaration('{self.currency}', '{self.scale}', "
+                f"share_scale='{self.share_scale}', market_scale='{self.market_scale}')")
+
+
+class NormalizedBatch:
+    """Statements converted to canonical units, with their declarations kept for display."""
+
+    def __init__(self, records: list, values: np.ndarray, factors: np.ndarray, declarations: list,
+                 identity_mask: np.ndarray):
+        # PeriodRecords in canonical units (naira, single shares)
+        self.records = records
+        # (rows x len(FIELDS)) matrix of canonical values, NaN where absent
+        self.values = values
+        # (rows x len(FIELDS)) multipliers that were applied to the submitted figures
+        self.factors = factors
+        # The ScaleDeclaration of each row, as submitted
+        self.declarations = declarations
+        # uint32 per row, one bit per accounting identity the canonical values fail
+        self.identity_mask = identity_mask
+
+    def as_submitted(self, row: int) -> dict:
+        """Returns one statement converted back to the scale and currency it was declared in."""
+        original = self.values[row] / self.factors[row]
+        submitted = dict()
+        for i in np.nonzero(~np.isnan(original))[0]:
+            value = float(original[i])
+            submitted[FIELD_NAMES[i]] = round(value) if FIELDS[i].statement == 'period' else value
+        return submitted
+
+
+class Normalizer:
+    """
+    Converts batches of statements to canonical units in one vectorized multiply.
+
+    A per-row factor is built for each kind of figure (monetary, share count, market
+    value) and scattered onto the columns of that kind, so the whole batch is
+    normalized by a single element-wise product with the value matrix. The accounting
+    identities are then checked on the canonical values; failures are reported in
+    `NormalizedBatch.identity_mask` and do not reject the row.
+    """
+
+    def __init__(self, fx_rates: dict = None, validator: SchemaValidator = None,
+                 identities: tuple = DEFAULT_CHECKS):
+        """
+        Args:
+            fx_rates (dict): Currency code -> naira per unit of that currency.
+            validator (SchemaValidator): Validator used to pack the batch. By default only
+                structural checks run, and share counts may be fractional before scaling.
+            identities (tuple): `IdentityCheck`s run on the canonical values; empty to skip them.
+        """
+        self.fx_rates = {CANONICAL_CURRENCY: 1.0}
+        self.fx_rates.update(fx_rates or {})
+        self.validator = validator or SchemaValidator(identities=(), integral_units=['year', 'quarter'])
+        self.identity_checker = IdentityChecker(FIELD_IDS, identities)
+
+        self._money = np.array([field.unit == 'currency' and field.statement != 'market' for field in FIELDS])
+        self._market = np.array([field.unit == 'currency' and field.statement == 'market' for field in FIELDS])
+        self._shares = np.array([field.unit == 'shares' for field in FIELDS])
+        self._unscaled = ~(self._money | self._market | self._shares)
+
+    def normalize(self, records: list, declarations: list) -> NormalizedBatch:
+        """
+        Normalizes a batch of period dictionaries.
+
+        Args:
+            records (list): Period dictionaries (or `PeriodRecord`s) as submitted.
+            declarations (list): One `ScaleDeclaration` per record.
+
+        Returns:
+            NormalizedBatch: The canonical records and values.
+
+        Raises:
+            ValueError: If the lengths differ, a currency has no exchange rate, or a record
+                        fails schema validation.
+        """
+        if len(records) != len(declarations):
+            raise ValueError("Every record needs exactly one ScaleDeclaration.")
+        for declaration in declarations:
+            if declaration.currency not in self.fx_rates:
+                raise ValueError(f"No exchange rate for currency '{declaration.currency}'.")
+
+        result = self.validator.validate_batch(records)
+        result.raise_for_errors()
+
+        fx = np.array([self.fx_rates[d.currency] for d in declarations])
+        money = fx * np.array([SCALES[d.scale] for d in declarations])
+        market = fx * np.array([SCALES[d.market_scale] for d in declarations])
+        shares = np.array([SCALES[d.share_scale] for d in declarations])
+
+        factors = (money[:, None] * self._money + market[:, None] * self._market
+                   + shares[:, None] * self._shares + self._unscaled)
+        values = result.values * factors
+
+        canonical = list()
+        for row in values:
+            record = PeriodRecord()
+            for i in np.nonzero(~np.isnan(row))[0]:
+                value = float(row[i])
+                record[FIELD_NAMES[i]] = round(value) if self._unscaled[i] or self._shares[i] else value
+            canonical.append(record)
+
+        return NormalizedBatch(canonical, values, factors, list(declarations), self.identity_checker.check(values))
+
+    def normalize_one(self, finance_input: dict, declaration: ScaleDeclaration) -> PeriodRecord:
+        """Normalizes a single period dictionary, e.g. one typed in at the command line."""
+        return self.normalize([finance_input], [declaration]).records[0]
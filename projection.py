@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from metric_engine import compute_metrics
+from schema import FIELDS, FIELD_IDS
+
+# Driver defaults. Percentages are fractions of revenue unless noted; days are per 365.
+DEFAULT_DRIVERS = {
+    'revenue_growth': 0.10,
+    'cogs_pct': 0.60,
+    'opex_pct': 0.15,
+    'depreciation_rate': 0.10,  # of opening PPE
+    'capex_pct': 0.05,
+    'receivable_days': 45.0,    # of revenue
+    'inventory_days': 60.0,     # of COGS
+    'payable_days': 45.0,       # of COGS
+    'interest_rate': 0.15,      # on opening debt
+    'tax_rate': 0.30,           # of positive profit before tax
+    'payout_ratio': 0.40,       # of positive net profit
+}
+
+
+def project(opening: dict, horizon: int, drivers: dict = None) -> dict:
+    """
+    Projects linked income statement, balance sheet and cash flow from operating drivers.
+
+    Every driver broadcasts against (scenarios..., horizon): a scalar applies everywhere,
+    an array of shape (S, 1) gives one value per scenario and (S, horizon) one per
+    scenario and year, so thousands of scenarios are evaluated as one set of array
+    operations per year. A revolving credit line acts as the financing plug: any cash
+    shortfall is drawn as short-term debt, so cash never goes negative, and surplus
+    cash repays the revolver first. Opening debt, share count, market cap and balance
+    sheet items the drivers do not model are carried at their opening values; the
+    balance sheet stays balanced if the opening one is.
+
+    Args:
+        opening (dict): The last reported period dictionary (or `PeriodRecord`).
+        horizon (int): Number of years to project.
+        drivers (dict): Driver name -> value or array; missing drivers use `DEFAULT_DRIVERS`.
+
+    Returns:
+        dict: Line item name -> (scenarios..., horizon) array.
+
+    Raises:
+        ValueError: If a driver is unknown or does not broadcast.
+    """
+    drivers = dict(drivers or {})
+    unknown = [name for name in drivers if name not in DEFAULT_DRIVERS]
+    if unknown:
+        raise ValueError(f"Unknown drivers {unknown}, expected some of {list(DEFAULT_DRIVERS)}.")
+    if horizon < 1:
+        raise ValueError("horizon must be positive.")
+    d = {name: np.asarray(drivers.get(name, default), dtype=float) for name, default in DEFAULT_DRIVERS.items()}
+    try:
+        shape = np.broadcast_shapes(*(value.shape for value in d.values()), (horizon,))
+    except ValueError:
+        raise ValueError(f"Drivers must broadcast against (scenarios, {horizon}).")
+    d = {name: np.broadcast_to(value, shape) for name, value in d.items()}
+    scenarios = shape[:-1]
+
+    o = {name: float(opening.get(name, 0)) for name in
+         ['revenue', 'PPE', 'cash_and_equivalent', 'trade_recv', 'inventory', 'trade_payables',
+          'short_term_debt', 'long_term_debt', 'book_value', 'retained_earnings', 'current_asset',
+          'non_current_asset', 'current_liabilities', 'non_current_liabilities']}
+    # Balances the drivers do not touch, carried at their opening values
+    other_current_asset = o['current_asset'] - o['cash_and_equivalent'] - o['trade_recv'] - o['inventory']
+    other_non_current_asset = o['non_current_asset'] - o['PPE']
+    other_current_liabilities = o['current_liabilities'] - o['trade_payables'] - o['short_term_debt']
+    other_non_current_liabilities = o['non_current_liabilities'] - o['long_term_debt']
+    debt = o['short_term_debt'] + o['long_term_debt']
+
+    names = ['revenue', 'COGS', 'gross_profit', 'EBITDA', 'depreciation', 'operating_income', 'finance_cost',
+             'profit_bfor_tax', 'tax_expense', 'net_profit', 'trade_recv', 'inventory', 'trade_payables', 'PPE',
+             'short_term_debt', 'capex', 'cash_from_opr', 'cash_from_invst', 'cash_from_finance', 'cash_and_equivalent',
+             'retained_earnings', 'book_value', 'current_asset', 'non_current_asset', 'asset',
+             'current_liabilities', 'non_current_liabilities', 'liabilities']
+    out = {name: np.empty(shape) for name in names}
+
+    revenue = np.full(scenarios, o['revenue'])
+    ppe, cash = np.full(scenarios, o['PPE']), np.full(scenarios, o['cash_and_equivalent'])
+    receivables, inventory = np.full(scenarios, o['trade_recv']), np.full(scenarios, o['inventory'])
+    payables = np.full(scenarios, o['trade_payables'])
+    book_value, retained = np.full(scenarios, o['book_value']), np.full(scenarios, o['retained_earnings'])
+    revolver = np.zeros(scenarios)
+
+    for t in range(horizon):
+        dt = {name: value[..., t] for name, value in d.items()}
+        revenue = revenue * (1 + dt['revenue_growth'])
+        cogs = revenue * dt['cogs_pct']
+        ebitda = revenue - cogs - revenue * dt['opex_pct']
+        depreciation = ppe * dt['depreciation_rate']
+        operating_income = ebitda - depreciation
+        finance_cost = (debt + revolver) * dt['interest_rate']
+        pbt = operating_income - finance_cost
+        tax = np.maximum(pbt, 0) * dt['tax_rate']
+        net_profit = pbt - tax
+        dividends = np.maximum(net_profit, 0) * dt['payout_ratio']
+
+        new_receivables = revenue * dt['receivable_days'] / 365
+        new_inventory = cogs * dt['inventory_days'] / 365
+        new_payables = cogs * dt['payable_days'] / 365
+        capex = revenue * dt['capex_pct']
+        cash_from_opr = (net_profit + depreciation - (new_receivables - receivables)
+                         - (new_inventory - inventory) + (new_payables - payables))
+        cash = cash + cash_from_opr - capex - dividends
+        # Revolver: surplus cash repays it, a shortfall is drawn on it
+        revolver_change = np.maximum(-cash, 0) - np.minimum(revolver, np.maximum(cash, 0))
+        revolver = revolver + revolver_change
+        cash = cash + revolver_change
+        receivables, inventory, payables = new_receivables, new_inventory, new_payables
+        ppe = ppe + capex - depreciation
+        book_value = book_value + net_profit - dividends
+        retained = retained + net_profit - dividends
+
+        current_asset = cash + receivables + inventory + other_current_asset
+        non_current_asset = ppe + other_non_current_asset
+        short_term_debt = o['short_term_debt'] + revolver
+        current_liabilities = payables + short_term_debt + other_current_liabilities
+        non_current_liabilities = o['long_term_debt'] + other_non_current_liabilities
+        for name, value in [
+                ('revenue', revenue), ('COGS', cogs), ('gross_profit', revenue - cogs), ('EBITDA', ebitda),
+                ('depreciation', depreciation), ('operating_income', operating_income),
+                ('finance_cost', finance_cost), ('profit_bfor_tax', pbt), ('tax_expense', tax),
+                ('net_profit', net_profit), ('trade_recv', receivables), ('inventory', inventory),
+                ('trade_payables', payables), ('PPE', ppe), ('short_term_debt', short_term_debt), ('capex', capex),
+                ('cash_from_opr', cash_from_opr), ('cash_from_invst', -capex),
+                ('cash_from_finance', revolver_change - dividends), ('cash_and_equivalent', cash),
+                ('retained_earnings', retained), ('book_value', book_value), ('current_asset', current_asset),
+                ('non_current_asset', non_current_asset), ('asset', current_asset + non_current_asset),
+                ('current_liabilities', current_liabilities), ('non_current_liabilities', non_current_liabilities),
+                ('liabilities', current_liabilities + non_current_liabilities)]:
+            out[name][..., t] = value
+
+    for name in ['long_term_debt', 'outstanding_shares', 'market_cap']:
+        if name in opening:
+            out[name] = np.full(shape, float(opening[name]))
+    return out
+
+
+def projection_metrics(opening: dict, columns: dict) -> dict:
+    """Computes every standard ratio on projected columns, using `opening` as the year before the first."""
+    previous = dict()
+    for name, column in columns.items():
+        first = np.full(column.shape[:-1] + (1,), float(opening.get(name, np.nan)))
+        previous[name] = np.concatenate([first, column[..., :-1]], axis=-1)
+    return compute_metrics(columns, previous, True)
+
+
+def to_values(columns: dict, first_year: int) -> np.ndarray:
+    """Lays projected columns out as a (scenarios..., years, fields) array in schema field order."""
+    shape = next(iter(columns.values())).shape
+    values = np.full(shape + (len(FIELDS),), np.nan)
+    for name, column in columns.items():
+        values[..., FIELD_IDS[name]] = column
+    values[..., FIELD_IDS['year']] = first_year + np.arange(shape[-1])
+    return values
+
+
+def to_period_records(columns: dict, first_year: int, scenario: tuple = ()) -> list:
+    """
+    Returns one scenario's projection as period dictionaries for `Company.add_period_data`.
+
+    Args:
+        columns (dict): The result of `project`.
+        first_year (int): Fiscal year of the first projected period.
+        scenario (tuple): Index of the scenario in the leading dimensions.
+    """
+    scenario = scenario if isinstance(scenario, tuple) else (scenario,)
+    horizon = next(iter(columns.values())).shape[-1]
+    records = list()
+    for t in range(horizon):
+        record = {'year': first_year + t}
+        for name, column in columns.items():
+            record[name] = float(column[scenario + (t,)])
+        records.append(record)
+    return records
@@ -0,0 +1,319 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from identity_checks import DEFAULT_CHECKS, IdentityChecker
+
+
+class LineItem:
+    """Definition of one canonical statement line item."""
+
+    __slots__ = ('id', 'name', 'statement', 'unit', 'minimum', 'maximum')
+
+    def __init__(self, id: int, name: str, statement: str, unit: str = 'currency',
+                 minimum: float = -np.inf, maximum: float = np.inf):
+        self.id = id
+        self.name = name
+        self.statement = statement
+        self.unit = unit
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __repr__(self):
+        return f"LineItem({self.id}, '{self.name}', '{self.statement}', '{self.unit}')"
+
+
+# Canonical line items, keyed by the names `FA.py` reads. Field ids are stable and
+# index the columns of batch matrices, so new items must only ever be appended.
+FIELDS = (
+    LineItem(0, 'year', 'period', 'year', 1900, 2100),
+    LineItem(1, 'quarter', 'period', 'quarter', 1, 4),
+    # Income statement
+    LineItem(2, 'revenue', 'income', minimum=0),
+    LineItem(3, 'COGS', 'income'),
+    LineItem(4, 'gross_profit', 'income'),
+    LineItem(5, 'operating_income', 'income'),
+    LineItem(6, 'depreciation', 'income'),
+    LineItem(7, 'EBITDA', 'income'),
+    LineItem(8, 'finance_income', 'income'),
+    LineItem(9, 'finance_cost', 'income'),
+    LineItem(10, 'profit_bfor_tax', 'income'),
+    LineItem(11, 'tax_expense', 'income'),
+    LineItem(12, 'net_profit', 'income'),
+    LineItem(13, 'outstanding_shares', 'income', 'shares', minimum=0),
+    # Balance sheet
+    LineItem(14, 'asset', 'balance', minimum=0),
+    LineItem(15, 'non_current_asset', 'balance', minimum=0),
+    LineItem(16, 'PPE', 'balance', minimum=0),
+    LineItem(17, 'current_asset', 'balance', minimum=0),
+    LineItem(18, 'cash_and_equivalent', 'balance', minimum=0),
+    LineItem(19, 'mktble_securities', 'balance', minimum=0),
+    LineItem(20, 'trade_recv', 'balance', minimum=0),
+    LineItem(21, 'inventory', 'balance', minimum=0),
+    LineItem(22, 'liabilities', 'balance', minimum=0),
+    LineItem(23, 'current_liabilities', 'balance', minimum=0),
+    LineItem(24, 'trade_payables', 'balance', minimum=0),
+    LineItem(25, 'short_term_debt', 'balance', minimum=0),
+    LineItem(26, 'non_current_liabilities', 'balance', minimum=0),
+    LineItem(27, 'long_term_debt', 'balance', minimum=0),
+    LineItem(28, 'book_value', 'balance'),
+    LineItem(29, 'retained_earnings', 'balance'),
+    # Cash flow statement
+    LineItem(30, 'cash_from_opr', 'cash_flow'),
+    LineItem(31, 'capex', 'cash_flow'),
+    LineItem(32, 'cash_from_invst', 'cash_flow'),
+    LineItem(33, 'cash_from_finance', 'cash_flow'),
+    # Market data
+    LineItem(34, 'market_cap', 'market', minimum=0),
+)
+
+FIELD_NAMES = tuple(field.name for field in FIELDS)
+FIELD_IDS = {field.name: field.id for field in FIELDS}
+
+# Alternative keys seen in `main.py` and the FINANCIAL_STATEMENTS design, mapped to canonical names.
+ALIASES = {
+    'PBT': 'profit_bfor_tax',
+    'deprcn_amotzn': 'depreciation',
+    'operating_profit': 'operating_income',
+    'net_income': 'net_profit',
+    'total_assets': 'asset',
+    'total_liabilities': 'liabilities',
+    'equity': 'book_value',
+}
+
+INTEGRAL_UNITS = ['shares', 'year', 'quarter']
+
+
+class PeriodRecord:
+    """
+    Typed record of one period's line items, used in place of an ad-hoc dict.
+
+    Each canonical line item is a slot, so a record carries no per-instance dict. It
+    supports the mapping operations `Company` uses on period data (`get`, `[]`, `in`,
+    `keys`, `items`); unset line items behave like missing dict keys.
+    """
+
+    __slots__ = FIELD_NAMES + ('_period',)
+    _SLOTS = frozenset(__slots__)
+
+    def __init__(self, **line_items):
+        """
+        Raises:
+            ValueError: If a keyword is not a canonical line item name.
+        """
+        for name, value in line_items.items():
+            self[name] = value
+
+    @classmethod
+    def from_dict(cls, finance_input: dict, validator: 'SchemaValidator' = None) -> 'PeriodRecord':
+        """
+        Builds a record from a period dictionary, mapping aliases and checking it against the schema.
+
+        Args:
+            finance_input (dict): The period dictionary.
+            validator (SchemaValidator): Validator to check with; `STRUCTURAL_VALIDATOR` if None.
+
+        Raises:
+            ValueError: If a key is unknown or a value has the wrong type, unit or range.
+        """
+        result = (validator or STRUCTURAL_VALIDATOR).validate_batch([finance_input])
+        result.raise_for_errors()
+        return result.records[0]
+
+    def __getitem__(self, key):
+        if key not in self._SLOTS:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self._SLOTS:
+            raise ValueError(f"'{key}' is not a canonical line item.")
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key) -> bool:
+        return key in self._SLOTS and hasattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in self._SLOTS:
+            return default
+        return getattr(self, key, default)
+
+    def keys(self) -> list:
+        """Returns the names of the line items that are set, in field id order."""
+        return [name for name in FIELD_NAMES if hasattr(self, name)]
+
+    def items(self) -> list:
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def values(self) -> list:
+        return [getattr(self, name) for name in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PeriodRecord):
+            return NotImplemented
+        return self.items() == other.items()
+
+    def to_dict(self) -> dict:
+        """Returns the set line items as a plain dictionary."""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"PeriodRecord({self.to_dict()})"
+
+
+class ValidationResult:
+    """Outcome of validating one batch of period dictionaries."""
+
+    def __init__(self, records: list, values: np.ndarray, errors: list, identity_mask: np.ndarray):
+        # One PeriodRecord per input row, including rows that have errors
+        self.records = records
+        # (rows x len(FIELDS)) float64 matrix, NaN where a line item is absent
+        self.values = values
+        # (row, key, message) tuples
+        self.errors = errors
+        # uint32 per row, one bit per failed accounting identity (see identity_checks.py).
+        # Identity failures are flags, not errors: they never make a row invalid.
+        self.identity_mask = identity_mask
+
+    @property
+    def valid_rows(self) -> np.ndarray:
+        """Boolean mask of the rows without errors."""
+        mask = np.ones(len(self.records), dtype=bool)
+        for row, _, _ in self.errors:
+            mask[row] = False
+        return mask
+
+    def raise_for_errors(self):
+        """
+        Raises:
+            ValueError: Listing every error found in the batch.
+        """
+        if self.errors:
+            details = '; '.join(f"row {row} '{key}': {message}" for row, key, message in self.errors)
+            raise ValueError(f"Invalid financial input: {details}")
+
+
+class SchemaValidator:
+    """
+    Validator compiled from the line-item schema.
+
+    Key lookup, alias mapping and type checks happen in a single pass over the batch
+    while the values are packed into a (rows x fields) matrix; range, unit and
+    accounting identity checks then run as array operations over the whole batch.
+    Structural problems are errors, while rows failing an identity are only marked in
+    `ValidationResult.identity_mask`, since reported statements are often slightly off.
+    """
+
+    def __init__(self, fields: tuple = FIELDS, aliases: dict = ALIASES,
+                 identities: tuple = DEFAULT_CHECKS, identity_tolerances: dict = None,
+                 integral_units: list = INTEGRAL_UNITS, check_values: bool = True):
+        """
+        Args:
+            fields (tuple): The `LineItem` definitions to validate against.
+            aliases (dict): Alternative key -> canonical name.
+            integral_units (list): Units whose values must be whole numbers.
+            check_values (bool): Whether to check ranges and whole-number units; if False
+                only keys and value types are checked.
+            identities (tuple): `IdentityCheck`s to run on every batch; empty to skip them.
+            identity_tolerances (dict): Optional check name -> relative tolerance overrides.
+        """
+        self.fields = fields
+        self.identity_checker = IdentityChecker({field.name: field.id for field in fields},
+                                                identities, identity_tolerances)
+
+        self._lookup = {field.name: (field.id, field.name) for field in fields}
+        for alias, name in aliases.items():
+            self._lookup[alias] = self._lookup[name]
+        self._minimum = np.array([field.minimum for field in fields], dtype=float)
+        self._maximum = np.array([field.maximum for field in fields], dtype=float)
+        self._integral = np.array([field.unit in integral_units for field in fields])
+        self._names = [field.name for field in fields]
+        self.check_values = check_values
+
+    def validate_batch(self, records: list) -> ValidationResult:
+        """
+        Validates a batch of period dictionaries (or `PeriodRecord`s).
+
+        Returns:
+            ValidationResult: The typed records, the packed value matrix and all errors found.
+        """
+        lookup = self._lookup
+        values = np.full((len(records), len(self.fields)), np.nan)
+        typed = list()
+        errors = list()
+
+        for row, finance_input in enumerate(records):
+            record = PeriodRecord()
+            for key, value in finance_input.items():
+                if isinstance(key, str) and key.startswith('_'):
+                    continue
+                entry = lookup.get(key)
+                if entry is None:
+                    errors.append((row, key, 'unknown line item'))
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    errors.append((row, key, f'expected a number, got {type(value).__name__}'))
+                    continue
+                field_id, name = entry
+                if name in record:
+                    errors.append((row, key, f"duplicates line item '{name}'"))
+                    continue
+                record[name] = value
+                values[row, field_id] = value
+            typed.append(record)
+
+        if self.check_values:
+            present = ~np.isnan(values)
+            with np.errstate(invalid='ignore'):
+                out_of_range = present & ((values < self._minimum) | (values > self._maximum))
+                not_integral = present & self._integral & (values != np.floor(values))
+            for row, field_id in zip(*np.nonzero(out_of_range)):
+                field = self.fields[field_id]
+                errors.append((int(row), field.name, f'outside [{field.minimum}, {field.maximum}]'))
+            for row, field_id in zip(*np.nonzero(not_integral)):
+                errors.append((int(row), self._names[field_id],
+                               f'{self.fields[field_id].unit} must be a whole number'))
+
+        identity_mask = self.identity_checker.check(values)
+        return ValidationResult(typed, values, errors, identity_mask)
+
+
+# Used for records loaded into a `Company`: keys and value types only, so restated or
+# loss-making figures outside the usual ranges (e.g. negative revenue) are accepted.
+SHAPE_VALIDATOR = SchemaValidator(identities=(), check_values=False)
+# Keys, types, units and ranges, without the accounting identities.
+STRUCTURAL_VALIDATOR = SchemaValidator(identities=())
+# Used where submissions enter the system: structural checks plus the accounting identities.
+INGEST_VALIDATOR = SchemaValidator()
+
+
+def validate_record(finance_input: dict, validator: SchemaValidator = INGEST_VALIDATOR) -> tuple:
+    """
+    Checks one submitted period dictionary against the schema and the accounting identities.
+
+    Returns:
+        tuple: (PeriodRecord, identity_mask, failed_identities), where identity_mask is the
+               row's bitmask as an int and failed_identities the names of the failed checks.
+
+    Raises:
+        ValueError: If the input has structural errors; failed identities never raise.
+    """
+    result = validator.validate_batch([finance_input])
+    result.raise_for_errors()
+    mask = int(result.identity_mask[0])
+    return result.records[0], mask, validator.identity_checker.describe(mask)
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+import collections
+
+import numpy as np
+
+from FA import Company
+from metric_engine import METRIC_NAMES, compute_metrics, ratio_growth
+from schema import FIELD_NAMES
+
+
+def _previous_period(period, period_type: str):
+    if period_type == 'annual':
+        return period - 1
+    year, quarter = period
+    return (year - 1, 4) if quarter == 1 else (year, quarter - 1)
+
+
+def scenario_overlay(record, shocks: dict) -> collections.ChainMap:
+    """
+    Returns a copy-on-write view of one period's data with relative shocks applied.
+
+    Only the shocked line items are stored in the overlay; every other lookup falls
+    through to the untouched base record. The overlay can be passed to
+    `Company.add_period_data` like any period dictionary.
+
+    Args:
+        record (PeriodRecord): The base period data, e.g. an entry of `Company.financial_inputs`.
+        shocks (dict): Line item name -> relative change, e.g. {'revenue': -0.1}.
+    """
+    changes = {name: record[name] * (1 + shock) for name, shock in shocks.items() if name in record}
+    return collections.ChainMap(changes, record)
+
+
+def sensitivity_grid(company: Company, shocks: dict) -> tuple:
+    """
+    Evaluates every standard ratio over a grid of relative input shocks for a whole history.
+
+    Each shocked line item gets its own grid axis: its base column is multiplied by
+    (1 + shock) broadcast along that axis, while unshocked columns stay the shared base
+    arrays, so no per-scenario copy of the inputs is made. The shocks apply to every
+    period, including the prior periods inventory turnover looks back to.
+
+    Args:
+        company (Company): The company whose `financial_inputs` are shocked.
+        shocks (dict): Line item name -> 1-D array of relative changes, e.g.
+                       {'revenue': np.linspace(-0.1, 0.1, 50), 'finance_cost': np.linspace(0, 0.5, 50)}.
+
+    Returns:
+        tuple: (periods, axes, results) where axes lists the shocked line items in grid
+               axis order and results maps each metric, plus `{metric}_yoy_growth` (or
+               `_qoq_growth`, taken from ratios rounded as in `Company`), to a
+               (periods, len(shock 1), len(shock 2), ...) array.
+
+    Raises:
+        ValueError: If a shocked name is not a line item.
+    """
+    unknown = [name for name in shocks if name not in FIELD_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown line items {unknown}.")
+    axes = list(shocks)
+    inputs = {fi['_period']: fi for fi in company.financial_inputs}
+    periods = sorted(inputs)
+    prior = [inputs.get(_previous_period(period, company.period_type)) for period in periods]
+    grid_ndim = len(axes)
+
+    def column(records, name):
+        values = np.array([np.nan if fi is None else fi.get(name, np.nan) for fi in records], dtype=float)
+        return values.reshape((len(records),) + (1,) * grid_ndim)
+
+    names = {name for fi in company.financial_inputs for name in fi.keys()} - {'year', 'quarter'}
+    columns = {name: column([inputs[p] for p in periods], name) for name in names}
+    previous = {name: column(prior, name) for name in names}
+    for axis, name in enumerate(axes):
+        factor = 1 + np.asarray(shocks[name], dtype=float).reshape((1,) * (axis + 1) + (-1,) + (1,) * (grid_ndim - axis - 1))
+        if name in columns:
+            columns[name] = columns[name] * factor
+            previous[name] = previous[name] * factor
+    previous_exists = np.array([fi is not None for fi in prior]).reshape((len(periods),) + (1,) * grid_ndim)
+
+    results = compute_metrics(columns, previous, previous_exists)
+    suffix = '_yoy_growth' if company.period_type == 'annual' else '_qoq_growth'
+    index = {period: i for i, period in enumerate(periods)}
+    has_prior = np.array([_previous_period(p, company.period_type) in index for p in periods])
+    prior_rows = np.array([index.get(_previous_period(p, company.period_type), 0) for p in periods])
+    for name in METRIC_NAMES:
+        series = results[name]
+        mask = has_prior.reshape((len(periods),) + (1,) * grid_ndim)
+        results[name + suffix] = np.where(mask, ratio_growth(series, series[prior_rows]), np.nan)
+    return periods, axes, results
@@ -0,0 +1,430 @@
+#!/usr/bin/python3
+
+import json
+import sqlite3
+
+from FA import Company
+from schema import validate_record
+
+# Reason prefix of the flags raised when a stored statement fails an accounting identity
+IDENTITY_FLAG_REASON = 'Accounting identities do not hold: '
+
+
+class StatementDatabase:
+    """
+    SQLite store for submitted financial statements with a materialized metric table.
+
+    Every insert, update or delete on FINANCIAL_STATEMENTS is recorded in a change log
+    by SQL triggers. `refresh_metrics` drains that log in batches and recomputes the
+    metrics of the affected ticker-periods (and the following periods, whose growth
+    figures depend on them). Reads only ever touch the materialized table.
+    """
+
+    # How many periods ahead a changed statement can still alter metrics: the growth
+    # of inventory turnover at t compares against turnover at t-1, which reads t-2.
+    DEPENDENCY_DEPTH = 2
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS companies (
+        ticker TEXT PRIMARY KEY,
+        full_name TEXT,
+        sector TEXT,
+        listing_date TEXT,
+        status TEXT NOT NULL DEFAULT 'active'
+    );
+
+    CREATE TABLE IF NOT EXISTS financial_statements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker TEXT NOT NULL,
+        period_type TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        quarter INTEGER NOT NULL DEFAULT 0,
+        period_end_date TEXT,
+        line_items TEXT NOT NULL,
+        submitted_by INTEGER,
+        submitted_date TEXT,
+        verified INTEGER NOT NULL DEFAULT 0,
+        verification_count INTEGER NOT NULL DEFAULT 0,
+        identity_mask INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (ticker, period_type, year, quarter)
+    );
+
+    CREATE TABLE IF NOT EXISTS data_validation_flags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        statement_id INTEGER,
+        flagged_by INTEGER,
+        flag_reason TEXT NOT NULL,
+        flag_date TEXT,
+        resolved INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS metric_values (
+        ticker TEXT NOT NULL,
+        period_type TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        quarter INTEGER NOT NULL,
+        metric TEXT NOT NULL,
+        value REAL,
+        PRIMARY KEY (ticker, period_type, year, quarter, metric)
+    );
+
+    CREATE TABLE IF NOT EXISTS metric_changelog (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker TEXT NOT NULL,
+        period_type TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        quarter INTEGER NOT NULL
+    );
+
+    CREATE TRIGGER IF NOT EXISTS statements_after_insert AFTER INSERT ON financial_statements
+    BEGIN
+        INSERT INTO metric_changelog (ticker, period_type, year, quarter)
+        VALUES (NEW.ticker, NEW.period_type, NEW.year, NEW.quarter);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS statements_after_update AFTER UPDATE ON financial_statements
+    BEGIN
+        INSERT INTO metric_changelog (ticker, period_type, year, quarter)
+        VALUES (OLD.ticker, OLD.period_type, OLD.year, OLD.quarter);
+        INSERT INTO metric_changelog (ticker, period_type, year, quarter)
+        SELECT NEW.ticker, NEW.period_type, NEW.year, NEW.quarter
+        WHERE NEW.ticker != OLD.ticker OR NEW.period_type != OLD.period_type
+              OR NEW.year != OLD.year OR NEW.quarter != OLD.quarter;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS statements_after_delete AFTER DELETE ON financial_statements
+    BEGIN
+        INSERT INTO metric_changelog (ticker, period_type, year, quarter)
+        VALUES (OLD.ticker, OLD.period_type, OLD.year, OLD.quarter);
+    END;
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        """
+        Opens (or creates) the statement database.
+
+        Args:
+            path (str): Path to the SQLite file, or ':memory:' for a throwaway database.
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self):
+        """Closes the underlying SQLite connection."""
+        self.connection.close()
+
+    # --- Writes -------------------------------------------------------------
+
+    def add_company(self, ticker: str, full_name: str = None, sector: str = None,
+                    listing_date: str = None, status: str = 'active'):
+        """Registers a company in the COMPANIES table, replacing any existing entry."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO companies VALUES (?, ?, ?, ?, ?)",
+                (ticker, full_name, sector, listing_date, status))
+
+    def add_statement(self, ticker: str, finance_input: dict, period_type: str = 'annual',
+                      submitted_by: int = None, submitted_date: str = None,
+                      period_end_date: str = None) -> int:
+        """
+        Stores one period of financial data for a ticker.
+
+        The accounting identities are checked on the way in: the failure bitmask is
+        stored with the statement, and a failing statement also gets an open
+        DATA_VALIDATION_FLAGS entry naming the identities. It is stored either way.
+
+        Args:
+            ticker (str): The company ticker.
+            finance_input (dict): The period dictionary, as accepted by `Company.add_period_data`.
+            period_type (str): Either 'annual' or 'quarterly'.
+            submitted_by (int): The submitting user's id.
+            submitted_date (str): ISO date of the submission.
+            period_end_date (str): ISO date the reporting period ended.
+
+        Returns:
+            int: The id of the new statement row.
+
+        Raises:
+            ValueError: If the period keys are missing, the input does not match the
+                        line-item schema or the period already exists.
+        """
+        year, quarter = self._split_period(finance_input, period_type)
+        line_items, mask, failed = self._encode_line_items(finance_input)
+        try:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO financial_statements (ticker, period_type, year, quarter, "
+                    "period_end_date, line_items, submitted_by, submitted_date, identity_mask) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (ticker, period_type, year, quarter, period_end_date,
+                     line_items, submitted_by, submitted_date, mask))
+                self._flag_identities(cursor.lastrowid, failed, submitted_date)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Financial data for {ticker} period {(year, quarter)} already exists.")
+        return cursor.lastrowid
+
+    def update_statement(self, statement_id: int, finance_input: dict):
+        """
+        Replaces the line items of an existing statement.
+
+        The identities are re-checked: open identity flags of the statement are resolved
+        and a new one is raised if the replacement still fails any.
+
+        Raises:
+            ValueError: If the input does not match the line-item schema or no statement
+                        exists with the given id.
+        """
+        line_items, mask, failed = self._encode_line_items(finance_input)
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE financial_statements SET line_items = ?, identity_mask = ? WHERE id = ?",
+                (line_items, mask, statement_id))
+            if cursor.rowcount == 0:
+                raise ValueError(f"No statement with id {statement_id}.")
+            self.connection.execute(
+                "UPDATE data_validation_flags SET resolved = 1 "
+                "WHERE statement_id = ? AND flagged_by IS NULL AND resolved = 0 AND flag_reason LIKE ?",
+                (statement_id, IDENTITY_FLAG_REASON + '%'))
+            self._flag_identities(statement_id, failed)
+
+    def _flag_identities(self, statement_id: int, failed: list, flag_date: str = None):
+        """Raises one open flag listing the failed identities, if there are any."""
+        if failed:
+            self.connection.execute(
+                "INSERT INTO data_validation_flags (statement_id, flag_reason, flag_date) VALUES (?, ?, ?)",
+                (statement_id, IDENTITY_FLAG_REASON + ', '.join(failed), flag_date))
+
+    def verify_statement(self, statement_id: int):
+        """
+        Records one more verification for a statement and marks it verified.
+
+        Raises:
+            ValueError: If no statement exists with the given id.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE financial_statements "
+                "SET verified = 1, verification_count = verification_count + 1 WHERE id = ?",
+                (statement_id,))
+        if cursor.rowcount == 0:
+            raise ValueError(f"No statement with id {statement_id}.")
+
+    def delete_statement(self, statement_id: int):
+        """Removes a statement; its metrics are dropped on the next refresh."""
+        with self.connection:
+            self.connection.execute("DELETE FROM financial_statements WHERE id = ?", (statement_id,))
+
+    def add_flag(self, statement_id: int, flag_reason: str, flagged_by: int = None,
+                 flag_date: str = None) -> int:
+        """Records a DATA_VALIDATION_FLAGS entry and returns its id."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO data_validation_flags (statement_id, flagged_by, flag_reason, flag_date) "
+                "VALUES (?, ?, ?, ?)", (statement_id, flagged_by, flag_reason, flag_date))
+        return cursor.lastrowid
+
+    def resolve_flag(self, flag_id: int):
+        """Marks a validation flag as resolved."""
+        with self.connection:
+            self.connection.execute("UPDATE data_validation_flags SET resolved = 1 WHERE id = ?", (flag_id,))
+
+    def open_flags(self, statement_id: int = None) -> list:
+        """Returns unresolved flags as (id, statement_id, flagged_by, flag_reason, flag_date) rows."""
+        query = ("SELECT id, statement_id, flagged_by, flag_reason, flag_date "
+                 "FROM data_validation_flags WHERE resolved = 0")
+        if statement_id is None:
+            return self.connection.execute(query).fetchall()
+        return self.connection.execute(query + " AND statement_id = ?", (statement_id,)).fetchall()
+
+    # --- Incremental maintenance -------------------------------------------
+
+    def pending_changes(self) -> int:
+        """Returns the number of change log entries not yet processed."""
+        return self.connection.execute("SELECT COUNT(*) FROM metric_changelog").fetchone()[0]
+
+    def refresh_metrics(self, batch_size: int = 500, max_batches: int = None) -> int:
+        """
+        Drains the change log in batches, recomputing only the affected ticker-periods.
+
+        A changed period invalidates its own metrics and those of the next
+        `DEPENDENCY_DEPTH` periods: inventory turnover reads the previous period, and the
+        growth of inventory turnover and inventory days reads the previous period's
+        turnover, so a change reaches two periods ahead. The same number of earlier
+        periods is loaded, so the rewritten periods see their whole history.
+
+        Args:
+            batch_size (int): Maximum number of change log entries handled per transaction.
+            max_batches (int): Stop after this many batches; None drains the whole log.
+
+        Returns:
+            int: The number of change log entries processed.
+        """
+        processed = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            rows = self.connection.execute(
+                "SELECT seq, ticker, period_type, year, quarter FROM metric_changelog "
+                "ORDER BY seq LIMIT ?", (batch_size,)).fetchall()
+            if not rows:
+                break
+
+            affected = dict()
+            for _, ticker, period_type, year, quarter in rows:
+                affected.setdefault((ticker, period_type), set()).add((year, quarter))
+
+            with self.connection:
+                for (ticker, period_type), periods in affected.items():
+                    self._recompute(ticker, period_type, periods)
+                self.connection.execute("DELETE FROM metric_changelog WHERE seq <= ?", (rows[-1][0],))
+
+            processed += len(rows)
+            batches += 1
+        return processed
+
+    def _recompute(self, ticker: str, period_type: str, changed: set):
+        """Recomputes and rewrites the metrics for the changed periods and the periods that read them."""
+        to_write = set()
+        to_load = set()
+        for period in changed:
+            window = [period]
+            for _ in range(self.DEPENDENCY_DEPTH):
+                window.append(self._next_period(window[-1], period_type))
+            to_write.update(window)
+            previous = period
+            for _ in range(self.DEPENDENCY_DEPTH):
+                previous = self._prev_period(previous, period_type)
+                window.append(previous)
+            to_load.update(window)
+
+        statements = dict()
+        min_year = min(year for year, _ in to_load)
+        max_year = max(year for year, _ in to_load)
+        for year, quarter, line_items in self.connection.execute(
+                "SELECT year, quarter, line_items FROM financial_statements "
+                "WHERE ticker = ? AND period_type = ? AND year BETWEEN ? AND ?",
+                (ticker, period_type, min_year, max_year)):
+            if (year, quarter) in to_load:
+                statements[(year, quarter)] = self._decode_line_items(line_items, year, quarter, period_type)
+
+        output = dict()
+        if statements:
+            company = Company(ticker, len(statements), period_type)
+            for finance_input in statements.values():
+                company.add_period_data(finance_input)
+            company.calculate_all_metrics()
+            output = company.output
+
+        for year, quarter in to_write:
+            self.connection.execute(
+                "DELETE FROM metric_values WHERE ticker = ? AND period_type = ? AND year = ? AND quarter = ?",
+                (ticker, period_type, year, quarter))
+            if (year, quarter) not in statements:
+                continue
+            metrics = output.get(self._company_period(year, quarter, period_type), {})
+            self.connection.executemany(
+                "INSERT INTO metric_values VALUES (?, ?, ?, ?, ?, ?)",
+                [(ticker, period_type, year, quarter, name, value) for name, value in metrics.items()])
+
+    # --- Reads --------------------------------------------------------------
+
+    def get_metrics(self, ticker: str, year: int, quarter: int = 0, period_type: str = 'annual') -> dict:
+        """
+        Returns the materialized metrics for one ticker-period.
+
+        This never triggers computation; call `refresh_metrics` after writes.
+        """
+        rows = self.connection.execute(
+            "SELECT metric, value FROM metric_values "
+            "WHERE ticker = ? AND period_type = ? AND year = ? AND quarter = ?",
+            (ticker, period_type, year, quarter))
+        return dict(rows.fetchall())
+
+    def get_metric_history(self, ticker: str, metric: str, period_type: str = 'annual') -> dict:
+        """Returns {(year, quarter): value} for one metric of a ticker, in period order."""
+        rows = self.connection.execute(
+            "SELECT year, quarter, value FROM metric_values "
+            "WHERE ticker = ? AND period_type = ? AND metric = ? ORDER BY year, quarter",
+            (ticker, period_type, metric))
+        return {(year, quarter): value for year, quarter, value in rows}
+
+    def get_identity_mask(self, statement_id: int) -> int:
+        """
+        Returns the accounting identity bitmask stored with a statement (see identity_checks.py).
+
+        Raises:
+            ValueError: If no statement exists with the given id.
+        """
+        row = self.connection.execute(
+            "SELECT identity_mask FROM financial_statements WHERE id = ?", (statement_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"No statement with id {statement_id}.")
+        return row[0]
+
+    def get_statement(self, ticker: str, year: int, quarter: int = 0, period_type: str = 'annual') -> dict | None:
+        """Returns the stored period dictionary for one ticker-period, or None."""
+        row = self.connection.execute(
+            "SELECT line_items FROM financial_statements "
+            "WHERE ticker = ? AND period_type = ? AND year = ? AND quarter = ?",
+            (ticker, period_type, year, quarter)).fetchone()
+        if row is None:
+            return None
+        return self._decode_line_items(row[0], year, quarter, period_type)
+
+    # --- Helpers ------------------------------------------------------------
+
+    @staticmethod
+    def _split_period(finance_input: dict, period_type: str) -> tuple:
+        """Extracts (year, quarter) from a period dictionary; annual periods use quarter 0."""
+        if period_type not in ['annual', 'quarterly']:
+            raise ValueError("period_type must be either 'annual' or 'quarterly'.")
+        if 'year' not in finance_input:
+            raise ValueError("Input is missing the 'year' key.")
+        if period_type == 'annual':
+            return finance_input['year'], 0
+        if finance_input.get('quarter') not in [1, 2, 3, 4]:
+            raise ValueError("Quarter must be an integer between 1 and 4.")
+        return finance_input['year'], finance_input['quarter']
+
+    @staticmethod
+    def _encode_line_items(finance_input: dict) -> tuple:
+        """
+        Serializes the line items under their canonical names, leaving out period keys
+        stored in their own columns.
+
+        Returns:
+            tuple: (JSON line items, identity bitmask, names of the failed identities).
+
+        Raises:
+            ValueError: If the input does not match the line-item schema.
+        """
+        record, mask, failed = validate_record(finance_input)
+        line_items = {k: v for k, v in record.items() if k not in ['year', 'quarter']}
+        return json.dumps(line_items, sort_keys=True), mask, failed
+
+    @staticmethod
+    def _decode_line_items(line_items: str, year: int, quarter: int, period_type: str) -> dict:
+        """Rebuilds the period dictionary `Company.add_period_data` expects."""
+        finance_input = json.loads(line_items)
+        finance_input['year'] = year
+        if period_type == 'quarterly':
+            finance_input['quarter'] = quarter
+        return finance_input
+
+    @staticmethod
+    def _company_period(year: int, quarter: int, period_type: str):
+        """Maps a (year, quarter) row key to the period key used in `Company.output`."""
+        return year if period_type == 'annual' else (year, quarter)
+
+    @staticmethod
+    def _prev_period(period: tuple, period_type: str) -> tuple:
+        year, quarter = period
+        if period_type == 'annual':
+            return (year - 1, 0)
+        return (year - 1, 4) if quarter == 1 else (year, quarter - 1)
+
+    @staticmethod
+    def _next_period(period: tuple, period_type: str) -> tuple:
+        year, quarter = period
+        if period_type == 'annual':
+            return (year + 1, 0)
+        return (year + 1, 1) if quarter == 4 else (year, quarter + 1)
@@ -0,0 +1,218 @@
+#!/usr/bin/python3
+
+import hashlib
+import json
+import math
+import sqlite3
+
+from FA import Company
+from schema import PeriodRecord, validate_record
+
+
+def canonicalize(finance_input: dict) -> bytes:
+    """
+    Returns the canonical byte form of a period dictionary.
+
+    The input is first checked against the line-item schema, so aliases such as 'PBT'
+    are mapped onto their canonical names and internal keys (leading underscore, e.g.
+    '_period') are dropped. Keys are then sorted and integral floats are written as
+    integers, so 1000 and 1000.0 hash the same.
+
+    Raises:
+        ValueError: If the input does not match the schema or a value is not finite.
+    """
+    return _canonical_bytes(PeriodRecord.from_dict(finance_input))
+
+
+def _canonical_bytes(record: PeriodRecord) -> bytes:
+    """Serializes an already validated record; see `canonicalize`."""
+    canonical = dict()
+    for key, value in record.items():
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                raise ValueError(f"Line item '{key}' is not a finite number.")
+            if value.is_integer():
+                value = int(value)
+        canonical[key] = value
+    return json.dumps(canonical, sort_keys=True, separators=(',', ':')).encode()
+
+
+def content_address(finance_input: dict) -> str:
+    """Returns the SHA-256 content address of a period dictionary."""
+    return hashlib.sha256(canonicalize(finance_input)).hexdigest()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over content addresses.
+
+    `might_contain` never returns a false negative, so a miss proves a submission is
+    new without a database lookup. Bit positions come from double hashing the
+    address digest, which is already uniformly distributed.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity (int): Expected number of distinct addresses.
+            error_rate (float): Target false positive rate at that capacity.
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, address: str):
+        digest = bytes.fromhex(address)
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, address: str):
+        for position in self._positions(address):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, address: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(address))
+
+
+class SubmissionStore:
+    """
+    Content-addressed store of crowd-submitted statements.
+
+    Every submission is recorded, but identical period dictionaries share one stored
+    record and one set of computed single-period metrics, keyed by their content
+    address. A Bloom filter answers "seen before?" for the ingestion hot path.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS statement_contents (
+        address TEXT PRIMARY KEY,
+        line_items TEXT NOT NULL,
+        identity_mask INTEGER NOT NULL DEFAULT 0,
+        submission_count INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS submissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker TEXT NOT NULL,
+        period_type TEXT NOT NULL,
+        address TEXT NOT NULL REFERENCES statement_contents (address),
+        submitted_by INTEGER,
+        submitted_date TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS content_metrics (
+        address TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        value REAL,
+        PRIMARY KEY (address, metric)
+    );
+    """
+
+    def __init__(self, connection: sqlite3.Connection = None, capacity: int = 1_000_000,
+                 error_rate: float = 0.001):
+        """
+        Args:
+            connection (sqlite3.Connection): Connection to store into, e.g.
+                `StatementDatabase.connection`; a private in-memory database if None.
+            capacity (int): Expected number of distinct statements, used to size the Bloom filter.
+            error_rate (float): Bloom filter false positive rate at that capacity.
+        """
+        self.connection = connection if connection is not None else sqlite3.connect(':memory:')
+        self.connection.executescript(self.SCHEMA)
+        self.bloom = BloomFilter(capacity, error_rate)
+        for (address,) in self.connection.execute("SELECT address FROM statement_contents"):
+            self.bloom.add(address)
+
+    def seen(self, finance_input: dict) -> bool:
+        """Returns True if an identical period dictionary has been submitted before."""
+        address = content_address(finance_input)
+        if not self.bloom.might_contain(address):
+            return False
+        return self._exists(address)
+
+    def _exists(self, address: str) -> bool:
+        return self.connection.execute(
+            "SELECT 1 FROM statement_contents WHERE address = ?", (address,)).fetchone() is not None
+
+    def submit(self, ticker: str, finance_input: dict, period_type: str = 'annual',
+               submitted_by: int = None, submitted_date: str = None) -> tuple:
+        """
+        Records a submission, storing its contents only if they are new.
+
+        New contents are checked against the accounting identities and stored with
+        their failure bitmask (see `identity_mask`); failing contents are still stored.
+
+        Returns:
+            tuple: (address, is_new), where is_new is False for a duplicate of earlier contents.
+
+        Raises:
+            ValueError: If the input does not match the schema or a value is not finite.
+        """
+        record, mask, _ = validate_record(finance_input)
+        canonical = _canonical_bytes(record)
+        address = hashlib.sha256(canonical).hexdigest()
+        # A Bloom filter miss proves the contents are new, so the lookup is skipped
+        is_new = not self.bloom.might_contain(address) or not self._exists(address)
+        with self.connection:
+            if is_new:
+                self.connection.execute(
+                    "INSERT INTO statement_contents (address, line_items, identity_mask) VALUES (?, ?, ?)",
+                    (address, canonical.decode(), mask))
+                self.bloom.add(address)
+            self.connection.execute(
+                "UPDATE statement_contents SET submission_count = submission_count + 1 WHERE address = ?",
+                (address,))
+            self.connection.execute(
+                "INSERT INTO submissions (ticker, period_type, address, submitted_by, submitted_date) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (ticker, period_type, address, submitted_by, submitted_date))
+        return address, is_new
+
+    def get_contents(self, address: str) -> dict | None:
+        """Returns the stored period dictionary for a content address, or None."""
+        row = self.connection.execute(
+            "SELECT line_items FROM statement_contents WHERE address = ?", (address,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def identity_mask(self, address: str) -> int:
+        """
+        Returns the accounting identity bitmask of the contents at an address (see identity_checks.py).
+
+        Raises:
+            ValueError: If the address is unknown.
+        """
+        row = self.connection.execute(
+            "SELECT identity_mask FROM statement_contents WHERE address = ?", (address,)).fetchone()
+        if row is None:
+            raise ValueError(f"No statement with content address {address}.")
+        return row[0]
+
+    def metrics_for(self, address: str) -> dict:
+        """
+        Returns the single-period metrics for a content address, computing them only once.
+
+        Growth metrics depend on neighbouring periods rather than on the contents alone,
+        so only the per-period ratios are shared here.
+
+        Raises:
+            ValueError: If the address is unknown.
+        """
+        rows = self.connection.execute(
+            "SELECT metric, value FROM content_metrics WHERE address = ?", (address,)).fetchall()
+        if rows:
+            return dict(rows)
+
+        finance_input = self.get_contents(address)
+        if finance_input is None:
+            raise ValueError(f"No statement with content address {address}.")
+        period_type = 'quarterly' if 'quarter' in finance_input else 'annual'
+        company = Company(address, 1, period_type)
+        company.add_period_data(finance_input)
+        company.calculate_all_metrics()
+        metrics = next(iter(company.output.values()), {})
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO content_metrics VALUES (?, ?, ?)",
+                [(address, name, value) for name, value in metrics.items()])
+        return metrics
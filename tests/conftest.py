@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+
+import numpy as np
+import pytest
+
+# Line items filled in by `random_statement`; enough for every ratio in FA.py.
+LINE_ITEMS = ['revenue', 'COGS', 'operating_income', 'net_profit', 'profit_bfor_tax', 'tax_expense',
+              'asset', 'current_asset', 'current_liabilities', 'liabilities', 'book_value', 'inventory',
+              'short_term_debt', 'cash_and_equivalent', 'long_term_debt', 'outstanding_shares', 'market_cap',
+              'cash_from_opr', 'capex', 'finance_cost', 'depreciation']
+
+
+def random_statement(rng: np.random.Generator, year: int, quarter: int = None) -> dict:
+    """One period of positive whole-number line items, as accepted by `Company.add_period_data`."""
+    statement = {name: float(rng.integers(1, 10_000)) for name in LINE_ITEMS}
+    statement['year'] = year
+    if quarter is not None:
+        statement['quarter'] = quarter
+    return statement
+
+
+@pytest.fixture(scope='class')
+def statements(request):
+    """Gives a test class `self.random_statement(rng, year, quarter=None)`."""
+    request.cls.random_statement = staticmethod(random_statement)
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from alerts import AlertEngine
+
+
+def brute_force(alerts: dict, old, new) -> set:
+    """Alerts crossed by a move from `old` to `new`, checked one by one."""
+    fired = set()
+    for alert_id, (threshold, direction) in alerts.items():
+        if direction == 'above' and (old is None or old <= threshold) and threshold < new:
+            fired.add(alert_id)
+        if direction == 'below' and new < threshold and (old is None or threshold <= old):
+            fired.add(alert_id)
+    return fired
+
+
+class AlertEngineTest(unittest.TestCase):
+
+    def test_updates_fire_the_same_alerts_as_a_linear_scan(self):
+        rng = np.random.default_rng(5)
+        engine = AlertEngine()
+        alerts = dict()
+        for _ in range(500):
+            threshold = float(rng.integers(0, 40))
+            direction = 'above' if rng.random() < 0.5 else 'below'
+            alerts[engine.add_alert('DANGCEM', 'price_to_earnings', threshold, direction)] = (threshold, direction)
+
+        old = None
+        for step in range(300):
+            if step % 50 == 49:
+                for alert_id in list(alerts)[:20]:
+                    engine.remove_alert(alert_id)
+                    del alerts[alert_id]
+            new = float(rng.integers(-5, 45))
+            fired = engine.update('DANGCEM', 'price_to_earnings', new)
+            self.assertEqual(len(fired), len(set(fired)))
+            self.assertEqual(set(fired), brute_force(alerts, old, new), (old, new))
+            old = new
+
+    def test_missing_values_reset_without_firing(self):
+        engine = AlertEngine()
+        alert_id = engine.add_alert('MTNN', 'ROE', 25, 'above')
+        self.assertEqual(engine.update('MTNN', 'ROE', 30.0), [alert_id])
+        self.assertEqual(engine.update('MTNN', 'ROE', None), [])
+        self.assertEqual(engine.update('MTNN', 'ROE', 31.0), [alert_id])
+        self.assertEqual(engine.update('MTNN', 'ROE', 32.0), [])
+
+    def test_invalid_alerts_are_rejected(self):
+        engine = AlertEngine()
+        with self.assertRaises(ValueError):
+            engine.add_alert('MTNN', 'ROE', 25, 'sideways')
+        with self.assertRaises(ValueError):
+            engine.add_alert('MTNN', 'ROE', float('nan'), 'above')
+        with self.assertRaises(KeyError):
+            engine.remove_alert(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
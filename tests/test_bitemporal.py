@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+
+import datetime
+import unittest
+
+from bitemporal import BitemporalStore
+
+
+class BitemporalStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = BitemporalStore()
+        # Out of knowledge-date order on purpose
+        self.store.record('X', {'year': 2022, 'revenue': 120.0}, '2023-06-01')
+        self.store.record('X', {'year': 2022, 'revenue': 100.0}, '2023-02-01')
+        self.store.record('X', {'year': 2023, 'revenue': 130.0}, datetime.date(2024, 2, 1))
+        self.store.record('X', {'year': 2022, 'revenue': 110.0}, datetime.datetime(2023, 3, 15, 9, 30))
+
+    def test_as_of_returns_the_latest_version_known_on_the_date(self):
+        self.assertIsNone(self.store.as_of('X', '2023-01-31', period=2022))
+        self.assertEqual(self.store.as_of('X', '2023-02-01', period=2022)['revenue'], 100.0)
+        self.assertEqual(self.store.as_of('X', '2023-03-14', period=2022)['revenue'], 100.0)
+        self.assertEqual(self.store.as_of('X', '2023-03-15', period=2022)['revenue'], 110.0)
+        self.assertEqual(self.store.as_of('X', '2030-01-01', period=2022)['revenue'], 120.0)
+        self.assertIsNone(self.store.as_of('Y', '2030-01-01', period=2022))
+
+    def test_snapshots_only_hold_periods_known_by_then(self):
+        self.assertEqual(list(self.store.as_of('X', '2023-12-31')), [2022])
+        snapshot = self.store.as_of('X', '2024-02-01')
+        self.assertEqual({period: record['revenue'] for period, record in snapshot.items()}, {2022: 120.0, 2023: 130.0})
+        self.assertEqual(self.store.as_of('X', '2024-02-01', 'quarterly'), {})
+
+    def test_versions_and_events_are_in_knowledge_date_order(self):
+        trail = self.store.versions('X', 2022)
+        self.assertEqual([known.isoformat() for known, _ in trail], ['2023-02-01', '2023-03-15', '2023-06-01'])
+        self.assertEqual([record['revenue'] for _, record in trail], [100.0, 110.0, 120.0])
+        events = self.store.events()
+        self.assertEqual([(ticker, period) for _, ticker, period, _ in events], [('X', 2022)] * 3 + [('X', 2023)])
+        self.assertEqual(self.store.versions('X', 2021), [])
+
+    def test_company_as_of_loads_the_snapshot(self):
+        company = self.store.company_as_of('X', '2023-04-01')
+        self.assertEqual(company.no_of_periods, 1)
+        self.assertEqual([fi['revenue'] for fi in company.financial_inputs], [110.0])
+
+    def test_quarterly_records_are_kept_apart(self):
+        self.store.record('X', {'year': 2023, 'quarter': 1, 'revenue': 30.0}, '2023-05-01', 'quarterly')
+        self.assertEqual(self.store.as_of('X', '2023-05-01', 'quarterly', (2023, 1))['revenue'], 30.0)
+        self.assertIsNone(self.store.as_of('X', '2023-05-01', period=(2023, 1)))
+
+    def test_invalid_records_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.store.record('X', {'year': 2022, 'revenue': 1.0}, '2023-02-01')
+        with self.assertRaises(ValueError):
+            self.store.record('X', {'year': 2023, 'revenue': 1.0}, '2023-02-01', 'quarterly')
+        with self.assertRaises(ValueError):
+            self.store.record('X', {'year': 2023, 'sales': 1.0}, '2023-02-01')
+        with self.assertRaises(ValueError):
+            self.store.record('X', {'year': 2023}, '2023-02-01', 'monthly')
+
+
+if __name__ == '__main__':
+    unittest.main()
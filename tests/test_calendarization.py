@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+
+import datetime
+import unittest
+
+import numpy as np
+
+from calendarization import Calendarizer, period_end_date
+from mixed_frequency import MixedFrequencyStore
+from schema import FIELD_IDS
+
+REVENUE, ASSET = FIELD_IDS['revenue'], FIELD_IDS['asset']
+
+
+def annual_store(name: str, year_end_month: int, reports: dict) -> MixedFrequencyStore:
+    store = MixedFrequencyStore(name, year_end_month)
+    for year, (revenue, asset) in reports.items():
+        store.add_report('FY', {'year': year, 'revenue': revenue, 'asset': asset})
+    return store
+
+
+class CalendarizerTest(unittest.TestCase):
+
+    def test_fiscal_period_end_dates(self):
+        self.assertEqual(period_end_date(2024, None, 3), datetime.date(2024, 3, 31))
+        self.assertEqual(period_end_date(2024, 1, 3), datetime.date(2023, 6, 30))
+        self.assertEqual(period_end_date(2024, 4, 3), datetime.date(2024, 3, 31))
+        self.assertEqual(period_end_date(2024, 2), datetime.date(2024, 6, 30))
+
+    def test_annual_flows_are_prorated_by_days(self):
+        store = annual_store('X', 3, {2023: (365.0, 10.0), 2024: (732.0, 20.0)})
+        _, values = Calendarizer([2023]).calendarize_stores({'X': store})
+        # Calendar 2023: Jan-Mar 2023 of FY2023 (90 of 365 days) and Apr-Dec 2023 of FY2024 (275 of 366)
+        self.assertAlmostEqual(values[0, 0, REVENUE], 90.0 + 275.0 * 2)
+        # Stocks come from the fiscal year ending inside the calendar year
+        self.assertEqual(values[0, 0, ASSET], 10.0)
+        self.assertEqual(values[0, 0, FIELD_IDS['year']], 2023)
+
+    def test_flows_need_every_overlapping_fiscal_period(self):
+        store = annual_store('X', 3, {2023: (365.0, 10.0)})
+        _, values = Calendarizer([2023, 2024]).calendarize_stores({'X': store})
+        self.assertTrue(np.isnan(values[0, :, REVENUE]).all())
+        self.assertEqual(values[0, 0, ASSET], 10.0)
+        self.assertTrue(np.isnan(values[0, 1, ASSET]))
+
+    def test_offset_fiscal_quarters_map_onto_calendar_quarters(self):
+        store = MixedFrequencyStore('X', 3)
+        for q in range(1, 5):
+            store.add_report(f'Q{q}', {'year': 2024, 'revenue': float(q), 'asset': 10.0 * q})
+        calendarizer = Calendarizer([(2023, 2), (2023, 3), (2023, 4), (2024, 1)], 'quarterly')
+        _, values = calendarizer.calendarize_stores({'X': store})
+        np.testing.assert_allclose(values[0, :, REVENUE], [1.0, 2.0, 3.0, 4.0])
+        np.testing.assert_allclose(values[0, :, ASSET], [10.0, 20.0, 30.0, 40.0])
+        np.testing.assert_array_equal(values[0, :, FIELD_IDS['quarter']], [2, 3, 4, 1])
+
+    def test_batched_stores_match_one_store_at_a_time(self):
+        rng = np.random.default_rng(36)
+        stores = {f'T{i}': annual_store(f'T{i}', month, {year: tuple(rng.uniform(1, 1000, 2))
+                                                        for year in range(2018 + i % 2, 2024)})
+                  for i, month in enumerate([12, 3, 6, 3, 9, 12])}
+        calendarizer = Calendarizer(range(2019, 2024))
+        tickers, values = calendarizer.calendarize_stores(stores)
+        self.assertEqual(tickers, list(stores))
+        for i, ticker in enumerate(tickers):
+            _, single = Calendarizer(range(2019, 2024)).calendarize_stores({ticker: stores[ticker]})
+            np.testing.assert_allclose(values[i], single[0], equal_nan=True)
+
+    def test_alignments_are_cached_per_fiscal_calendar(self):
+        calendarizer = Calendarizer([2023])
+        ends = (period_end_date(2023, None, 6), period_end_date(2024, None, 6))
+        self.assertIs(calendarizer.alignment(ends), calendarizer.alignment(list(ends)))
+        with self.assertRaises(ValueError):
+            Calendarizer([2023], 'monthly')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from consensus import ConsensusResolver
+
+
+class ConsensusResolverTest(unittest.TestCase):
+
+    def expected_open_flags(self, resolver: ConsensusResolver, submissions: list) -> set:
+        """Brute-force outlier set: every stored value checked against its field's consensus."""
+        expected = set()
+        for ticker, year in {(ticker, year) for ticker, year, _, _ in submissions}:
+            consensus = resolver.consensus_record(ticker, year)
+            for field in consensus:
+                if field == 'year':
+                    continue
+                values = [(sid, record[field]) for t, y, sid, record in submissions
+                          if (t, y) == (ticker, year) and field in record]
+                if len(values) < resolver.min_submissions:
+                    continue
+                scale = abs(consensus[field]) if consensus[field] else 1.0
+                expected.update((sid, field) for sid, value in values
+                                if abs(value - consensus[field]) / scale > resolver.outlier_tolerance)
+        return expected
+
+    def test_incremental_flags_match_a_full_rescan(self):
+        rng = np.random.default_rng(30)
+        for method in ConsensusResolver.METHODS:
+            resolver = ConsensusResolver(method, outlier_tolerance=0.05, min_submissions=3)
+            submissions = list()
+            for n in range(400):
+                ticker, year = f'T{rng.integers(0, 3)}', int(rng.integers(2020, 2023))
+                record = {'year': year,
+                          'revenue': float(rng.choice([100.0, 102.0, 104.0, 110.0, 95.0, 130.0])),
+                          'net_profit': float(rng.integers(8, 13))}
+                if rng.random() < 0.5:
+                    record['outstanding_shares'] = int(rng.integers(995, 1006))
+                resolver.submit(ticker, record, contribution_score=float(rng.uniform(0, 3)), submission_id=n)
+                submissions.append((ticker, year, n, record))
+                open_flags = {(flag['statement_id'], flag['flag_reason'].split("'")[1])
+                              for flag in resolver.open_flags()}
+                self.assertEqual(open_flags, self.expected_open_flags(resolver, submissions), (method, n))
+
+    def test_flags_are_resolved_when_consensus_moves_towards_them(self):
+        resolver = ConsensusResolver('median', min_submissions=3)
+        for n, revenue in enumerate([100.0, 100.0, 200.0]):
+            resolver.submit('A', {'year': 2023, 'revenue': revenue}, submission_id=n)
+        self.assertEqual([flag['statement_id'] for flag in resolver.open_flags()], [2])
+        for n in range(3, 6):
+            resolver.submit('A', {'year': 2023, 'revenue': 200.0}, submission_id=n)
+        self.assertEqual(sorted(flag['statement_id'] for flag in resolver.open_flags()), [0, 1])
+
+    def test_even_count_median_keeps_whole_number_fields_whole(self):
+        resolver = ConsensusResolver('median')
+        resolver.submit('A', {'year': 2023, 'revenue': 10.0, 'outstanding_shares': 1000})
+        consensus = resolver.submit('A', {'year': 2023, 'revenue': 11.0, 'outstanding_shares': 1001})
+        self.assertEqual(consensus['outstanding_shares'], 1000)
+        self.assertEqual(consensus['revenue'], 10.5)
+        company = resolver.build_company('A')
+        self.assertEqual(company.financial_inputs[0]['outstanding_shares'], 1000)
+
+    def test_weighted_median_and_mode(self):
+        weighted = ConsensusResolver('weighted_median')
+        mode = ConsensusResolver('mode')
+        for revenue, score in [(100.0, 1.0), (120.0, 5.0), (100.0, 1.0)]:
+            weighted.submit('A', {'year': 2023, 'revenue': revenue}, contribution_score=score)
+            mode.submit('A', {'year': 2023, 'revenue': revenue}, contribution_score=score)
+        self.assertEqual(weighted.consensus_record('A', 2023)['revenue'], 120.0)
+        self.assertEqual(mode.consensus_record('A', 2023)['revenue'], 100.0)
+
+    def test_aliases_fold_and_unknown_keys_are_rejected(self):
+        resolver = ConsensusResolver('median')
+        resolver.submit('A', {'year': 2023, 'PBT': 10.0})
+        consensus = resolver.submit('A', {'year': 2023, 'profit_bfor_tax': 12.0})
+        self.assertEqual(consensus, {'profit_bfor_tax': 11.0})
+        with self.assertRaises(ValueError):
+            resolver.submit('A', {'year': 2023, 'sales': 10.0})
+        with self.assertRaises(ValueError):
+            ConsensusResolver('mean')
+
+
+if __name__ == '__main__':
+    unittest.main()
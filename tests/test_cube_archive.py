@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from FA import Company
+from cube_archive import DELTA_BLOCK, FULL_BLOCK, INDEX_RECORD, CubeArchive
+from metric_cube import MetricCube, write_metric_cube
+
+
+class CubeArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.archive_dir = os.path.join(self.directory, 'archive')
+        self.rng = np.random.default_rng(28)
+        self.tickers = ['AAA', 'BBB', 'CCC']
+        self.periods = [2021, 2022, 2023]
+        self.metrics = ['ROE', 'ROA', 'price_to_book']
+        self.values = self.rng.normal(0, 50, (3, 3, 3)).round(2)
+        self.values[0, 0, 0] = np.nan
+        self.values[1, 1, 1] = -0.0
+        self.n = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def next_cube(self, tickers: list = None) -> MetricCube:
+        """Writes the current values as a cube after changing a few cells, like one trading day."""
+        for _ in range(2):
+            i, j, k = self.rng.integers(0, 3, 3)
+            self.values[i, j, k] = round(float(self.rng.normal(0, 50)), 2)
+        companies = list()
+        for i, ticker in enumerate(tickers or self.tickers):
+            company = Company(ticker, len(self.periods))
+            company.output = {period: {name: float(self.values[i, j, k]) for k, name in enumerate(self.metrics)}
+                              for j, period in enumerate(self.periods)}
+            companies.append(company)
+        self.n += 1
+        path = os.path.join(self.directory, f'cube{self.n}.dat')
+        write_metric_cube(path, companies)
+        return MetricCube(path)
+
+    def assertSameBits(self, actual: np.ndarray, expected: np.ndarray):
+        np.testing.assert_array_equal(actual.view('<u8'), expected.view('<u8'))
+
+    def test_every_day_round_trips_bit_for_bit(self):
+        for codec in ['zlib', 'lzma']:
+            directory = os.path.join(self.directory, codec)
+            archive = CubeArchive(directory, codec=codec, keyframe_interval=4)
+            expected = dict()
+            for day in range(12):
+                cube = self.next_cube()
+                archive.append(f'2024-01-{day + 1:02d}', cube)
+                expected[f'2024-01-{day + 1:02d}'] = np.array(cube.data)
+            reopened = CubeArchive(directory)
+            for day, data in expected.items():
+                self.assertSameBits(reopened.load_day(day), data)
+            roe = reopened.history('BBB', 'ROE')
+            column = cube.metrics.index('ROE')
+            for d, data in enumerate(expected.values()):
+                self.assertSameBits(roe[d], data[1, :, column])
+
+    def test_only_changed_columns_are_stored_with_keyframes(self):
+        archive = CubeArchive(self.archive_dir, keyframe_interval=3)
+        cube = self.next_cube()
+        archive.append('2024-01-01', cube)
+        archive.append('2024-01-02', cube)
+        self.assertEqual(sum(len(entries) for entries in archive._blocks.values()), 9)
+        for day in range(3, 12):
+            archive.append(f'2024-01-{day:02d}', self.next_cube())
+        for entries in archive._blocks.values():
+            kinds = [entry[4] for entry in entries]
+            self.assertEqual(kinds[0], FULL_BLOCK)
+            run = 0
+            for kind in kinds:
+                run = run + 1 if kind == DELTA_BLOCK else 0
+                self.assertLessEqual(run, 3)
+
+    def test_reopening_continues_the_archive(self):
+        archive = CubeArchive(self.archive_dir)
+        first = self.next_cube()
+        archive.append('2024-01-01', first)
+        archive = CubeArchive(self.archive_dir)
+        second = self.next_cube(['AAA', 'DDD'])
+        archive.append('2024-01-02', second)
+        reopened = CubeArchive(self.archive_dir)
+        self.assertEqual(reopened.tickers, ['AAA', 'BBB', 'CCC', 'DDD'])
+        day_two = reopened.load_day('2024-01-02')
+        self.assertSameBits(day_two[[0, 3]], np.array(second.data))
+        self.assertTrue(np.isnan(day_two[1:3]).all())
+        self.assertTrue(np.isnan(reopened.history('DDD', 'ROE')[0]).all())
+
+    def test_index_records_of_an_interrupted_append_are_dropped(self):
+        archive = CubeArchive(self.archive_dir)
+        cube = self.next_cube()
+        archive.append('2024-01-01', cube)
+        with open(os.path.join(self.archive_dir, 'index.dat'), 'ab') as f:
+            f.write(INDEX_RECORD.pack(1, 0, 0, 10**6, 10, 3, FULL_BLOCK) + b'\x01\x02')
+        reopened = CubeArchive(self.archive_dir)
+        self.assertSameBits(reopened.load_day('2024-01-01'), np.array(cube.data))
+        size = os.path.getsize(os.path.join(self.archive_dir, 'index.dat'))
+        self.assertEqual(size % INDEX_RECORD.size, 0)
+        reopened.append('2024-01-02', self.next_cube())
+        self.assertEqual(CubeArchive(self.archive_dir).days, ['2024-01-01', '2024-01-02'])
+
+    def test_bad_arguments_are_rejected(self):
+        archive = CubeArchive(self.archive_dir)
+        archive.append('2024-01-02', self.next_cube())
+        with self.assertRaises(ValueError):
+            archive.append('2024-01-01', self.next_cube())
+        with self.assertRaises(ValueError):
+            CubeArchive(os.path.join(self.directory, 'other'), codec='gzip')
+
+
+if __name__ == '__main__':
+    unittest.main()
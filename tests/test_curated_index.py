@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from FA import Company
+from curated_index import CuratedIndex, IndexEngine, capped_weights
+
+CONSTITUENTS = {'A': (10.0, 1000.0), 'B': (20.0, 200.0), 'C': (5.0, 400.0), 'D': (8.0, 250.0)}
+
+
+class CuratedIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CuratedIndex('DANG', base_level=1000.0, weight_cap=0.4)
+        self.index.rebalance(CONSTITUENTS)
+
+    def test_capped_weights(self):
+        weights = capped_weights([700.0, 200.0, 100.0], 0.5)
+        np.testing.assert_allclose(weights, [0.5, 0.5 * 2 / 3, 0.5 / 3])
+        np.testing.assert_allclose(capped_weights([3.0, 1.0]), [0.75, 0.25])
+        with self.assertRaises(ValueError):
+            capped_weights([1.0, 1.0], 0.4)
+
+    def test_rebalance_starts_at_the_base_level_with_capped_weights(self):
+        self.assertAlmostEqual(self.index.level, 1000.0)
+        weights = self.index.weights()
+        self.assertAlmostEqual(sum(weights.values()), 1.0)
+        self.assertAlmostEqual(weights['A'], 0.4)
+
+    def test_ticks_move_the_level_like_a_full_recomputation(self):
+        rng = np.random.default_rng(42)
+        for _ in range(1000):
+            ticker = 'ABCD'[rng.integers(0, 4)]
+            level = self.index.tick(ticker, float(rng.uniform(1, 30)))
+        self.assertAlmostEqual(level, self.index.resync(), places=9)
+        self.assertIsNone(self.index.tick('Z', 1.0))
+
+    def test_corporate_actions_and_rebalances_keep_the_level(self):
+        self.index.tick('A', 12.0)
+        level = self.index.level
+        weights = self.index.weights()
+        self.index.split('A', 2)
+        self.assertAlmostEqual(self.index.level, level)
+        self.assertAlmostEqual(self.index.weights()['A'], weights['A'])
+        self.index.change_shares('B', 300.0)
+        self.assertAlmostEqual(self.index.level, level)
+        self.index.special_dividend('C', 1.0)
+        self.assertAlmostEqual(self.index.level, level)
+        self.index.rebalance({'A': (6.0, 2000.0), 'B': (20.0, 300.0), 'E': (3.0, 100.0)})
+        self.assertAlmostEqual(self.index.level, level)
+        self.assertEqual(self.index.tickers, ['A', 'B', 'E'])
+        with self.assertRaises(ValueError):
+            self.index.split('C', 2)
+        with self.assertRaises(ValueError):
+            self.index.rebalance({'A': (0.0, 10.0), 'B': (1.0, 10.0), 'C': (1.0, 10.0)})
+
+    def test_fundamentals_use_harmonic_means_for_multiples(self):
+        companies = dict()
+        for ticker, (net_profit, roe) in zip('ABC', [(100.0, 10.0), (50.0, 20.0), (-10.0, 30.0)]):
+            company = Company(ticker, 1)
+            company.add_period_data({'year': 2023, 'net_profit': net_profit, 'book_value': net_profit * 100 / roe,
+                                     'outstanding_shares': 10.0, 'market_cap': 1000.0})
+            company.calculate_all_metrics()
+            companies[ticker] = company
+        weights = self.index.weights()
+        result = self.index.fundamentals(companies, ['price_to_earnings', 'ROE', 'dividend_yield'])
+
+        pe = {t: companies[t].output[2023]['price_to_earnings'] for t in 'ABC'}
+        total = sum(weights[t] for t in 'ABC')
+        self.assertAlmostEqual(result['price_to_earnings'],
+                               round(total / sum(weights[t] / pe[t] for t in 'ABC'), 2))
+        self.assertAlmostEqual(result['ROE'], round(sum(weights[t] * companies[t].output[2023]['ROE'] for t in 'ABC') / total, 2))
+        self.assertIsNone(result['dividend_yield'])
+
+
+class IndexEngineTest(unittest.TestCase):
+
+    def test_ticks_reach_every_index_holding_the_ticker(self):
+        engine = IndexEngine()
+        engine.add_index(CuratedIndex('ALL'))
+        engine.add_index(CuratedIndex('SMALL', base_level=100.0))
+        engine.rebalance('ALL', CONSTITUENTS)
+        engine.rebalance('SMALL', {'C': CONSTITUENTS['C'], 'D': CONSTITUENTS['D']})
+        self.assertEqual(set(engine.tick('C', 6.0)), {'ALL', 'SMALL'})
+        self.assertEqual(set(engine.tick('A', 11.0)), {'ALL'})
+        self.assertEqual(engine.tick('Z', 1.0), {})
+        self.assertAlmostEqual(engine.levels()['SMALL'], 100.0 * (6.0 * 400 + 8.0 * 250) / (5.0 * 400 + 8.0 * 250))
+
+
+if __name__ == '__main__':
+    unittest.main()
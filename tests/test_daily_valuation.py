@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+import tempfile
+import unittest
+
+import numpy as np
+import pytest
+
+from FA import Company
+from bitemporal import BitemporalStore
+from daily_valuation import daily_valuations
+from market_data import MarketDataStore
+from metric_engine import MARKET_LINKED_METRICS
+
+
+@pytest.mark.usefixtures('statements')
+class DailyValuationTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.market = MarketDataStore(self._directory.name, chunk_size=16)
+        self.statements = BitemporalStore()
+        rng = np.random.default_rng(40)
+        self.dates = np.busday_offset('2024-01-01', np.arange(60), roll='forward')
+        for ticker in ['A', 'B', 'C']:
+            close = np.round(rng.uniform(1, 50, 60), 2)
+            self.market.append(ticker, self.dates, close, close, np.ones(60), np.rint(close * 1000))
+        self.statements.record('A', self.random_statement(rng, 2022), '2023-03-01')
+        self.statements.record('A', self.random_statement(rng, 2023), '2024-01-15')
+        self.statements.record('A', self.random_statement(rng, 2023), '2024-02-12')
+        # A restatement of an older period leaves the latest period in force
+        self.statements.record('A', self.random_statement(rng, 2022), '2024-03-01')
+        self.statements.record('B', self.random_statement(rng, 2023), '2024-02-01')
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _expected(self, ticker: str, day, market_cap: float) -> dict:
+        snapshot = self.statements.as_of(ticker, str(day))
+        if not snapshot:
+            return None
+        record = snapshot[max(snapshot)].to_dict()
+        record['market_cap'] = market_cap
+        company = Company(ticker, 1)
+        company.add_period_data(record)
+        company.calculate_all_metrics()
+        return company.output[record['year']]
+
+    def test_each_day_uses_the_fundamentals_known_that_day(self):
+        results = daily_valuations(self.market, self.statements)
+        self.assertEqual(sorted(results), ['A', 'B', 'C'])
+        for ticker, (dates, metrics) in results.items():
+            np.testing.assert_array_equal(dates, self.dates)
+            market_caps = self.market.read(ticker)['market_cap']
+            for i, day in enumerate(dates):
+                expected = self._expected(ticker, day, float(market_caps[i]))
+                for name in MARKET_LINKED_METRICS:
+                    if expected is None or expected[name] is None:
+                        self.assertTrue(np.isnan(metrics[name][i]), (ticker, day, name))
+                    else:
+                        self.assertAlmostEqual(metrics[name][i], expected[name], delta=0.0051, msg=(ticker, day, name))
+
+    def test_close_price_uses_the_statement_share_count(self):
+        (dates, by_cap), = daily_valuations(self.market, self.statements, ['B'], metrics=['price_to_book']).values()
+        (_, by_close), = daily_valuations(self.market, self.statements, ['B'], price_source='close',
+                                          metrics=['price_to_book']).values()
+        record = self.statements.as_of('B', '2024-12-31', period=2023)
+        close = self.market.read('B')['close']
+        published = dates >= np.datetime64('2024-02-01')
+        np.testing.assert_allclose(by_close['price_to_book'][published],
+                                   close[published] * record['outstanding_shares'] / record['book_value'])
+        self.assertTrue(np.isnan(by_cap['price_to_book'][~published]).all())
+
+    def test_date_range_and_empty_results(self):
+        (dates, metrics), = daily_valuations(self.market, self.statements, ['A'], '2024-02-12', '2024-02-16').values()
+        self.assertEqual(len(dates), 5)
+        self.assertEqual(set(metrics), set(MARKET_LINKED_METRICS))
+        (dates, metrics), = daily_valuations(self.market, self.statements, ['A'], '2030-01-01').values()
+        self.assertEqual(len(dates), 0)
+        self.assertEqual(len(metrics['EV']), 0)
+        with self.assertRaises(ValueError):
+            daily_valuations(self.market, self.statements, price_source='open')
+
+
+if __name__ == '__main__':
+    unittest.main()
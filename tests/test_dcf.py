@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from FA import Company
+from dcf import company_dcf, dcf_grid
+
+
+def loop_dcf(fcf: float, net_debt: float, wacc: float, terminal_growth: float, growth: float, years: int) -> float:
+    """Equity value discounted year by year."""
+    value = sum(fcf * (1 + growth) ** t / (1 + wacc) ** t for t in range(1, years + 1))
+    terminal = fcf * (1 + growth) ** years * (1 + terminal_growth) / (wacc - terminal_growth)
+    return value + terminal / (1 + wacc) ** years - net_debt
+
+
+class DcfGridTest(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = {'cash_from_opr': np.array([500.0, 80.0, np.nan]), 'capex': np.array([100.0, np.nan, 5.0]),
+                        'short_term_debt': np.array([50.0, 0.0, 0.0]), 'long_term_debt': np.array([200.0, 10.0, 0.0]),
+                        'cash_and_equivalent': np.array([30.0, np.nan, 0.0]),
+                        'outstanding_shares': np.array([100.0, 20.0, 10.0]), 'market_cap': np.array([2000.0, 400.0, 50.0])}
+        self.wacc = np.array([0.10, 0.15, 0.20])
+        self.terminal_growth = np.array([0.02, 0.05, 0.15])
+
+    def test_grid_matches_a_year_by_year_discount(self):
+        growth = np.array([0.08, 0.15, 0.0])
+        results = dcf_grid(self.columns, self.wacc, self.terminal_growth, growth, years=5)
+        self.assertEqual(results['equity_value'].shape, (3, 3, 3))
+        for i, (fcf, net_debt) in enumerate([(400.0, 220.0), (80.0, 10.0)]):
+            for j, w in enumerate(self.wacc):
+                for k, tg in enumerate(self.terminal_growth):
+                    actual = results['equity_value'][i, j, k]
+                    if w <= tg:
+                        self.assertTrue(np.isnan(actual))
+                        continue
+                    # growth 0.15 equals the 0.15 WACC: the explicit years take the q == 1 branch
+                    expected = loop_dcf(fcf, net_debt, w, tg, growth[i], 5)
+                    self.assertAlmostEqual(actual, expected, places=6)
+                    shares = self.columns['outstanding_shares'][i]
+                    price = self.columns['market_cap'][i] / shares
+                    self.assertAlmostEqual(results['upside'][i, j, k], (expected / shares / price - 1) * 100, places=6)
+        # No operating cash flow, no valuation
+        self.assertTrue(np.isnan(results['enterprise_value'][2]).all())
+
+
+def add_quarters(company: Company, quarters: list):
+    for year, quarter, cash_from_opr, capex in quarters:
+        company.add_period_data({'year': year, 'quarter': quarter, 'cash_from_opr': cash_from_opr, 'capex': capex,
+                                 'long_term_debt': 100.0 * quarter, 'outstanding_shares': 10.0, 'market_cap': 500.0})
+
+
+class CompanyDcfTest(unittest.TestCase):
+
+    def test_quarterly_companies_use_trailing_twelve_month_fcf(self):
+        ttm = Company('Q', 5, 'quarterly')
+        add_quarters(ttm, [(2022, 4, 1000.0, 0.0), (2023, 1, 10.0, 1.0), (2023, 2, 20.0, 2.0),
+                           (2023, 3, 30.0, 3.0), (2023, 4, 40.0, 4.0)])
+        gap = Company('G', 3, 'quarterly')
+        add_quarters(gap, [(2023, 1, 10.0, 1.0), (2023, 3, 30.0, 3.0), (2023, 4, 40.0, 4.0)])
+        annual = Company('A', 1)
+        annual.add_period_data({'year': 2023, 'cash_from_opr': 100.0, 'capex': 10.0, 'long_term_debt': 400.0,
+                                'outstanding_shares': 10.0, 'market_cap': 500.0})
+        tickers, results = company_dcf([ttm, gap, annual, Company('E', 1)], [0.2], [0.05])
+        self.assertEqual(tickers, ['Q', 'G', 'A'])
+        # FCF 100 - 10 over Q1-Q4 2023 and net debt from Q4, the same as the annual company
+        expected = loop_dcf(90.0, 400.0, 0.2, 0.05, 0.0, 5)
+        self.assertAlmostEqual(results['equity_value'][0, 0, 0], expected, places=6)
+        self.assertAlmostEqual(results['equity_value'][2, 0, 0], expected, places=6)
+        self.assertTrue(np.isnan(results['equity_value'][1, 0, 0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
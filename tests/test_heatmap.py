@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+
+import tempfile
+import unittest
+
+import numpy as np
+
+from heatmap import HeatmapEngine, aggregate, squarify
+from market_data import MarketDataStore
+
+
+class SquarifyTest(unittest.TestCase):
+
+    def test_rectangles_tile_the_area_in_proportion(self):
+        sizes = [6, 6, 4, 3, 2, 2, 1]
+        rects = squarify(sizes, 0, 0, 6, 4)
+        self.assertEqual(len(rects), len(sizes))
+        for size, (x, y, w, h) in zip(sizes, rects):
+            self.assertAlmostEqual(w * h, size)
+            self.assertTrue(-1e-9 <= x and x + w <= 6 + 1e-9 and -1e-9 <= y and y + h <= 4 + 1e-9)
+        # The first row of the paper's example: two 6s stacked on the left edge
+        self.assertEqual(rects[:2], [(0, 0, 3.0, 2.0), (0, 2.0, 3.0, 2.0)])
+        for i, (x1, y1, w1, h1) in enumerate(rects):
+            for x2, y2, w2, h2 in rects[i + 1:]:
+                overlap = max(0, min(x1 + w1, x2 + w2) - max(x1, x2)) * max(0, min(y1 + h1, y2 + h2) - max(y1, y2))
+                self.assertAlmostEqual(overlap, 0)
+
+    def test_empty_input(self):
+        self.assertEqual(squarify([], 0, 0, 1, 1), [])
+        self.assertEqual(squarify([0, 0], 0, 0, 1, 1), [])
+
+
+class AggregateTest(unittest.TestCase):
+
+    def test_sector_returns_are_cap_weighted(self):
+        tickers, sectors = ['A', 'B', 'C', 'D'], ['Banks', 'Oil', 'Banks', 'Oil']
+        ticker_rows, sector_rows = aggregate(tickers, sectors, [10, 20, 5, 0], [11, 19, 5.5, 3],
+                                             [300, 200, 100, 400], [1, 2, 3, 4])
+        self.assertEqual([row['ticker'] for row in ticker_rows], tickers)
+        self.assertAlmostEqual(ticker_rows[0]['return'], 10.0)
+        self.assertAlmostEqual(ticker_rows[0]['sector_weight'], 0.75)
+        self.assertAlmostEqual(ticker_rows[3]['weight'], 0.4)
+        # D has no previous close, so its return is NaN and Oil's return is B's alone
+        self.assertTrue(np.isnan(ticker_rows[3]['return']))
+        banks, oil = sector_rows
+        self.assertEqual((banks['sector'], oil['sector']), ('Banks', 'Oil'))
+        self.assertAlmostEqual(banks['return'], 10.0)
+        self.assertAlmostEqual(oil['return'], -5.0)
+        self.assertEqual((oil['market_cap'], oil['volume']), (600.0, 6.0))
+        self.assertEqual(aggregate([], [], [], [], [], []), ([], []))
+
+
+class HeatmapEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.market = MarketDataStore(self._directory.name, chunk_size=4)
+        # Thursday, Friday, Monday
+        days = ['2024-01-04', '2024-01-05', '2024-01-08']
+        self.market.append('A', days, [10, 10, 11], [10, 10, 11], [5, 5, 5], [1000, 1000, 1100])
+        self.market.append('B', days[:2], [20, 20], [20, 22], [5, 5], [400, 440])
+        self.market.append('C', days[1:], [5, 5], [5, 4], [5, 5], [50, 40])
+        self.engine = HeatmapEngine({'A': 'Banks', 'B': 'Oil', 'C': 'Banks', 'D': 'Oil'})
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_update_daily_compares_with_the_previous_trading_day(self):
+        self.assertEqual(self.engine.update_daily(self.market, '2024-01-08'), 1)
+        rows = {row['ticker']: row for row in self.engine.tickers}
+        # B did not trade on Monday and D never traded
+        self.assertEqual(set(rows), {'A', 'C'})
+        self.assertAlmostEqual(rows['A']['return'], 10.0)
+        self.assertAlmostEqual(rows['C']['return'], -20.0)
+
+        self.engine.update_daily(self.market, np.datetime64('2024-01-05'))
+        # C listed on Friday, so it has no previous close to compare with
+        self.assertEqual({row['ticker'] for row in self.engine.tickers}, {'A', 'B'})
+        self.engine.update_daily(self.market, '2024-01-06')
+        self.assertEqual((self.engine.tickers, self.engine.sector_rows), ([], []))
+
+    def test_layouts_are_cached_per_version_and_size(self):
+        self.engine.update_daily(self.market, '2024-01-05')
+        layout = self.engine.layout(100, 50)
+        self.assertIs(self.engine.layout(100, 50), layout)
+        self.assertIsNot(self.engine.layout(50, 50), layout)
+        self.assertEqual([sector['sector'] for sector in layout], ['Banks', 'Oil'])
+        for sector in layout:
+            self.assertAlmostEqual(sector['w'] * sector['h'], 5000 * sector['weight'])
+            self.assertAlmostEqual(sum(t['w'] * t['h'] for t in sector['tickers']), sector['w'] * sector['h'])
+        self.engine.update_daily(self.market, '2024-01-08')
+        self.assertIsNot(self.engine.layout(100, 50), layout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from consensus import ConsensusResolver
+from identity_checks import DEFAULT_CHECKS, IdentityChecker
+from normalization import Normalizer, ScaleDeclaration
+from schema import FIELD_IDS, FIELD_NAMES, INGEST_VALIDATOR, STRUCTURAL_VALIDATOR, validate_record
+from statement_db import IDENTITY_FLAG_REASON, StatementDatabase
+from submission_store import SubmissionStore
+
+BALANCED = {'year': 2023, 'asset': 100.0, 'liabilities': 60.0, 'book_value': 40.0,
+            'current_asset': 30.0, 'non_current_asset': 70.0,
+            'revenue': 50.0, 'COGS': 20.0, 'gross_profit': 30.0}
+UNBALANCED = dict(BALANCED, book_value=50.0, gross_profit=25.0)
+
+
+class IdentityCheckerTest(unittest.TestCase):
+
+    def test_mask_matches_each_check_evaluated_row_by_row(self):
+        rng = np.random.default_rng(32)
+        values = rng.integers(0, 100, (500, len(FIELD_NAMES))).astype(float)
+        values[rng.random(values.shape) < 0.2] = np.nan
+        checker = IdentityChecker(FIELD_IDS)
+        mask = checker.check(values)
+        for row in range(len(values)):
+            for check in DEFAULT_CHECKS:
+                terms = [values[row, FIELD_IDS[name]] * sign for name, sign in check.terms.items()]
+                reference = values[row, FIELD_IDS[check.reference]]
+                failed = (not np.isnan(sum(terms))
+                          and abs(sum(terms)) > check.tolerance * max(abs(reference), 1.0))
+                self.assertEqual(bool(mask[row] & (1 << check.bit)), failed, (row, check.name))
+
+    def test_tolerance_overrides_must_name_a_check(self):
+        with self.assertRaises(ValueError):
+            IdentityChecker(FIELD_IDS, tolerances={'cash_flow': 0.1})
+        lenient = IdentityChecker(FIELD_IDS, tolerances={'balance_sheet': 0.5})
+        row = np.full((1, len(FIELD_NAMES)), np.nan)
+        row[0, [FIELD_IDS['asset'], FIELD_IDS['liabilities'], FIELD_IDS['book_value']]] = [100, 60, 50]
+        self.assertEqual(int(lenient.check(row)[0]), 0)
+
+
+class IdentityIngestTest(unittest.TestCase):
+
+    def test_identity_failures_are_flags_not_errors(self):
+        result = INGEST_VALIDATOR.validate_batch([BALANCED, UNBALANCED, {'year': 2023, 'sales': 1.0}])
+        self.assertEqual([row for row, _, _ in result.errors], [2])
+        self.assertEqual(list(result.valid_rows), [True, True, False])
+        self.assertEqual(INGEST_VALIDATOR.identity_checker.describe(result.identity_mask[1]),
+                         ['balance_sheet', 'gross_profit'])
+        record, mask, failed = validate_record(UNBALANCED)
+        self.assertEqual(record['book_value'], 50.0)
+        self.assertEqual(failed, ['balance_sheet', 'gross_profit'])
+        self.assertEqual(int(STRUCTURAL_VALIDATOR.validate_batch([UNBALANCED]).identity_mask[0]), 0)
+
+    def test_statement_database_stores_the_mask_and_flags_failures(self):
+        db = StatementDatabase()
+        good = db.add_statement('A', BALANCED)
+        bad = db.add_statement('A', dict(UNBALANCED, year=2024))
+        self.assertEqual(db.get_identity_mask(good), 0)
+        self.assertEqual(db.get_identity_mask(bad), 0b1001)
+        flags = db.open_flags()
+        self.assertEqual([(flag[1], flag[3]) for flag in flags],
+                         [(bad, IDENTITY_FLAG_REASON + 'balance_sheet, gross_profit')])
+
+        db.update_statement(bad, dict(BALANCED, year=2024))
+        self.assertEqual(db.get_identity_mask(bad), 0)
+        self.assertEqual(db.open_flags(), [])
+        db.update_statement(good, dict(UNBALANCED, gross_profit=30.0))
+        self.assertEqual([flag[3] for flag in db.open_flags(good)], [IDENTITY_FLAG_REASON + 'balance_sheet'])
+        db.close()
+
+    def test_submission_store_keeps_the_mask_with_the_contents(self):
+        store = SubmissionStore(capacity=100)
+        good, _ = store.submit('A', BALANCED)
+        bad, is_new = store.submit('A', UNBALANCED)
+        self.assertTrue(is_new)
+        self.assertEqual(store.identity_mask(good), 0)
+        self.assertEqual(store.identity_mask(bad), 0b1001)
+        with self.assertRaises(ValueError):
+            store.identity_mask('0' * 64)
+
+    def test_consensus_flags_failing_submissions_and_still_counts_them(self):
+        resolver = ConsensusResolver('median')
+        resolver.submit('A', BALANCED, submission_id=1)
+        consensus = resolver.submit('A', UNBALANCED, submission_id=2)
+        self.assertEqual(consensus['book_value'], 45.0)
+        self.assertEqual(sorted(resolver.flags), [(2, 'balance_sheet identity'), (2, 'gross_profit identity')])
+
+    def test_normalizer_checks_the_canonical_values(self):
+        normalizer = Normalizer({'USD': 1500.0})
+        # Within the 1-unit floor as submitted in millions, a clear failure once scaled
+        record = {'year': 2023, 'asset': 1.0, 'liabilities': 0.6, 'book_value': 0.2}
+        batch = normalizer.normalize([record, BALANCED], [ScaleDeclaration('USD', 'millions'), ScaleDeclaration()])
+        self.assertEqual(normalizer.identity_checker.describe(batch.identity_mask[0]), ['balance_sheet'])
+        self.assertEqual(int(batch.identity_mask[1]), 0)
+        self.assertEqual(batch.records[0]['asset'], 1.5e9)
+
+
+if __name__ == '__main__':
+    unittest.main()
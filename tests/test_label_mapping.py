@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+
+import unittest
+
+from label_mapping import LabelMapper, normalize_tokens
+
+
+class LabelMapperTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mapper = LabelMapper()
+
+    def test_synonyms_and_spelling_variants(self):
+        cases = {
+            'Total Revenue': 'revenue',
+            'Trade & Other Receivables': 'trade_recv',
+            'Property, plant & equipment': 'PPE',
+            'Stocks': 'inventory',
+            'PBT': 'profit_bfor_tax',
+            'deprcn amotzn': 'depreciation',
+            'Net cash used in operating activities': 'cash_from_opr',
+            'Net cash used in investing activities': 'cash_from_invst',
+            'Total liabilities': 'liabilities',
+            'Non-current assets': 'non_current_asset',
+        }
+        for label, name in cases.items():
+            self.assertEqual(self.mapper.map_label(label), name, label)
+
+    def test_only_date_qualifiers_may_follow_a_synonym(self):
+        self.assertEqual(self.mapper.map_label('Profit for the year'), 'net_profit')
+        self.assertEqual(self.mapper.map_label('Revenue for the year ended'), 'revenue')
+        self.assertEqual(self.mapper.map_label('Cash and cash equivalents at end of year'), 'cash_and_equivalent')
+        for label in ['Net assets', 'Total comprehensive income for the year', 'Revenue from discontinued operations',
+                      'Other operating income', 'Total equity and liabilities', 'Operating profit margin',
+                      'Profit for the year attributable to owners']:
+            self.assertIsNone(self.mapper.map_label(label), label)
+
+    def test_fuzzy_matching_needs_every_word_close(self):
+        self.assertEqual(self.mapper.map_label('Proffit before taxation'), 'profit_bfor_tax')
+        self.assertEqual(self.mapper.map_label('Net cash from operatin activities'), 'cash_from_opr')
+        self.assertIsNone(self.mapper.map_label('Net cash from banking activities'))
+        strict = LabelMapper(fuzzy_cutoff=1.0)
+        self.assertIsNone(strict.map_label('Proffit before taxation'))
+
+    def test_tokens_are_normalized(self):
+        self.assertEqual(normalize_tokens('The Cost of Sales & Taxes'), ('cost', 'sales', 'and', 'tax'))
+        self.assertEqual(normalize_tokens('Net  Non-current  LIABILITIES'), ('net', 'non', 'current', 'liability'))
+
+    def test_taught_synonyms_are_used(self):
+        self.assertIsNone(self.mapper.map_label('Gross premium written'))
+        self.mapper.add_synonym('Gross premium written', 'revenue')
+        self.assertEqual(self.mapper.map_label('Gross premium written for the year'), 'revenue')
+        with self.assertRaises(ValueError):
+            self.mapper.add_synonym('Anything', 'sales')
+
+    def test_statements_keep_the_first_label_of_a_line_item(self):
+        finance_input, unmatched = self.mapper.map_statement(
+            {'Revenue': 100.0, 'Turnover': 100.0, 'Cost of sales': 60.0, 'Other operating income': 5.0})
+        self.assertEqual(finance_input, {'revenue': 100.0, 'COGS': 60.0})
+        self.assertEqual(unmatched, ['Turnover', 'Other operating income'])
+        mapping, unmatched = self.mapper.map_labels(['Inventories', 'Net assets'])
+        self.assertEqual((mapping, unmatched), ({'Inventories': 'inventory'}, ['Net assets']))
+
+
+if __name__ == '__main__':
+    unittest.main()
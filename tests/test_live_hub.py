@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+
+import asyncio
+import json
+import unittest
+
+from live_hub import PubSubHub, serve_sse
+
+
+async def _wait_for(condition, timeout: float = 2.0):
+    """Polls `condition` until it holds, failing the test after `timeout` seconds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("Condition not met in time.")
+        await asyncio.sleep(0.01)
+
+
+async def _read_event(reader: asyncio.StreamReader) -> tuple:
+    """Reads one server-sent event and returns (topic, key, value)."""
+    raw = await asyncio.wait_for(reader.readuntil(b'\n\n'), timeout=2.0)
+    fields = dict(line.split(': ', 1) for line in raw.decode().strip().split('\n'))
+    data = json.loads(fields['data'])
+    return fields['event'], data['key'], data['value']
+
+
+class SSERoundTripTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.hub = PubSubHub()
+        self.server = await serve_sse(self.hub, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _connect(self, path: str) -> tuple:
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+        await writer.drain()
+        status = await asyncio.wait_for(reader.readline(), timeout=2.0)
+        while (await reader.readline()) not in [b'\r\n', b'']:
+            pass
+        return status, reader, writer
+
+    async def test_burst_delivers_latest_value_only(self):
+        status, reader, writer = await self._connect('/stream?topics=index')
+        self.assertIn(b'200', status)
+        await _wait_for(lambda: self.hub.subscriber_count == 1)
+
+        # Published without yielding to the event loop, so the connection sees one batch
+        for level in range(1000):
+            self.hub.publish_levels({'NGX30': float(level)})
+        self.hub.publish_valuations('DANGCEM', {'price_to_earnings': 12.5})
+        self.hub.publish_levels({'DONE': 0.0})
+
+        events = list()
+        while not events or events[-1][1] != 'DONE':
+            events.append(await _read_event(reader))
+        self.assertEqual(events, [('index', 'NGX30', 999.0), ('index', 'DONE', 0.0)])
+
+        writer.close()
+        await writer.wait_closed()
+        await _wait_for(lambda: self.hub.subscriber_count == 0)
+
+    async def test_unknown_topic_and_path_are_rejected(self):
+        status, _, writer = await self._connect('/stream?topics=index,prices')
+        self.assertIn(b'400', status)
+        writer.close()
+        status, _, writer = await self._connect('/other')
+        self.assertIn(b'404', status)
+        writer.close()
+        self.assertEqual(self.hub.subscriber_count, 0)
+
+
+class SubscriptionTest(unittest.TestCase):
+
+    def test_pending_keys_are_bounded(self):
+        hub = PubSubHub(max_pending=2)
+        subscription = hub.subscribe(['valuation'])
+        for ticker in ['A', 'B', 'C', 'B']:
+            hub.publish_valuations(ticker, {'price_to_book': ticker})
+        batch = asyncio.run(subscription.next_batch())
+        self.assertEqual([key for _, key, _ in batch], ['B', 'C'])
+        self.assertEqual(subscription.dropped, 1)
+
+    def test_unsubscribe_stops_delivery(self):
+        hub = PubSubHub()
+        subscription = hub.subscribe()
+        hub.unsubscribe(subscription)
+        hub.publish_levels({'NGX30': 1.0})
+        self.assertEqual(asyncio.run(subscription.next_batch()), [])
+        self.assertEqual(hub.subscriber_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+
+import datetime
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from market_data import INDEX_RECORD, MarketDataStore, decode_varints, encode_varints
+
+
+def trading_days(n: int, first: str = '2024-01-01') -> np.ndarray:
+    return np.busday_offset(first, np.arange(n), roll='forward')
+
+
+class MarketDataStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        rng = np.random.default_rng(39)
+        self.dates = trading_days(30)
+        self.close = np.round(100 + rng.normal(0, 1, 30).cumsum(), 2)
+        self.open = np.round(self.close + rng.normal(0, 0.5, 30), 2)
+        self.volume = rng.integers(0, 1_000_000, 30)
+        self.market_cap = np.rint(self.close * 1e6)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _append(self, store: MarketDataStore, rows: slice):
+        store.append('X', self.dates[rows], self.open[rows], self.close[rows], self.volume[rows], self.market_cap[rows])
+
+    def _assert_rows(self, rows: np.ndarray, expected: slice):
+        np.testing.assert_array_equal(rows['date'], self.dates[expected])
+        np.testing.assert_allclose(rows['close'], self.close[expected])
+        np.testing.assert_allclose(rows['open'], self.open[expected])
+        np.testing.assert_array_equal(rows['volume'], self.volume[expected])
+        np.testing.assert_allclose(rows['market_cap'], self.market_cap[expected])
+
+    def test_varints_round_trip(self):
+        values = np.array([0, 1, 127, 128, 300, 2 ** 35, 2 ** 64 - 1], dtype=np.uint64)
+        raw = encode_varints(values)
+        self.assertEqual(len(encode_varints(values[:4])), 1 + 1 + 1 + 2)
+        np.testing.assert_array_equal(decode_varints(raw), values)
+        self.assertEqual(len(decode_varints(b'')), 0)
+
+    def test_daily_appends_round_trip_through_chunks_and_tail(self):
+        store = MarketDataStore(self.directory, chunk_size=8)
+        self._append(store, slice(0, 5))
+        for i in range(5, 30):
+            self._append(store, slice(i, i + 1))
+        self.assertEqual(len(store._index('X')), 3)
+        self._assert_rows(store.read('X'), slice(0, 30))
+
+        reopened = MarketDataStore(self.directory, chunk_size=8)
+        self.assertEqual(reopened.tickers(), ['X'])
+        self._assert_rows(reopened.read('X'), slice(0, 30))
+        self._assert_rows(reopened.read('X', self.dates[6], self.dates[20]), slice(6, 21))
+        self._assert_rows(reopened.read('X', str(self.dates[26])), slice(26, 30))
+        self.assertEqual(len(reopened.read('X', '2030-01-01')), 0)
+        self.assertFalse(reopened.read('X').flags.writeable)
+
+    def test_as_of_returns_the_last_row_on_or_before_the_date(self):
+        store = MarketDataStore(self.directory, chunk_size=8)
+        self._append(store, slice(0, 30))
+        saturday = datetime.date(2024, 1, 6)
+        self.assertEqual(store.as_of('X', saturday)['date'], np.datetime64('2024-01-05'))
+        self.assertEqual(store.as_of('X', self.dates[-1])['close'], self.close[-1])
+        self.assertIsNone(store.as_of('X', '2023-12-31'))
+
+    def test_interrupted_seal_before_the_tail_was_replaced(self):
+        store = MarketDataStore(self.directory, chunk_size=4)
+        self._append(store, slice(0, 3))
+        with open(os.path.join(self.directory, 'X.tail'), 'rb') as f:
+            stale_tail = f.read()
+        self._append(store, slice(3, 5))
+        # The seal reached the data and index files, the tail replacement did not
+        with open(os.path.join(self.directory, 'X.tail'), 'wb') as f:
+            f.write(stale_tail)
+
+        reopened = MarketDataStore(self.directory, chunk_size=4)
+        self._assert_rows(reopened.read('X'), slice(0, 4))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'X.tail')))
+        self._append(reopened, slice(4, 6))
+        self._assert_rows(reopened.read('X'), slice(0, 6))
+
+    def test_partly_written_chunk_is_dropped_from_the_index(self):
+        store = MarketDataStore(self.directory, chunk_size=4)
+        self._append(store, slice(0, 8))
+        data_path = os.path.join(self.directory, 'X.dat')
+        with open(data_path, 'r+b') as f:
+            f.truncate(os.path.getsize(data_path) - 1)
+
+        reopened = MarketDataStore(self.directory, chunk_size=4)
+        self._assert_rows(reopened.read('X'), slice(0, 4))
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, 'X.idx')), INDEX_RECORD.itemsize)
+
+    def test_invalid_appends_are_rejected(self):
+        store = MarketDataStore(self.directory)
+        self._append(store, slice(0, 3))
+        with self.assertRaises(ValueError):
+            self._append(store, slice(2, 4))
+        with self.assertRaises(ValueError):
+            store.append('Y', self.dates[[1, 0]], [1, 1], [1, 1], [1, 1], [1, 1])
+        with self.assertRaises(ValueError):
+            store.append('Y', self.dates[:2], [1], [1, 1], [1, 1], [1, 1])
+        with self.assertRaises(ValueError):
+            store.append('Y', self.dates[:1], [np.nan], [1], [1], [1])
+        with self.assertRaises(ValueError):
+            store.read('../X')
+
+
+if __name__ == '__main__':
+    unittest.main()
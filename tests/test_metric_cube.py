@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pytest
+
+from FA import Company
+from metric_cube import MetricCube, format_period, parse_period, write_metric_cube
+
+
+@pytest.mark.usefixtures('statements')
+class MetricCubeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cube.dat')
+        rng = np.random.default_rng(27)
+        self.companies = list()
+        for name, years in [('AAA', range(2019, 2024)), ('BBB', range(2021, 2024))]:
+            company = Company(name, len(years))
+            for year in years:
+                company.add_period_data(self.random_statement(rng, year))
+            company.calculate_all_metrics()
+            self.companies.append(company)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip_matches_company_output(self):
+        tickers, periods, metrics = write_metric_cube(self.path, self.companies)
+        cube = MetricCube(self.path)
+        self.assertEqual((cube.tickers, cube.periods, cube.metrics), (tickers, periods, metrics))
+        self.assertIsInstance(cube.data, np.memmap)
+        for company in self.companies:
+            for period in periods:
+                for name in metrics:
+                    expected = company.output.get(period, {}).get(name)
+                    self.assertEqual(cube.value(company.company_name, period, name), expected)
+        np.testing.assert_array_equal(cube.series('BBB', 'ROE'), cube.metric('ROE')[1])
+        self.assertTrue(np.isnan(cube.ticker('BBB')[0]).all())
+
+    def test_period_labels_round_trip(self):
+        for period in [2024, (2024, 1), (1999, 4)]:
+            self.assertEqual(parse_period(format_period(period)), period)
+
+    def test_rewrite_swaps_generation_while_open_views_keep_old_data(self):
+        write_metric_cube(self.path, self.companies)
+        old = MetricCube(self.path)
+        old_roe = old.series('AAA', 'ROE').copy()
+        write_metric_cube(self.path, self.companies[1:])
+        new = MetricCube(self.path)
+        self.assertEqual(new.tickers, ['BBB'])
+        np.testing.assert_array_equal(old.series('AAA', 'ROE'), old_roe)
+
+    def test_index_files_of_another_write_are_rejected(self):
+        write_metric_cube(self.path, self.companies)
+        other = os.path.join(self.directory, 'other.dat')
+        write_metric_cube(other, self.companies)
+        shutil.copy(other + '.metrics', self.path + '.metrics')
+        with self.assertRaisesRegex(ValueError, 'different writes'):
+            MetricCube(self.path)
+
+    def test_non_cube_files_are_rejected(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a cube' * 10)
+        with self.assertRaises(ValueError):
+            MetricCube(self.path)
+        renamed = self.companies[1]
+        renamed.company_name = 'AAA'
+        with self.assertRaises(ValueError):
+            write_metric_cube(self.path, self.companies)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from metric_engine import compute_metrics
+from metric_jacobian import INPUT_FIELDS, metric_jacobians, rank_drivers, what_if
+
+
+def random_columns(rng: np.random.Generator, n: int) -> dict:
+    columns = {name: rng.uniform(100, 10_000, n) for name in INPUT_FIELDS}
+    # Some line items are not reported, so the derivative is taken at the `fi.get` default
+    columns['EBITDA'][::3] = np.nan
+    columns['capex'][::4] = np.nan
+    return columns
+
+
+class MetricJacobianTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.columns = random_columns(rng, 50)
+        self.previous = random_columns(rng, 50)
+        self.values, self.jacobians = metric_jacobians(self.columns, self.previous, True)
+
+    def test_values_match_the_array_engine(self):
+        expected = compute_metrics(self.columns, self.previous, True)
+        for name, values in self.values.items():
+            if name == 'inventory_days':
+                continue  # compute_metrics derives days from the rounded turnover
+            np.testing.assert_allclose(values, expected[name], rtol=1e-12, err_msg=name)
+
+    def test_partials_match_central_differences(self):
+        for i, field in enumerate(INPUT_FIELDS):
+            base = self.columns[field]
+            step = np.where(np.isnan(base), 1.0, np.abs(base)) * 1e-6
+            shifted = dict()
+            for sign in [1, -1]:
+                columns = dict(self.columns)
+                columns[field] = np.where(np.isnan(base), 0.0, base) + sign * step
+                shifted[sign] = metric_jacobians(columns, self.previous, True)[0]
+            for name, jacobian in self.jacobians.items():
+                numeric = (shifted[1][name] - shifted[-1][name]) / (2 * step)
+                # Reporting an absent item can switch formula branches (e.g. EBITDA), so only
+                # reported items are compared
+                finite = np.isfinite(jacobian[:, i]) & np.isfinite(numeric) & ~np.isnan(base)
+                np.testing.assert_allclose(jacobian[finite, i], numeric[finite], rtol=1e-5, atol=1e-9,
+                                           err_msg=f'd {name} / d {field}')
+
+    def test_what_if_and_rank_drivers(self):
+        change = self.columns['net_profit'] * 0.01
+        estimate = what_if(self.values, self.jacobians, {'net_profit': change})['net_profit_margin']
+        np.testing.assert_allclose(estimate, self.values['net_profit_margin'] * 1.01, rtol=1e-9)
+        names, impacts = rank_drivers(self.columns, self.jacobians, 'ROE', top=2)
+        self.assertEqual(set(names[0]), {'net_profit', 'book_value'})
+        self.assertTrue((np.abs(impacts[:, 0]) >= np.abs(impacts[:, 1])).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
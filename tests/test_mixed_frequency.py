@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+import pytest
+
+from FA import Company
+from mixed_frequency import MixedFrequencyStore
+from schema import FIELD_IDS
+
+FLOWS = ['revenue', 'COGS', 'operating_income', 'net_profit', 'profit_bfor_tax', 'tax_expense',
+         'cash_from_opr', 'capex', 'finance_cost', 'depreciation']
+
+
+def company_output(records: list, period_type: str) -> dict:
+    company = Company('X', len(records), period_type)
+    for record in records:
+        company.add_period_data(record)
+    company.calculate_all_metrics()
+    return company.output
+
+
+@pytest.mark.usefixtures('statements')
+class MixedFrequencyStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(35)
+        self.quarters = {(year, q): self.random_statement(rng, year) for year in [2022, 2023] for q in range(1, 5)}
+
+    def _cumulative(self, year: int, last_quarter: int) -> dict:
+        report = dict(self.quarters[(year, last_quarter)])
+        for name in FLOWS:
+            report[name] = sum(self.quarters[(year, q)][name] for q in range(1, last_quarter + 1))
+        return report
+
+    def test_q4_is_derived_as_fy_minus_9m(self):
+        store = MixedFrequencyStore('X')
+        for year in [2022, 2023]:
+            store.add_report('9M', self._cumulative(year, 3))
+            store.add_report('FY', self._cumulative(year, 4))
+        periods, values = store.view('quarterly')
+        q4 = values[periods.index((2023, 4))]
+        for name, expected in self.quarters[(2023, 4)].items():
+            if name != 'year':
+                self.assertAlmostEqual(q4[FIELD_IDS[name]], expected, msg=name)
+        # Nothing tells Q1-Q3 apart, so they stay empty
+        self.assertTrue(np.isnan(values[periods.index((2023, 1)), FIELD_IDS['revenue']]))
+
+    def test_quarters_roll_up_to_the_fiscal_year(self):
+        store = MixedFrequencyStore('X')
+        for (year, q), report in self.quarters.items():
+            store.add_report(f'Q{q}', report)
+        periods, values = store.view('annual')
+        self.assertEqual(periods, [2022, 2023])
+        for name, expected in self._cumulative(2023, 4).items():
+            self.assertAlmostEqual(values[1, FIELD_IDS[name]], expected, msg=name)
+
+    def test_reported_figures_win_over_derived_ones(self):
+        store = MixedFrequencyStore('X')
+        for q in range(1, 5):
+            store.add_report(f'Q{q}', self.quarters[(2023, q)])
+        fy = self._cumulative(2023, 4)
+        fy['revenue'] += 1.0
+        store.add_report('FY', fy)
+        _, values = store.view('annual')
+        self.assertEqual(values[0, FIELD_IDS['revenue']], fy['revenue'])
+
+    def test_metrics_match_company_at_both_frequencies(self):
+        store = MixedFrequencyStore('X')
+        for (year, q), report in self.quarters.items():
+            store.add_report(f'Q{q}', report)
+        for frequency in ['annual', 'quarterly']:
+            expected = company_output(store.period_records(frequency), frequency)
+            actual = store.output(frequency)
+            self.assertEqual(list(actual), list(expected))
+            for period, metrics in expected.items():
+                for name, value in metrics.items():
+                    if value is None:
+                        self.assertIsNone(actual[period].get(name), (frequency, period, name))
+                    else:
+                        self.assertAlmostEqual(actual[period][name], value, delta=0.0051,
+                                               msg=(frequency, period, name))
+
+    def test_invalid_reports_are_rejected(self):
+        store = MixedFrequencyStore('X')
+        store.add_report('FY', {'year': 2023, 'revenue': 1.0})
+        with self.assertRaises(ValueError):
+            store.add_report('FY', {'year': 2023, 'revenue': 2.0})
+        with self.assertRaises(ValueError):
+            store.add_report('Q5', {'year': 2023})
+        with self.assertRaises(ValueError):
+            store.add_report('Q1', {'revenue': 1.0})
+        with self.assertRaises(ValueError):
+            store.view('monthly')
+        with self.assertRaises(ValueError):
+            MixedFrequencyStore('X', 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
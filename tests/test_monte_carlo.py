@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from FA import Company
+from monte_carlo import MonteCarloForecaster
+
+
+def history_company(period_type: str = 'annual') -> Company:
+    rng = np.random.default_rng(46)
+    company = Company('X', 6, period_type)
+    revenue, retained = 1000.0, 100.0
+    for year in range(2018, 2024):
+        revenue *= 1 + rng.uniform(-0.05, 0.2)
+        retained += 40.0
+        record = {'year': year, 'revenue': revenue, 'COGS': 0.6 * revenue, 'EBITDA': 0.2 * revenue,
+                  'depreciation': 50.0, 'operating_income': 0.2 * revenue - 50.0, 'PPE': 500.0,
+                  'trade_recv': 0.1 * revenue, 'inventory': 80.0, 'trade_payables': 70.0,
+                  'cash_and_equivalent': 100.0, 'long_term_debt': 300.0, 'finance_cost': 20.0,
+                  'profit_bfor_tax': 130.0, 'tax_expense': 30.0, 'net_profit': 100.0,
+                  'retained_earnings': retained, 'capex': 60.0, 'outstanding_shares': 100,
+                  'current_asset': 0.1 * revenue + 380.0, 'non_current_asset': 600.0,
+                  'current_liabilities': 200.0, 'non_current_liabilities': 400.0, 'liabilities': 600.0}
+        # A balanced opening balance sheet, so the projected ones balance too
+        record['asset'] = record['current_asset'] + record['non_current_asset']
+        record['book_value'] = record['asset'] - record['liabilities']
+        if period_type == 'quarterly':
+            record['quarter'] = 1
+        company.add_period_data(record)
+    company.calculate_all_metrics()
+    return company
+
+
+class MonteCarloForecasterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.company = history_company()
+        cls.forecaster = MonteCarloForecaster(cls.company)
+
+    def test_drivers_are_fitted_from_history(self):
+        growth = [self.company.output[year]['revenue_yoy_growth'] / 100 for year in range(2019, 2024)]
+        mean, std = self.forecaster.drivers['revenue_growth']
+        self.assertAlmostEqual(mean, np.mean(growth))
+        self.assertAlmostEqual(std, np.std(growth))
+        self.assertAlmostEqual(self.forecaster.drivers['cogs_pct'][0], 0.6)
+        self.assertAlmostEqual(self.forecaster.drivers['payout_ratio'][0], 0.6)
+
+    def test_bands_do_not_depend_on_the_memory_budget(self):
+        years, bands = self.forecaster.simulate(3000, 4, seed=5)
+        self.assertEqual(years, [2024, 2025, 2026, 2027])
+        _, chunked = self.forecaster.simulate(3000, 4, seed=5, memory_budget=20 * 2**20)
+        _, reseeded = self.forecaster.simulate(3000, 4, seed=6)
+        for name, levels in bands.items():
+            for percentile, values in levels.items():
+                np.testing.assert_array_equal(values, chunked[name][percentile], err_msg=name)
+        self.assertFalse(np.array_equal(bands['revenue'][50], reseeded['revenue'][50]))
+        self.assertTrue((np.diff([bands['revenue'][p] for p in sorted(bands['revenue'])], axis=0) >= 0).all())
+
+    def test_every_path_is_a_linked_statement(self):
+        names = ['asset', 'liabilities', 'book_value', 'profit_bfor_tax', 'tax_expense', 'net_profit', 'ROE']
+        for seed in range(5):
+            # With one path the median is the path itself
+            _, bands = self.forecaster.simulate(1, 5, seed=seed, percentiles=(50,), names=names)
+            path = {name: bands[name][50] for name in names}
+            np.testing.assert_allclose(path['asset'], path['liabilities'] + path['book_value'], rtol=1e-5)
+            np.testing.assert_allclose(path['net_profit'], path['profit_bfor_tax'] - path['tax_expense'], rtol=1e-5)
+            np.testing.assert_allclose(path['ROE'], path['net_profit'] / path['book_value'] * 100, atol=0.01)
+
+    def test_kept_series_count_against_the_budget(self):
+        with self.assertRaises(ValueError):
+            self.forecaster.simulate(100_000, 5, memory_budget=2**20)
+        _, bands = self.forecaster.simulate(100_000, 5, seed=1, memory_budget=20 * 2**20, names=['revenue'])
+        self.assertEqual(list(bands), ['revenue'])
+
+    def test_bad_arguments_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.forecaster.simulate(0, 5)
+        with self.assertRaises(ValueError):
+            self.forecaster.simulate(10, 5, names=['sales'])
+        with self.assertRaises(ValueError):
+            MonteCarloForecaster(history_company('quarterly'))
+
+
+if __name__ == '__main__':
+    unittest.main()
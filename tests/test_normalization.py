@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+
+import os
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from normalization import Normalizer, ScaleDeclaration
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class NormalizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.normalizer = Normalizer({'USD': 1500.0})
+
+    def test_each_kind_of_figure_gets_its_own_scale(self):
+        records = [{'year': 2023, 'revenue': 2.5, 'outstanding_shares': 1.5, 'market_cap': 3.0},
+                   {'year': 2023, 'quarter': 2, 'revenue': 100, 'outstanding_shares': 400}]
+        declarations = [ScaleDeclaration('USD', 'millions', share_scale='millions', market_scale='billions'),
+                        ScaleDeclaration(scale='thousands')]
+        batch = self.normalizer.normalize(records, declarations)
+        first, second = batch.records
+        self.assertEqual(first['revenue'], 2.5e6 * 1500)
+        self.assertEqual(first['outstanding_shares'], 1_500_000)
+        self.assertEqual(first['market_cap'], 3e9 * 1500)
+        self.assertEqual(first['year'], 2023)
+        self.assertEqual((second['revenue'], second['outstanding_shares'], second['quarter']), (100_000, 400, 2))
+        for row, record in enumerate(records):
+            submitted = batch.as_submitted(row)
+            self.assertEqual(submitted.keys(), record.keys())
+            for name, value in record.items():
+                self.assertAlmostEqual(submitted[name], value)
+        self.assertEqual(batch.declarations, declarations)
+
+    def test_normalize_one_matches_the_batch(self):
+        record = {'year': 2023, 'revenue': 12.0, 'PBT': 3.0}
+        declaration = ScaleDeclaration(scale='billions')
+        self.assertEqual(self.normalizer.normalize_one(record, declaration),
+                         self.normalizer.normalize([record], [declaration]).records[0])
+        self.assertEqual(self.normalizer.normalize_one(record, declaration)['profit_bfor_tax'], 3e9)
+
+    def test_bad_input_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ScaleDeclaration(scale='lakhs')
+        with self.assertRaises(ValueError):
+            self.normalizer.normalize([{'year': 2023}], [])
+        with self.assertRaises(ValueError):
+            self.normalizer.normalize([{'year': 2023}], [ScaleDeclaration('EUR')])
+        with self.assertRaises(ValueError):
+            self.normalizer.normalize([{'year': 2023, 'sales': 1.0}], [ScaleDeclaration()])
+
+    def test_factors_multiply_the_whole_batch(self):
+        rng = np.random.default_rng(33)
+        records = [{'year': 2023, 'revenue': float(v), 'asset': float(v) * 2} for v in rng.integers(1, 100, 50)]
+        declarations = [ScaleDeclaration(scale=s) for s in rng.choice(['units', 'thousands', 'millions'], 50)]
+        batch = self.normalizer.normalize(records, declarations)
+        for record, declaration, canonical in zip(records, declarations, batch.records):
+            factor = {'units': 1, 'thousands': 1e3, 'millions': 1e6}[declaration.scale]
+            self.assertEqual(canonical['asset'], record['asset'] * factor)
+
+
+class ScalePromptTest(unittest.TestCase):
+
+    def test_main_re_prompts_for_an_unknown_scale(self):
+        year = ['2023', '1000', '600', '200', '0', '10', '190', '150', '500',
+                '2000', '1200', '1000', '800', '300', '0', '200', '100', '1000', '400', '200', '100', '600', '500',
+                '1000', '500', '250', '100', '-100', '-50', '5000000']
+        stdin = '\n'.join(['X', '1', 'bogus', 'units', 'Thousands', 'units'] + year) + '\n'
+        result = subprocess.run([sys.executable, 'main.py'], input=stdin, capture_output=True, text=True,
+                                cwd=ROOT, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.count('Error in scale'), 1)
+        # Equity of 1000 thousand naira over 500 shares
+        self.assertIn("'book_value_per_share': 2000.0", result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from FA import Company
+from projection import project, projection_metrics, to_period_records
+
+OPENING = {'year': 2023, 'revenue': 1000.0, 'COGS': 600.0, 'PPE': 500.0, 'cash_and_equivalent': 100.0,
+           'trade_recv': 120.0, 'inventory': 90.0, 'trade_payables': 80.0, 'short_term_debt': 50.0,
+           'long_term_debt': 200.0, 'book_value': 480.0, 'retained_earnings': 300.0, 'current_asset': 350.0,
+           'non_current_asset': 600.0, 'current_liabilities': 200.0, 'non_current_liabilities': 270.0,
+           'asset': 950.0, 'liabilities': 470.0, 'outstanding_shares': 100.0, 'market_cap': 2000.0}
+
+
+class ProjectionTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.drivers = {'revenue_growth': rng.uniform(-0.5, 0.3, (200, 1)),
+                        'capex_pct': rng.uniform(0.0, 0.5, (200, 5)),
+                        'payout_ratio': rng.uniform(0.0, 1.0, (200, 1))}
+        self.columns = project(OPENING, 5, self.drivers)
+
+    def test_statements_are_linked(self):
+        c = self.columns
+        np.testing.assert_allclose(c['asset'], c['liabilities'] + c['book_value'], atol=1e-6)
+        np.testing.assert_allclose(c['profit_bfor_tax'] - c['tax_expense'], c['net_profit'], atol=1e-9)
+        cash = np.concatenate([np.full((200, 1), OPENING['cash_and_equivalent']), c['cash_and_equivalent']], axis=1)
+        np.testing.assert_allclose(np.diff(cash, axis=1),
+                                   c['cash_from_opr'] + c['cash_from_invst'] + c['cash_from_finance'], atol=1e-6)
+
+    def test_revolver_keeps_cash_non_negative(self):
+        self.assertGreaterEqual(self.columns['cash_and_equivalent'].min(), 0.0)
+        self.assertTrue((self.columns['short_term_debt'] > OPENING['short_term_debt']).any())
+
+    def test_every_scenario_is_accepted_by_company(self):
+        metrics = projection_metrics(OPENING, self.columns)
+        for scenario in range(0, 200, 20):
+            company = Company('X', 6)
+            company.add_period_data(OPENING)
+            for record in to_period_records(self.columns, 2024, scenario):
+                company.add_period_data(record)
+            company.calculate_all_metrics()
+            for t, year in enumerate(range(2024, 2029)):
+                expected = company.output[year]['ROE']
+                self.assertAlmostEqual(metrics['ROE'][scenario, t], expected, delta=0.0051)
+
+    def test_unknown_driver_is_rejected(self):
+        with self.assertRaises(ValueError):
+            project(OPENING, 5, {'growth': 0.1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from FA import Company
+from schema import FIELD_IDS, STRUCTURAL_VALIDATOR, PeriodRecord, SchemaValidator
+
+
+class PeriodRecordTest(unittest.TestCase):
+
+    def test_aliases_map_onto_canonical_slots(self):
+        record = PeriodRecord.from_dict({'year': 2023, 'PBT': 10.0, 'equity': 5, '_period': 2023})
+        self.assertEqual(record.items(), [('year', 2023), ('profit_bfor_tax', 10.0), ('book_value', 5)])
+        self.assertIn('profit_bfor_tax', record)
+        self.assertNotIn('PBT', record)
+        self.assertIsNone(record.get('revenue'))
+        with self.assertRaises(KeyError):
+            record['revenue']
+        with self.assertRaises(ValueError):
+            record['sales'] = 1.0
+        self.assertEqual(record, PeriodRecord(year=2023, profit_bfor_tax=10.0, book_value=5))
+
+    def test_structural_errors_are_all_reported(self):
+        with self.assertRaises(ValueError) as raised:
+            PeriodRecord.from_dict({'year': 2023, 'sales': 1.0, 'revenue': '10', 'PBT': 1.0,
+                                    'profit_bfor_tax': 2.0, 'outstanding_shares': 10.5, 'asset': -1.0})
+        message = str(raised.exception)
+        for expected in ["'sales': unknown line item", "'revenue': expected a number, got str",
+                         "'profit_bfor_tax': duplicates line item 'profit_bfor_tax'",
+                         "'outstanding_shares': shares must be a whole number", "'asset': outside [0"]:
+            self.assertIn(expected, message)
+
+    def test_batch_values_are_packed_by_field_id(self):
+        result = STRUCTURAL_VALIDATOR.validate_batch([{'year': 2022, 'revenue': 5.0}, {'year': 2023, 'COGS': 2.0}])
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.values[0, FIELD_IDS['revenue']], 5.0)
+        self.assertTrue(np.isnan(result.values[1, FIELD_IDS['revenue']]))
+        self.assertEqual(result.values[1, FIELD_IDS['COGS']], 2.0)
+
+    def test_value_checks_can_be_switched_off(self):
+        lenient = SchemaValidator(identities=(), check_values=False)
+        self.assertEqual(lenient.validate_batch([{'year': 2023, 'revenue': -5.0, 'outstanding_shares': 1.5}]).errors, [])
+
+
+class CompanyInputTest(unittest.TestCase):
+
+    def test_negative_figures_are_accepted_as_before(self):
+        company = Company('X', 2)
+        company.add_period_data({'year': 2022, 'revenue': 100.0, 'net_profit': 10.0})
+        company.add_period_data({'year': 2023, 'revenue': -20.0, 'net_profit': -5.0, 'cash_and_equivalent': -1.0})
+        company.calculate_all_metrics()
+        self.assertEqual(company.output[2023]['net_profit_margin'], 25.0)
+        self.assertEqual(company.output[2023]['revenue_yoy_growth'], -120.0)
+
+    def test_unknown_keys_and_non_numbers_are_rejected(self):
+        company = Company('X', 1)
+        with self.assertRaises(ValueError):
+            company.add_period_data({'year': 2023, 'revenue': 100.0, 'segment_revenue': 40.0})
+        with self.assertRaises(ValueError):
+            company.add_period_data({'year': 2023, 'revenue': 'n/a'})
+        self.assertEqual(company.financial_inputs, [])
+
+    def test_aliases_are_stored_canonically_without_touching_the_input(self):
+        company = Company('X', 1)
+        finance_input = {'year': 2023, 'revenue': 100.0, 'net_income': 8.0, 'total_assets': 200.0}
+        company.add_period_data(finance_input)
+        company.calculate_all_metrics()
+        self.assertEqual(company.output[2023]['net_profit_margin'], 8.0)
+        self.assertEqual(company.output[2023]['ROA'], 4.0)
+        self.assertNotIn('_period', finance_input)
+
+
+if __name__ == '__main__':
+    unittest.main()
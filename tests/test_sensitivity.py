@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+import pytest
+
+from FA import Company
+from sensitivity import scenario_overlay, sensitivity_grid
+
+def shocked_company(inputs: list, shocks: dict) -> Company:
+    company = Company('X', len(inputs))
+    for record in inputs:
+        company.add_period_data(scenario_overlay(record, shocks))
+    company.calculate_all_metrics()
+    return company
+
+
+@pytest.mark.usefixtures('statements')
+class SensitivityGridTest(unittest.TestCase):
+
+    def test_grid_matches_company_at_every_shock(self):
+        rng = np.random.default_rng(9)
+        inputs = [self.random_statement(rng, year) for year in range(2018, 2024)]
+        base = shocked_company(inputs, {})
+        shocks = {'revenue': np.array([-0.2, 0.0, 0.15]), 'finance_cost': np.array([0.0, 0.5])}
+        periods, axes, results = sensitivity_grid(base, shocks)
+        self.assertEqual(axes, ['revenue', 'finance_cost'])
+
+        for i, revenue_shock in enumerate(shocks['revenue']):
+            for j, cost_shock in enumerate(shocks['finance_cost']):
+                company = shocked_company(inputs, {'revenue': revenue_shock, 'finance_cost': cost_shock})
+                for p, period in enumerate(periods):
+                    for name, expected in company.output[period].items():
+                        if name not in results:
+                            continue
+                        actual = results[name][p, i, j]
+                        if expected is None:
+                            self.assertTrue(np.isnan(actual), (period, name))
+                        else:
+                            self.assertAlmostEqual(actual, expected, delta=0.0051, msg=(period, name, i, j))
+
+    def test_overlay_does_not_copy_the_base_record(self):
+        record = {'year': 2023, 'revenue': 100.0, 'COGS': 60.0}
+        overlay = scenario_overlay(record, {'revenue': 0.1})
+        self.assertEqual(list(overlay.maps[0]), ['revenue'])
+        self.assertAlmostEqual(overlay['revenue'], 110.0)
+        self.assertIs(overlay.maps[1], record)
+        self.assertEqual(overlay['COGS'], 60.0)
+
+    def test_unknown_line_item_is_rejected(self):
+        company = Company('X', 1)
+        company.add_period_data({'year': 2023, 'revenue': 1.0})
+        company.calculate_all_metrics()
+        with self.assertRaises(ValueError):
+            sensitivity_grid(company, {'sales': np.array([0.1])})
+
+
+if __name__ == '__main__':
+    unittest.main()
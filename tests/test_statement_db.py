@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+import pytest
+
+from FA import Company
+from statement_db import StatementDatabase
+
+
+@pytest.mark.usefixtures('statements')
+class IncrementalRefreshTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(26)
+        self.db = StatementDatabase()
+
+    def tearDown(self):
+        self.db.close()
+
+    def assertMatchesFullRun(self, ticker: str, period_type: str, periods: list):
+        company = Company(ticker, len(periods), period_type)
+        stored = dict()
+        for year, quarter in periods:
+            statement = self.db.get_statement(ticker, year, quarter, period_type)
+            if statement is not None:
+                company.add_period_data(statement)
+                stored[(year, quarter)] = year if period_type == 'annual' else (year, quarter)
+        company.calculate_all_metrics()
+        for year, quarter in periods:
+            metrics = self.db.get_metrics(ticker, year, quarter, period_type)
+            if (year, quarter) not in stored:
+                self.assertEqual(metrics, {}, (year, quarter))
+                continue
+            expected = company.output[stored[(year, quarter)]]
+            self.assertEqual(set(metrics), set(expected), (year, quarter))
+            for name, value in expected.items():
+                if value is None:
+                    self.assertIsNone(metrics[name], (year, quarter, name))
+                else:
+                    self.assertAlmostEqual(metrics[name], value, msg=(year, quarter, name))
+
+    def test_annual_insert_update_delete_match_full_run(self):
+        years = list(range(2015, 2024))
+        periods = [(year, 0) for year in years]
+        for batch_size in [1, 2, 3, 500]:
+            with self.subTest(batch_size=batch_size):
+                ticker = f'T{batch_size}'
+                ids = {year: self.db.add_statement(ticker, self.random_statement(self.rng, year)) for year in years}
+                self.db.refresh_metrics(batch_size=batch_size)
+                self.assertMatchesFullRun(ticker, 'annual', periods)
+
+                self.db.update_statement(ids[2019], self.random_statement(self.rng, 2019))
+                self.db.refresh_metrics(batch_size=batch_size)
+                self.assertMatchesFullRun(ticker, 'annual', periods)
+
+                self.db.delete_statement(ids[2020])
+                self.db.refresh_metrics(batch_size=batch_size)
+                self.assertMatchesFullRun(ticker, 'annual', periods)
+
+                self.db.add_statement(ticker, self.random_statement(self.rng, 2020))
+                self.db.refresh_metrics(batch_size=batch_size)
+                self.assertMatchesFullRun(ticker, 'annual', periods)
+                self.assertEqual(self.db.pending_changes(), 0)
+
+    def test_quarterly_changes_across_year_boundaries_match_full_run(self):
+        periods = [(year, quarter) for year in [2021, 2022, 2023] for quarter in [1, 2, 3, 4]]
+        ids = {period: self.db.add_statement('Q', self.random_statement(self.rng, *period), 'quarterly')
+               for period in periods}
+        self.db.refresh_metrics(batch_size=2)
+        self.assertMatchesFullRun('Q', 'quarterly', periods)
+
+        self.db.update_statement(ids[(2021, 4)], self.random_statement(self.rng, 2021, 4))
+        self.db.delete_statement(ids[(2022, 3)])
+        self.db.refresh_metrics(batch_size=1)
+        self.assertMatchesFullRun('Q', 'quarterly', periods)
+
+
+if __name__ == '__main__':
+    unittest.main()
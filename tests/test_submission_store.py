@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+
+import hashlib
+import sqlite3
+import unittest
+
+from submission_store import BloomFilter, SubmissionStore, canonicalize, content_address
+
+
+class CanonicalFormTest(unittest.TestCase):
+
+    def test_equivalent_submissions_share_an_address(self):
+        base = content_address({'year': 2023, 'profit_bfor_tax': 10, 'revenue': 100.0})
+        for variant in [{'revenue': 100, 'year': 2023, 'profit_bfor_tax': 10.0},
+                        {'year': 2023, 'PBT': 10, 'revenue': 100.0},
+                        {'year': 2023, 'profit_bfor_tax': 10, 'revenue': 100.0, '_period': 2023}]:
+            self.assertEqual(content_address(variant), base, variant)
+        self.assertNotEqual(content_address({'year': 2023, 'profit_bfor_tax': 10, 'revenue': 100.5}), base)
+        self.assertEqual(canonicalize({'year': 2023, 'revenue': 100.0, 'PBT': 1.5}),
+                         b'{"profit_bfor_tax":1.5,"revenue":100,"year":2023}')
+
+    def test_invalid_submissions_are_rejected(self):
+        for finance_input in [{'year': 2023, 'revenue': float('nan')}, {'year': 2023, 'COGS': float('inf')},
+                              {'year': 2023, 'sales': 1.0}, {'year': 2023, 'PBT': 1.0, 'profit_bfor_tax': 1.0}]:
+            with self.assertRaises(ValueError):
+                canonicalize(finance_input)
+
+
+class BloomFilterTest(unittest.TestCase):
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        added = [hashlib.sha256(f'in{i}'.encode()).hexdigest() for i in range(5000)]
+        for address in added:
+            bloom.add(address)
+        self.assertTrue(all(bloom.might_contain(address) for address in added))
+        absent = [hashlib.sha256(f'out{i}'.encode()).hexdigest() for i in range(20000)]
+        false_positives = sum(bloom.might_contain(address) for address in absent)
+        self.assertLess(false_positives / len(absent), 0.02)
+
+
+class SubmissionStoreTest(unittest.TestCase):
+
+    def test_duplicates_share_contents_and_metrics(self):
+        store = SubmissionStore(capacity=100)
+        statement = {'year': 2023, 'revenue': 100.0, 'net_profit': 10.0, 'book_value': 50.0}
+        address, is_new = store.submit('A', statement, submitted_by=1)
+        self.assertTrue(is_new)
+        self.assertEqual(store.submit('B', {'net_income': 10, 'year': 2023, 'revenue': 100, 'equity': 50})[0], address)
+        self.assertFalse(store.submit('A', statement)[1])
+        self.assertTrue(store.seen(statement))
+        self.assertFalse(store.seen(dict(statement, revenue=101.0)))
+        self.assertEqual(store.connection.execute(
+            "SELECT submission_count FROM statement_contents WHERE address = ?", (address,)).fetchone()[0], 3)
+        self.assertEqual(store.get_contents(address), {'year': 2023, 'revenue': 100, 'net_profit': 10, 'book_value': 50})
+
+        metrics = store.metrics_for(address)
+        self.assertEqual(metrics['ROE'], 20.0)
+        self.assertEqual(store.metrics_for(address), metrics)
+        self.assertEqual(store.connection.execute(
+            "SELECT COUNT(*) FROM content_metrics WHERE address = ?", (address,)).fetchone()[0], len(metrics))
+        with self.assertRaises(ValueError):
+            store.metrics_for('0' * 64)
+        self.assertIsNone(store.get_contents('0' * 64))
+
+    def test_reopening_reloads_the_filter(self):
+        connection = sqlite3.connect(':memory:')
+        address, _ = SubmissionStore(connection, capacity=100).submit('A', {'year': 2023, 'revenue': 1.0})
+        reopened = SubmissionStore(connection, capacity=100)
+        self.assertTrue(reopened.bloom.might_contain(address))
+        self.assertFalse(reopened.submit('A', {'year': 2023, 'revenue': 1})[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pytest
+
+from FA import Company
+from tick_updates import TickUpdater
+
+def calculated_company(name: str, inputs: list) -> Company:
+    company = Company(name, len(inputs))
+    for statement in inputs:
+        company.add_period_data(dict(statement))
+    company.calculate_all_metrics()
+    return company
+
+
+@pytest.mark.usefixtures('statements')
+class TickUpdaterTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.inputs = {f'T{i}': [self.random_statement(rng, year) for year in [2022, 2023]] for i in range(20)}
+        self.prices = rng.uniform(0.5, 50, 200).round(2)
+        self.tickers = [f'T{i}' for i in rng.integers(0, 20, 200)]
+
+    def _recalculated(self, ticker: str, price: float) -> dict:
+        inputs = [dict(statement) for statement in self.inputs[ticker]]
+        inputs[-1]['market_cap'] = price * inputs[-1]['outstanding_shares']
+        return calculated_company(ticker, inputs).output[2023]
+
+    def test_apply_matches_full_recalculation(self):
+        companies = [calculated_company(ticker, inputs) for ticker, inputs in self.inputs.items()]
+        updater = TickUpdater(companies)
+        last = dict()
+        for ticker, price in zip(self.tickers, self.prices):
+            updater.apply(ticker, float(price))
+            last[ticker] = float(price)
+        for company in companies:
+            if company.company_name in last:
+                self.assertEqual(company.output[2023], self._recalculated(company.company_name, last[company.company_name]))
+
+    def test_apply_batch_matches_ticks_applied_one_by_one(self):
+        one_by_one = [calculated_company(ticker, inputs) for ticker, inputs in self.inputs.items()]
+        updater = TickUpdater(one_by_one)
+        returned = [updater.apply(ticker, float(price)) for ticker, price in zip(self.tickers, self.prices)]
+
+        batched = [calculated_company(ticker, inputs) for ticker, inputs in self.inputs.items()]
+        batch_updater = TickUpdater(batched)
+        metrics = dict()
+        for start in range(0, len(self.prices), 64):
+            for name, values in batch_updater.apply_batch(self.tickers[start:start + 64], self.prices[start:start + 64]).items():
+                metrics.setdefault(name, []).extend(values)
+        for expected, actual in zip(one_by_one, batched):
+            self.assertEqual(expected.output, actual.output)
+        for n, values in enumerate(returned):
+            for name, expected in values.items():
+                if expected is None:
+                    self.assertTrue(np.isnan(metrics[name][n]))
+                else:
+                    self.assertAlmostEqual(metrics[name][n], expected, delta=0.0051)
+        with self.assertRaises(ValueError):
+            batch_updater.apply_batch(['NOPE'], [1.0])
+        with self.assertRaises(ValueError):
+            batch_updater.apply_batch(['T0', 'T1'], [1.0])
+
+    def test_replay_matches_ticks_applied_one_by_one(self):
+        one_by_one = [calculated_company(ticker, inputs) for ticker, inputs in self.inputs.items()]
+        updater = TickUpdater(one_by_one)
+        for ticker, price in zip(self.tickers, self.prices):
+            updater.apply(ticker, float(price))
+
+        replayed = [calculated_company(ticker, inputs) for ticker, inputs in self.inputs.items()]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ticks.csv')
+            with open(path, 'w') as f:
+                f.write('timestamp,ticker,price\n')
+                for n, (ticker, price) in enumerate(zip(self.tickers, self.prices)):
+                    f.write(f'{n},{ticker},{price}\n')
+            batches = list()
+            count = TickUpdater(replayed).replay(path, lambda *batch: batches.append(batch), batch_size=64)
+        self.assertEqual(count, len(self.prices))
+        self.assertEqual(sum(len(tickers) for tickers, _, _ in batches), len(self.prices))
+        for expected, actual in zip(one_by_one, replayed):
+            self.assertEqual(expected.output, actual.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+
+import datetime
+import unittest
+
+import numpy as np
+import pytest
+
+from bitemporal import BitemporalStore
+from universe import UniverseBuilder
+
+@pytest.mark.usefixtures('statements')
+class UniverseSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.store = BitemporalStore()
+        for ticker in ['AAA', 'BBB', 'CCC']:
+            for year in range(2018, 2023):
+                published = datetime.date(year + 1, 3, 1) + datetime.timedelta(days=int(rng.integers(0, 60)))
+                self.store.record(ticker, self.random_statement(rng, year), published)
+                if rng.random() < 0.4:
+                    restated = published + datetime.timedelta(days=int(rng.integers(30, 300)))
+                    self.store.record(ticker, self.random_statement(rng, year), restated)
+        self.builder = UniverseBuilder(self.store, statuses={'CCC': 'delisted'})
+
+    def test_snapshots_match_company_as_of_the_day_before(self):
+        dates = [datetime.date(2019, 1, 1) + datetime.timedelta(days=30 * n) for n in range(60)]
+        for date, snapshot in zip(dates, self.builder.snapshots(dates)):
+            for ticker in snapshot.tickers:
+                company = self.store.company_as_of(ticker, date - datetime.timedelta(days=1))
+                company.calculate_all_metrics()
+                for period, values in company.output.items():
+                    for name in snapshot.metrics:
+                        expected = values.get(name)
+                        actual = snapshot.value(ticker, period, name)
+                        if expected is None:
+                            self.assertIsNone(actual, (date, ticker, period, name))
+                        else:
+                            self.assertAlmostEqual(actual, expected, delta=0.0051, msg=(date, ticker, period, name))
+
+    def test_nothing_is_known_before_the_first_publication(self):
+        snapshot = self.builder.snapshot('2019-01-01')
+        self.assertEqual(snapshot.tickers, [])
+        self.assertEqual(snapshot.data.size, 0)
+
+    def test_delisted_tickers_are_kept(self):
+        snapshot = self.builder.snapshot('2025-01-01')
+        self.assertIn('CCC', snapshot.tickers)
+        self.assertEqual(snapshot.statuses['CCC'], 'delisted')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+
+import bisect
+
+import numpy as np
+
+from bitemporal import BitemporalStore, as_date
+from metric_cube import MetricCube
+from metric_engine import METRIC_NAMES, compute_metrics
+from schema import FIELDS, FIELD_IDS, FIELD_NAMES
+from statement_db import StatementDatabase
+
+_PERIOD_COLUMNS = [FIELD_IDS['year'], FIELD_IDS['quarter']]
+_DATA_COLUMNS = [i for i in range(len(FIELDS)) if i not in _PERIOD_COLUMNS]
+
+
+class UniverseSnapshot(MetricCube):
+    """
+    In-memory metric cube of the universe as it was known on one rebalance date.
+
+    Offers the same accessors as `MetricCube` (`ticker`, `metric`, `series`, `value`).
+    """
+
+    def __init__(self, date, tickers: list, periods: list, metrics: list, data: np.ndarray, statuses: dict):
+        self.date = date
+        self.tickers = tickers
+        self.periods = periods
+        self.metrics = metrics
+        self.data = data
+        self.statuses = statuses
+        self._ticker_index = {ticker: i for i, ticker in enumerate(tickers)}
+        self._period_index = {period: i for i, period in enumerate(periods)}
+        self._metric_index = {name: i for i, name in enumerate(metrics)}
+
+
+class UniverseBuilder:
+    """
+    Builds point-in-time universes for backtesting.
+
+    A snapshot for date D holds every ticker with at least one statement published
+    before D, delisted ones included, so backtests carry no survivorship bias, and each
+    period shows the latest version published before D. A series of snapshots is built
+    in a single pass over the publication log: statement arrays are updated as events
+    are replayed, and only tickers touched since the previous date are recomputed.
+    """
+
+    def __init__(self, store: BitemporalStore, period_type: str = 'annual', statuses: dict = None):
+        """
+        Args:
+            store (BitemporalStore): Statement versions keyed by publication date.
+            period_type (str): Either 'annual' or 'quarterly'.
+            statuses (dict): Ticker -> COMPANIES status ('active', 'delisted', ...),
+                             attached to snapshots for reference only.
+        """
+        if period_type not in ['annual', 'quarterly']:
+            raise ValueError("period_type must be either 'annual' or 'quarterly'.")
+        self.period_type = period_type
+        self.statuses = dict(statuses or {})
+        self._events = store.events(period_type)
+        self._event_dates = [event[0] for event in self._events]
+
+        self.tickers = sorted({ticker for _, ticker, _, _ in self._events} | set(self.statuses))
+        years = [period if period_type == 'annual' else period[0] for _, _, period, _ in self._events]
+        # A consecutive period axis, so position i - 1 is always the prior period
+        if not years:
+            self.periods = []
+        elif period_type == 'annual':
+            self.periods = list(range(min(years), max(years) + 1))
+        else:
+            self.periods = [(year, q) for year in range(min(years), max(years) + 1) for q in range(1, 5)]
+        self.metrics = list(METRIC_NAMES)
+
+    @classmethod
+    def from_database(cls, database: StatementDatabase, period_type: str = 'annual') -> 'UniverseBuilder':
+        """
+        Builds the event log from a `StatementDatabase`, using each statement's
+        `submitted_date` as its publication date.
+
+        Statements without a submitted date cannot be placed in time and are skipped.
+        """
+        statuses = dict(database.connection.execute("SELECT ticker, status FROM companies"))
+        store = BitemporalStore()
+        rows = database.connection.execute(
+            "SELECT ticker, year, quarter, line_items, submitted_date FROM financial_statements "
+            "WHERE period_type = ? AND submitted_date IS NOT NULL", (period_type,))
+        for ticker, year, quarter, line_items, submitted_date in rows:
+            finance_input = StatementDatabase._decode_line_items(line_items, year, quarter, period_type)
+            store.record(ticker, finance_input, submitted_date, period_type)
+        return cls(store, period_type, statuses)
+
+    def snapshot(self, date) -> UniverseSnapshot:
+        """Returns the universe known on one date."""
+        return self.snapshots([date])[0]
+
+    def snapshots(self, dates: list) -> list:
+        """
+        Builds the universe for each rebalance date in one sweep over the event log.
+
+        Args:
+            dates (list): Rebalance dates (dates or ISO strings), in any order.
+
+        Returns:
+            list: One `UniverseSnapshot` per date, in the order given. Only statements
+                  published strictly before a date are used for it.
+        """
+        dates = [as_date(date) for date in dates]
+        ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        period_index = {period: i for i, period in enumerate(self.periods)}
+        values = np.full((len(self.tickers), len(self.periods), len(FIELDS)), np.nan)
+        cube = np.full((len(self.tickers), len(self.periods), len(self.metrics)), np.nan)
+        published = np.zeros(len(self.tickers), dtype=bool)
+
+        results = dict()
+        applied = 0
+        for date in sorted(set(dates)):
+            end = bisect.bisect_left(self._event_dates, date, lo=applied)
+            dirty = set()
+            for _, ticker, period, record in self._events[applied:end]:
+                i = ticker_index[ticker]
+                row = np.full(len(FIELDS), np.nan)
+                for name, value in record.items():
+                    row[FIELD_IDS[name]] = value
+                values[i, period_index[period]] = row
+                dirty.add(i)
+            applied = end
+
+            if dirty:
+                rows = sorted(dirty)
+                published[rows] = True
+                cube[rows] = self._compute(values[rows])
+
+            has_data = ~np.isnan(values[published][:, :, _DATA_COLUMNS]).all(axis=2).all(axis=0) \
+                if published.any() else np.zeros(len(self.periods), dtype=bool)
+            tickers = [ticker for ticker, keep in zip(self.tickers, published) if keep]
+            periods = [period for period, keep in zip(self.periods, has_data) if keep]
+            data = cube[published][:, has_data]
+            results[date] = UniverseSnapshot(date, tickers, periods, list(self.metrics), data,
+                                             {ticker: self.statuses.get(ticker, 'active') for ticker in tickers})
+        return [results[date] for date in dates]
+
+    def _compute(self, values: np.ndarray) -> np.ndarray:
+        """Metrics for a (tickers x periods x fields) block, as (tickers x periods x metrics)."""
+        columns = {FIELD_NAMES[i]: values[:, :, i] for i in _DATA_COLUMNS}
+        previous = {name: np.concatenate([np.full((len(values), 1), np.nan), column[:, :-1]], axis=1)
+                    for name, column in columns.items()}
+        has_data = ~np.isnan(values[:, :, _DATA_COLUMNS]).all(axis=2)
+        previous_exists = np.concatenate([np.zeros((len(values), 1), dtype=bool), has_data[:, :-1]], axis=1)
+        results = compute_metrics(columns, previous, previous_exists, self.metrics)
+        block = np.stack([results[name] for name in self.metrics], axis=2)
+        return np.where(has_data[:, :, None], block, np.nan)